@@ -1,7 +1,14 @@
+from collections import namedtuple
+
 from cloudshell.layer_one.core.response.resource_info.entities.blade import Blade
 from cloudshell.layer_one.core.response.resource_info.entities.chassis import Chassis
 from pluribus_virtualwire.autoload.vw_port import VWPort
 
+# Resource entity and address of its parent, None for the chassis
+ResourceElement = namedtuple('ResourceElement', ['parent_address', 'resource'])
+# Incoming mapping of the port resource with the address
+MappingElement = namedtuple('MappingElement', ['address', 'incoming_address'])
+
 
 class Autoload(object):
     def __init__(self, resource_address, board_table, ports_table, associations_table, logger):
@@ -14,9 +21,7 @@ class Autoload(object):
         self._chassis_id = '1'
         self._blade_id = '1'
 
-    def _build_chassis(self):
-        chassis_dict = {}
-
+    def _create_chassis(self):
         serial_number = self._board_table.get('chassis-serial')
         model_name = self._board_table.get('model')
         sw_version = self._board_table.get('version')
@@ -24,29 +29,41 @@ class Autoload(object):
         chassis.set_model_name(model_name)
         chassis.set_serial_number(serial_number)
         chassis.set_os_version(sw_version)
-        chassis_dict[self._chassis_id] = chassis
-        return chassis_dict
+        return chassis
 
-    def build_blade(self, chassis_dict):
+    def _create_blade(self):
         blade_model = 'Virtal Wire Module'
         blade = Blade(self._blade_id)
         blade.set_model_name(blade_model)
+        return blade
+
+    def _port_model_name(self):
+        return '{} Port'.format(self._board_table.get('model'))
+
+    @staticmethod
+    def _create_port(port_id, port_record, model_name):
+        port = VWPort(port_id, port_record.phys_id)
+        port.set_model_name(model_name)
+        # port.set_auto_negotiation(port_record.autoneg == 'on')
+        # port.set_protocol_type_by_speed(port_record.speed)
+        # port.set_protocol('80')
+        port.set_port_speed(port_record.speed)
+        return port
+
+    def _build_chassis(self):
+        return {self._chassis_id: self._create_chassis()}
+
+    def build_blade(self, chassis_dict):
+        blade = self._create_blade()
         blade.set_parent_resource(chassis_dict.get(self._chassis_id))
         return {self._blade_id: blade}
 
     def _build_ports(self, blades_dict):
         ports_dict = {}
         blade = blades_dict.get(self._blade_id)
+        model_name = self._port_model_name()
         for port_id, port_record in self._ports_table.iteritems():
-            speed = port_record.get('speed')
-            # autoneg = port_record.get('autoneg')
-            phys_id = port_record.get('phys_id')
-            port = VWPort(port_id, phys_id)
-            port.set_model_name('{} Port'.format(self._board_table.get('model')))
-            # port.set_auto_negotiation(autoneg == 'on')
-            # port.set_protocol_type_by_speed(speed)
-            # port.set_protocol('80')
-            port.set_port_speed(speed)
+            port = self._create_port(port_id, port_record, model_name)
             port.set_parent_resource(blade)
             ports_dict[port_id] = port
         return ports_dict
@@ -59,8 +76,43 @@ class Autoload(object):
                 slave_port.add_mapping(master_port)
 
     def build_structure(self):
+        """
+        Materialize resource entities from the tables, the structure is not kept and is built for every response
+        :rtype: list
+        """
         chassis_dict = self._build_chassis()
         blades_dict = self.build_blade(chassis_dict)
         ports_dict = self._build_ports(blades_dict)
         self._build_mappings(ports_dict)
         return chassis_dict.values()
+
+    def iter_elements(self):
+        """
+        Resource elements in document order: chassis, blade, then every port followed by its mapping.
+        Entities are created one at a time and are not linked into a tree
+        :return: ResourceElement and MappingElement generator
+        """
+        ports_table = self._ports_table
+        associations_table = self._associations_table
+
+        chassis = self._create_chassis()
+        yield ResourceElement(None, chassis)
+        blade = self._create_blade()
+        yield ResourceElement(chassis.address, blade)
+        blade_address = '{0}/{1}'.format(chassis.address, blade.resource_id)
+        model_name = self._port_model_name()
+        for port_id, port_record in ports_table.iteritems():
+            port = self._create_port(port_id, port_record, model_name)
+            yield ResourceElement(blade_address, port)
+            master_port_record = ports_table.get(associations_table.get(port_id))
+            if master_port_record:
+                yield MappingElement('{0}/{1}'.format(blade_address, port.resource_id),
+                                     '{0}/{1}'.format(blade_address, master_port_record.phys_id))
+
+    def update_associations(self, associations_table):
+        """
+        Replace associations table, mappings are taken from it by the next build_structure
+        :param associations_table: slave to master ports table
+        :type associations_table: dict
+        """
+        self._associations_table = associations_table
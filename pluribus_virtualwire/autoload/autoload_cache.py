@@ -0,0 +1,105 @@
+import threading
+
+
+class AutoloadCacheEntry(object):
+    def __init__(self, state_id, autoload, associations_generation):
+        """
+        :type state_id: str
+        :type autoload: pluribus_virtualwire.autoload.autoload.Autoload
+        :param associations_generation: generation of the associations the port mappings were read at
+        :type associations_generation: int
+        """
+        self.state_id = state_id
+        self.autoload = autoload
+        self.associations_generation = associations_generation
+
+
+class AutoloadCache(object):
+    """
+    Built autoload structures by device address, valid while the device state id is not changed
+    """
+
+    def __init__(self, logger):
+        """
+        :param logger:
+        :type logger: Logger
+        """
+        self._logger = logger
+        self._entries = {}
+        # Incremented after every mapping command, cached mappings read at an older generation are outdated
+        self._associations_generation = 0
+        self._lock = threading.Lock()
+
+    @property
+    def associations_generation(self):
+        """
+        Generation of the associations, taken before the associations are read from the device
+        :rtype: int
+        """
+        return self._associations_generation
+
+    def get(self, address, state_id):
+        """
+        :param address: resource address
+        :type address: str
+        :param state_id: current device state id
+        :type state_id: str
+        :rtype: AutoloadCacheEntry
+        """
+        entry = self._entries.get(address)
+        if entry and entry.state_id == state_id:
+            return entry
+        if entry:
+            self._logger.debug('State id of {0} changed from {1} to {2}, autoload cache dropped'.format(
+                address, entry.state_id, state_id))
+            del self._entries[address]
+
+    def put(self, address, state_id, autoload, associations_generation):
+        """
+        :type address: str
+        :type state_id: str
+        :type autoload: pluribus_virtualwire.autoload.autoload.Autoload
+        :param associations_generation: generation taken before the autoload tables were read
+        :type associations_generation: int
+        :rtype: AutoloadCacheEntry
+        """
+        entry = AutoloadCacheEntry(state_id, autoload, associations_generation)
+        self._entries[address] = entry
+        return entry
+
+    def update_state_id(self, address, state_id):
+        """
+        Keep cached structure valid after the state id is set by the driver
+        """
+        entry = self._entries.get(address)
+        if entry:
+            entry.state_id = state_id
+
+    def associations_changed(self, entry):
+        """
+        Associations were modified by the driver after the cached mappings were read
+        :type entry: AutoloadCacheEntry
+        :rtype: bool
+        """
+        return entry.associations_generation != self._associations_generation
+
+    def update_associations(self, entry, associations_generation, associations_table):
+        """
+        Patch cached mappings with associations re-read from the device, mappings read later are not overwritten
+        :type entry: AutoloadCacheEntry
+        :param associations_generation: generation taken before the associations were read
+        :type associations_generation: int
+        :param associations_table: associations table of AutoloadActions
+        :type associations_table: dict
+        """
+        with self._lock:
+            if associations_generation > entry.associations_generation:
+                entry.autoload.update_associations(associations_table)
+                entry.associations_generation = associations_generation
+
+    def mark_associations_changed(self):
+        """
+        Associations were modified by the driver, cached mappings have to be re-read
+        """
+        with self._lock:
+            self._associations_generation += 1
@@ -0,0 +1,108 @@
+import json
+import os
+import threading
+import time
+
+
+class ChassisFactsCache(object):
+    """
+    Board tables (model, chassis serial, software version, switch name) by device address, persisted in a json file
+    so the driver answers them locally after restart. Entries expire after ttl seconds and are replaced when the
+    device reports another software version.
+    """
+    VERSION = 'version'
+
+    def __init__(self, logger, file_path=None, ttl=86400):
+        """
+        :param logger:
+        :type logger: Logger
+        :param file_path: json file, the cache is kept in memory only if not set
+        :type file_path: str
+        :param ttl: seconds an entry is valid, 0 - forever
+        :type ttl: int
+        """
+        self._logger = logger
+        self._file_path = file_path
+        self._ttl = ttl
+        self._entries = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._entries is not None:
+            return
+        self._entries = {}
+        if self._file_path and os.path.isfile(self._file_path):
+            try:
+                with open(self._file_path) as cache_file:
+                    self._entries = json.load(cache_file)
+            except (IOError, OSError, ValueError) as e:
+                self._logger.warning('Cannot read chassis facts cache {0}: {1}'.format(self._file_path, e))
+
+    def _write(self):
+        if not self._file_path:
+            return
+        temp_path = '{}.tmp'.format(self._file_path)
+        try:
+            with open(temp_path, 'w') as cache_file:
+                json.dump(self._entries, cache_file, indent=2)
+            if os.name == 'nt' and os.path.exists(self._file_path):
+                os.remove(self._file_path)
+            os.rename(temp_path, self._file_path)
+        except (IOError, OSError) as e:
+            self._logger.warning('Cannot write chassis facts cache {0}: {1}'.format(self._file_path, e))
+
+    def get(self, address):
+        """
+        :param address: resource address
+        :type address: str
+        :return: board table or None if not cached or expired
+        :rtype: dict
+        """
+        with self._lock:
+            self._load()
+            entry = self._entries.get(address)
+            if not entry:
+                return None
+            if self._ttl and time.time() - entry['timestamp'] > self._ttl:
+                self._logger.debug('Chassis facts of {} expired'.format(address))
+                del self._entries[address]
+                self._write()
+                return None
+            return dict(entry['board_table'])
+
+    def put(self, address, board_table):
+        """
+        :param address: resource address
+        :type address: str
+        :param board_table: board table read from the device
+        :type board_table: dict
+        """
+        with self._lock:
+            self._load()
+            entry = self._entries.get(address)
+            if entry and entry['board_table'].get(self.VERSION) != board_table.get(self.VERSION):
+                self._logger.debug('Software version of {0} changed from {1} to {2}'.format(
+                    address, entry['board_table'].get(self.VERSION), board_table.get(self.VERSION)))
+            self._entries[address] = {'timestamp': time.time(), 'board_table': dict(board_table)}
+            self._write()
+
+    def validate_version(self, address, version):
+        """
+        Drop the entry if the device runs another software version
+        :type address: str
+        :param version: software version read from the device
+        :type version: str
+        :return: True if the entry is still valid
+        :rtype: bool
+        """
+        with self._lock:
+            self._load()
+            entry = self._entries.get(address)
+            if entry and entry['board_table'].get(self.VERSION) == version:
+                return True
+            if entry:
+                self._logger.debug('Software version of {0} changed to {1}, chassis facts dropped'.format(address,
+                                                                                                        version))
+                del self._entries[address]
+                self._write()
+            return False
@@ -0,0 +1,31 @@
+class PortRecord(object):
+    """
+    Port attributes read by autoload, kept instead of cloudshell entities until the response is built
+    """
+    __slots__ = ('logical_id', 'phys_id', 'speed', 'autoneg')
+
+    def __init__(self, logical_id, phys_id, speed, autoneg):
+        """
+        :param logical_id: logical port id, "5"
+        :type logical_id: str
+        :param phys_id: bezel interface, "5" or "49.1"
+        :type phys_id: str
+        :param speed: "10g"
+        :type speed: str
+        :param autoneg: "on"/"off"
+        :type autoneg: str
+        """
+        self.logical_id = logical_id
+        self.phys_id = phys_id
+        self.speed = speed
+        self.autoneg = autoneg
+
+    def __eq__(self, other):
+        return isinstance(other, PortRecord) and all(
+            getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return 'PortRecord({})'.format(', '.join(repr(getattr(self, name)) for name in self.__slots__))
@@ -0,0 +1,41 @@
+from xml.etree.ElementTree import SubElement
+
+from cloudshell.layer_one.core.response.resource_info.resource_info_builder import ResourceInfoBuilder
+from cloudshell.layer_one.core.response.response_info import ResourceDescriptionResponseInfo
+from pluribus_virtualwire.autoload.autoload import MappingElement
+
+
+class ResourceDescriptionStreamResponseInfo(ResourceDescriptionResponseInfo):
+    """
+    Resource description serialized element by element from Autoload.iter_elements, the tree of resource entities
+    is not built
+    """
+
+    def __init__(self, autoload):
+        """
+        :type autoload: pluribus_virtualwire.autoload.autoload.Autoload
+        """
+        super(ResourceDescriptionStreamResponseInfo, self).__init__([])
+        self._autoload = autoload
+
+    def build_xml_node(self):
+        response_info_node = self._build_response_info_node()
+        response_info_node.attrib['xmlns:xsi'] = 'http://www.w3.org/2001/XMLSchema-instance'
+        response_info_node.attrib['xsi:type'] = 'ResourceInfoResponse'
+        resource_nodes = {}
+        for element in self._autoload.iter_elements():
+            if isinstance(element, MappingElement):
+                mapping_node = SubElement(resource_nodes[element.address], 'ResourceMapping')
+                SubElement(mapping_node, 'IncomingMapping').text = element.incoming_address
+                continue
+            resource = element.resource
+            node = ResourceInfoBuilder._build_resource_node(resource)
+            if element.parent_address is None:
+                address = resource.address
+                response_info_node.append(node)
+            else:
+                address = '{0}/{1}'.format(element.parent_address, resource.resource_id)
+                resource_nodes[element.parent_address].find('ChildResources').append(node)
+            node.set('Address', address)
+            resource_nodes[address] = node
+        return response_info_node
@@ -0,0 +1,191 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+from Queue import Queue
+from collections import OrderedDict
+from threading import Thread
+
+from pluribus_virtualwire.cli.command_pipeline import CommandPipeline
+from pluribus_virtualwire.helpers import command_stats
+
+
+class Return(Exception):
+    """
+    Result of a coroutine, generators cannot return values
+    """
+
+    def __init__(self, value=None):
+        super(Return, self).__init__()
+        self.value = value
+
+
+class _Task(object):
+    def __init__(self, coroutine):
+        self.coroutine = coroutine
+        self.pipeline = None
+        self.running = False
+        self.done = False
+        self.result = None
+        self.error = None
+
+
+class _SessionWorker(object):
+    """
+    Thread executing batches of one session, results are put to the queue of the loop
+    """
+
+    def __init__(self, write, results):
+        self._write = write
+        self._results = results
+        self._batches = Queue()
+        self._scope = command_stats.current_scope()
+        self._thread = Thread(target=self._run, name='VWCommandLoopWorker')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def submit(self, tasks):
+        self._batches.put(tasks)
+
+    def stop(self):
+        self._batches.put(None)
+        self._thread.join()
+
+    def _run(self):
+        with command_stats.activate(self._scope):
+            while True:
+                tasks = self._batches.get()
+                if tasks is None:
+                    return
+                self._results.put((tasks,) + self._write(tasks))
+
+
+class CommandLoop(object):
+    """
+    Run generator based coroutines of the calling thread. A coroutine yields CommandPipeline and receives
+    outputs of its commands, or the command error is thrown into it; the result is raised with Return.
+    Pipelines of coroutines waiting for the same session are written at once. If coroutines use several sessions,
+    every session is driven by its own worker thread, so the sessions wait for the device in parallel;
+    the coroutines are resumed in the calling thread.
+
+    Example:
+        def board_table_async(self):
+            outputs = yield CommandPipeline(self._cli_service, self._logger).add(SWITCH_INFO).add(SWITCH_SETUP)
+            raise Return(parse(outputs))
+    """
+
+    def __init__(self, logger):
+        """
+        :param logger:
+        :type logger: Logger
+        """
+        self._logger = logger
+
+    def run_sync(self, coroutine):
+        return self.run(coroutine)[0]
+
+    def run(self, *coroutines):
+        """
+        Run coroutines to completion
+        :return: results in order of coroutines
+        :rtype: list
+        :raises Exception: the first coroutine error, raised when all coroutines completed
+        """
+        tasks = [_Task(coroutine) for coroutine in coroutines]
+        for task in tasks:
+            self._advance(task)
+        workers = {}
+        results = Queue()
+        try:
+            while not all(task.done for task in tasks):
+                groups = self._waiting_groups(tasks)
+                if len(groups) == 1 and not workers:
+                    # Single session, written by the calling thread
+                    self._complete(groups[0], *self._write(groups[0]))
+                    continue
+                for group in groups:
+                    session_id = id(group[0].pipeline.cli_service)
+                    if session_id not in workers:
+                        workers[session_id] = _SessionWorker(self._write, results)
+                    for task in group:
+                        task.running = True
+                    workers[session_id].submit(group)
+                self._complete(*results.get())
+        finally:
+            for worker in workers.values():
+                worker.stop()
+        for task in tasks:
+            if task.error:
+                raise task.error
+        return [task.result for task in tasks]
+
+    @staticmethod
+    def _waiting_groups(tasks):
+        """
+        Tasks waiting for a session which is not busy with a previous batch, grouped by session
+        """
+        busy = set(id(task.pipeline.cli_service) for task in tasks if task.running)
+        groups = OrderedDict()
+        for task in tasks:
+            if task.pipeline is not None and not task.running and not task.done:
+                session_id = id(task.pipeline.cli_service)
+                if session_id not in busy:
+                    groups.setdefault(session_id, []).append(task)
+        return groups.values()
+
+    def _write(self, tasks):
+        """
+        Write pipelines of the tasks waiting for the same session at once
+        :return: outputs and error of the batch
+        :rtype: tuple
+        """
+        command_pipeline = CommandPipeline(tasks[0].pipeline.cli_service, self._logger)
+        for task in tasks:
+            command_pipeline.extend(task.pipeline)
+        try:
+            return command_pipeline.execute(raise_on_error=False), None
+        except Exception as e:
+            return None, e
+
+    def _complete(self, tasks, results, error):
+        """
+        Resume the tasks of a written batch
+        """
+        for task in tasks:
+            task.running = False
+        if error:
+            for task in tasks:
+                self._advance(task, error=error)
+        else:
+            self._dispatch(tasks, results)
+
+    def _dispatch(self, tasks, results):
+        start = 0
+        for task in tasks:
+            end = start + len(task.pipeline)
+            errors = [result for result in results[start:end] if isinstance(result, Exception)]
+            if errors:
+                self._advance(task, error=errors[0])
+            else:
+                self._advance(task, results[start:end])
+            start = end
+
+    def _advance(self, task, value=None, error=None):
+        """
+        Resume the coroutine up to the next pipeline or completion
+        """
+        task.pipeline = None
+        try:
+            if error:
+                pipeline = task.coroutine.throw(error)
+            else:
+                pipeline = task.coroutine.send(value)
+        except Return as e:
+            task.done, task.result = True, e.value
+        except StopIteration:
+            task.done = True
+        except Exception as e:
+            task.done, task.error = True, e
+        else:
+            if isinstance(pipeline, CommandPipeline):
+                task.pipeline = pipeline
+            else:
+                task.done, task.error = True, TypeError('Coroutine has to yield CommandPipeline')
@@ -0,0 +1,139 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import re
+import time
+
+from cloudshell.cli.session.session_exceptions import CommandExecutionException, ExpectedSessionException
+from pluribus_virtualwire.cli.vw_command_template_executor import VWCommandTemplateExecutor, command_timeouts
+from pluribus_virtualwire.helpers import command_stats
+
+
+class CommandPipeline(object):
+    """
+    Execute independent command templates in one batch, if the session supports pipelining,
+    otherwise one by one
+    """
+
+    def __init__(self, cli_service, logger):
+        """
+        :param cli_service:
+        :type cli_service: cloudshell.cli.cli_service.CliService
+        :param logger:
+        :type logger: Logger
+        """
+        self._cli_service = cli_service
+        self._logger = logger
+        self._commands = []
+        self._start_time = None
+
+    def add(self, command_template, **command_kwargs):
+        """
+        :type command_template: cloudshell.cli.command_template.command_template.CommandTemplate
+        :return: self
+        :rtype: CommandPipeline
+        """
+        self._commands.append((command_template, command_kwargs))
+        return self
+
+    def extend(self, command_pipeline):
+        """
+        Append commands of another pipeline
+        :type command_pipeline: CommandPipeline
+        :return: self
+        :rtype: CommandPipeline
+        """
+        self._commands.extend(command_pipeline._commands)
+        return self
+
+    def __len__(self):
+        return len(self._commands)
+
+    @property
+    def cli_service(self):
+        return self._cli_service
+
+    def supports_pipelining(self):
+        """
+        Commands can be written to the session at once
+        """
+        session = getattr(self._cli_service, 'session', None)
+        return hasattr(session, 'start_commands') and not any(
+            command_template.action_map for command_template, _ in self._commands)
+
+    def _is_pipelined(self):
+        return len(self._commands) > 1 and self.supports_pipelining()
+
+    @staticmethod
+    def _check_errors(output, error_map):
+        for error_pattern, error in error_map.iteritems():
+            if re.search(error_pattern, output, re.DOTALL):
+                if isinstance(error, CommandExecutionException):
+                    return error
+                return CommandExecutionException('Session returned \'{}\''.format(error))
+
+    def execute(self, raise_on_error=True):
+        """
+        :param raise_on_error: raise the first command error, otherwise the failed command result is the exception
+        :return: outputs in order of added commands
+        :rtype: list
+        """
+        if not self._is_pipelined():
+            return [self._execute_command(command_template, command_kwargs, raise_on_error)
+                    for command_template, command_kwargs in self._commands]
+        batch = self.start()
+        try:
+            batch.wait()
+        except ExpectedSessionException:
+            timeouts = command_timeouts(self._cli_service)
+            if timeouts:
+                for name in self._template_names():
+                    timeouts.timed_out(name)
+            raise
+        return self.complete(batch.outputs(), raise_on_error)
+
+    def _template_names(self):
+        return [command_stats.template_name(command_template) for command_template, _ in self._commands]
+
+    def start(self):
+        """
+        Write all commands at once, the session has to support pipelining
+        :rtype: pluribus_virtualwire.cli.pipeline_session.PipelinedBatch
+        """
+        commands = [command_template.prepare_command(**command_kwargs)
+                    for command_template, command_kwargs in self._commands]
+        timeouts = command_timeouts(self._cli_service)
+        # Commands are executed one after another, the batch may take the sum of their timeouts
+        timeout = sum(map(timeouts.timeout, self._template_names())) if timeouts else None
+        self._start_time = time.time()
+        return self._cli_service.session.start_commands(commands, self._cli_service.command_mode.prompt,
+                                                        self._logger, timeout)
+
+    def complete(self, outputs, raise_on_error=True):
+        """
+        Check outputs of the started batch for errors
+        :param outputs: outputs of the batch
+        :type outputs: list
+        :rtype: list
+        """
+        # Pipelined commands share the batch time
+        elapsed = (time.time() - self._start_time) / len(self._commands)
+        timeouts = command_timeouts(self._cli_service)
+        results = []
+        for (command_template, _), output in zip(self._commands, outputs):
+            name = command_stats.template_name(command_template)
+            command_stats.record(name, elapsed)
+            if timeouts:
+                timeouts.observe(name, elapsed)
+            error = self._check_errors(output, command_template.error_map)
+            if error and raise_on_error:
+                raise error
+            results.append(error or output)
+        return results
+
+    def _execute_command(self, command_template, command_kwargs, raise_on_error):
+        try:
+            return VWCommandTemplateExecutor(self._cli_service, command_template).execute_command(**command_kwargs)
+        except CommandExecutionException as e:
+            if raise_on_error:
+                raise
+            return e
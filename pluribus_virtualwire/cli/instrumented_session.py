@@ -0,0 +1,16 @@
+from pluribus_virtualwire.helpers import command_stats
+
+
+class InstrumentedSessionMixin(object):
+    """
+    Count writes and received bytes of expect sessions in the driver command stats
+    """
+
+    def _send(self, command, logger):
+        command_stats.count_round_trip()
+        return super(InstrumentedSessionMixin, self)._send(command, logger)
+
+    def _receive(self, timeout, logger):
+        data = super(InstrumentedSessionMixin, self)._receive(timeout, logger)
+        command_stats.count_bytes(len(data))
+        return data
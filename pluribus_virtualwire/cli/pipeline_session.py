@@ -0,0 +1,105 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import re
+import time
+
+from cloudshell.cli.helper.normalize_buffer import normalize_buffer
+from cloudshell.cli.session.session_exceptions import ExpectedSessionException, SessionReadTimeout, \
+    SessionReadEmptyData
+from pluribus_virtualwire.cli.tail_match_session import TailWindowBuffer
+
+
+class PipelinedBatch(object):
+    """
+    Output of commands written at once, read incrementally until every command ends with the prompt
+    """
+
+    def __init__(self, session, commands, expected_string, logger, timeout):
+        """
+        :type session: PipelineSessionMixin
+        :type commands: list
+        :param expected_string: prompt regex
+        :type expected_string: str
+        :param timeout: timeout of the whole batch
+        """
+        self.session = session
+        self._commands = commands
+        self._expected_string = expected_string
+        self._logger = logger
+        self._deadline = time.time() + timeout
+        self._output = TailWindowBuffer()
+        self._prompts = []
+
+    @property
+    def done(self):
+        return len(self._prompts) >= len(self._commands)
+
+    @property
+    def remaining(self):
+        """
+        Seconds left to the batch timeout
+        """
+        remaining = self._deadline - time.time()
+        if remaining <= 0:
+            raise ExpectedSessionException(self.session.__class__.__name__,
+                                           'Pipelined commands timeout, {0} of {1} completed'.format(
+                                               len(self._prompts), len(self._commands)))
+        return remaining
+
+    def receive(self, timeout):
+        """
+        Read available output once
+        :param timeout: read timeout in seconds
+        """
+        try:
+            read_buffer = self.session._receive(timeout, self._logger)
+        except SessionReadTimeout:
+            return
+        except SessionReadEmptyData:
+            raise ExpectedSessionException(self.session.__class__.__name__,
+                                           'Session closed during pipelined commands')
+        self._output.feed(normalize_buffer(read_buffer))
+        self._prompts.extend(self._output.finditer(self._expected_string,
+                                                   start=self._prompts[-1].end() if self._prompts else 0))
+
+    def wait(self):
+        while not self.done:
+            self.receive(self.remaining)
+
+    def outputs(self):
+        """
+        :return: output of every command ending with the prompt
+        :rtype: list
+        """
+        self._logger.debug(self._output.getvalue())
+        outputs = []
+        start = 0
+        for command, prompt in zip(self._commands, self._prompts):
+            output = self._output.getvalue(start, prompt.end())
+            outputs.append(re.sub(self.session._generate_command_pattern(command), '', output, count=1,
+                                  flags=re.MULTILINE))
+            start = prompt.end()
+        return outputs
+
+
+class PipelineSessionMixin(object):
+    """
+    Pipelined execution for expect sessions, a batch of commands is written at once and the output is split
+    back to the commands by the prompt boundaries
+    """
+
+    def start_commands(self, commands, expected_string, logger, timeout=None):
+        """
+        Send commands in one write without waiting for the output
+        :param commands: independent commands, none of them may change the prompt
+        :type commands: list
+        :param expected_string: prompt regex, matched line by line
+        :type expected_string: str
+        :param logger:
+        :param timeout: timeout of the whole batch
+        :rtype: PipelinedBatch
+        """
+        self._clear_buffer(self._clear_buffer_timeout, logger)
+        logger.debug('Pipelined commands: {}'.format(', '.join(commands)))
+        self._send(''.join(command + self._new_line for command in commands), logger)
+        return PipelinedBatch(self, commands, expected_string, logger, timeout or self._timeout)
@@ -0,0 +1,65 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import re
+
+from cloudshell.cli.cli_service_impl import CliServiceImpl
+from cloudshell.cli.helper.normalize_buffer import normalize_buffer
+from cloudshell.cli.session_pool_context_manager import SessionPoolContextManager
+
+
+class PromptTrackingSessionMixin(object):
+    """
+    Keep the tail of the received data and the command mode entered on the connection
+    """
+    TAIL_SIZE = 256
+
+    received_tail = ''
+    entered_command_mode = None
+
+    def _receive(self, timeout, logger):
+        data = super(PromptTrackingSessionMixin, self)._receive(timeout, logger)
+        self.received_tail = (self.received_tail + data)[-self.TAIL_SIZE:]
+        return data
+
+    def at_prompt(self, prompt):
+        """
+        The last received data ends with the prompt, checked without a round trip
+        :param prompt: prompt regex
+        :rtype: bool
+        """
+        return bool(re.search(r'(?:{})\s*$'.format(prompt), normalize_buffer(self.received_tail)))
+
+
+class StickyCliService(CliServiceImpl):
+    """
+    CLI service which enters the command mode and runs its enter actions once per connection,
+    a pooled session still at the prompt of the requested mode is used without probing it
+    """
+
+    def _initialize(self, requested_command_mode):
+        session = self.session
+        if session.entered_command_mode is requested_command_mode and session.at_prompt(
+                requested_command_mode.prompt):
+            self.command_mode = requested_command_mode
+            return
+        session.entered_command_mode = None
+        CliServiceImpl._initialize(self, requested_command_mode)
+        session.entered_command_mode = self.command_mode
+
+    def _change_mode(self, requested_command_mode):
+        CliServiceImpl._change_mode(self, requested_command_mode)
+        self.session.entered_command_mode = self.command_mode
+
+
+class StickySessionPoolContextManager(SessionPoolContextManager):
+    """
+    Pooled session context manager creating StickyCliService, the mode state is reset after reconnect
+    """
+
+    def _initialize_cli_service(self, session, prompt):
+        try:
+            return StickyCliService(session, self._command_mode, self._logger)
+        except Exception:
+            session.entered_command_mode = None
+            session.reconnect(prompt, self._logger)
+            return StickyCliService(session, self._command_mode, self._logger)
@@ -0,0 +1,139 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import re
+import time
+
+from cloudshell.cli.helper.normalize_buffer import normalize_buffer
+from cloudshell.cli.session.session_exceptions import CommandExecutionException, ExpectedSessionException, \
+    SessionLoopLimitException, SessionReadEmptyData, SessionReadTimeout
+
+
+class TailWindowBuffer(object):
+    """
+    Received output accumulated in a bytearray, patterns are searched in the last received data
+    and a bounded window before it, so matches split between reads are found
+    """
+    WINDOW = 4096
+
+    def __init__(self, window=WINDOW):
+        """
+        :param window: bytes of already scanned data searched again, longer matches are not found
+        :type window: int
+        """
+        self.data = bytearray()
+        self._window = window
+        self._scan_start = 0
+
+    def feed(self, data):
+        """
+        :param data: received data
+        :type data: str
+        """
+        self._scan_start = max(0, len(self.data) - self._window)
+        self.data.extend(data)
+
+    def search(self, pattern, flags=0, start=0):
+        """
+        Search the last received data
+        :param pattern: regex
+        :param start: do not search before this position
+        :rtype: re.MatchObject
+        """
+        return re.compile(pattern, flags).search(self.data, max(self._scan_start, start))
+
+    def finditer(self, pattern, flags=0, start=0):
+        return re.compile(pattern, flags).finditer(self.data, max(self._scan_start, start))
+
+    def getvalue(self, start=0, end=None):
+        """
+        :rtype: str
+        """
+        return str(self.data[start:end])
+
+    def __len__(self):
+        return len(self.data)
+
+
+class TailMatchSessionMixin(object):
+    """
+    Expect loop for commands without actions which does not re-scan the whole output on every read:
+    the prompt, the command echo and errors are searched in TailWindowBuffer
+    """
+
+    def hardware_expect(self, command, expected_string, logger, action_map=None, error_map=None, timeout=None,
+                        retries=None, check_action_loop_detector=True, empty_loop_timeout=None,
+                        remove_command_from_output=True, **optional_args):
+        if command is None or action_map:
+            # Connection and mode actions use the generic loop
+            return super(TailMatchSessionMixin, self).hardware_expect(
+                command, expected_string, logger, action_map=action_map, error_map=error_map, timeout=timeout,
+                retries=retries, check_action_loop_detector=check_action_loop_detector,
+                empty_loop_timeout=empty_loop_timeout, remove_command_from_output=remove_command_from_output,
+                **optional_args)
+        if not expected_string:
+            raise ExpectedSessionException(self.__class__.__name__, 'List of expected messages can\'t be empty!')
+        error_map = error_map or {}
+        retries = retries or self._max_loop_retries
+        empty_loop_timeout = empty_loop_timeout or self._empty_loop_timeout
+
+        self._clear_buffer(self._clear_buffer_timeout, logger)
+        logger.debug('Command: {}'.format(command))
+        self.send_line(command, logger)
+
+        output = TailWindowBuffer()
+        command_pattern = self._generate_command_pattern(command) if remove_command_from_output else None
+        command_match = None
+        errors = set()
+        retries_count = 0
+        while True:
+            read_buffer = self._receive_all(timeout, logger)
+            if not read_buffer:
+                retries_count += 1
+                if retries and retries_count >= retries:
+                    raise SessionLoopLimitException(self.__class__.__name__,
+                                                    'Session Loop limit exceeded, {} loops'.format(retries_count))
+                time.sleep(empty_loop_timeout)
+                continue
+            retries_count = 0
+            read_buffer = normalize_buffer(read_buffer)
+            logger.debug(read_buffer)
+            output.feed(read_buffer)
+            if command_pattern and not command_match:
+                command_match = output.search(command_pattern, re.MULTILINE)
+            # Command echo is not a part of the output checked for errors
+            output_start = command_match.end() if command_match else 0
+            for error_pattern in error_map:
+                if error_pattern not in errors and output.search(error_pattern, re.DOTALL, output_start):
+                    errors.add(error_pattern)
+            if output.search(expected_string, re.DOTALL, output_start):
+                break
+
+        if command_match:
+            result_output = output.getvalue(0, command_match.start()) + output.getvalue(command_match.end())
+        else:
+            result_output = output.getvalue()
+        for error_pattern, error in error_map.iteritems():
+            if error_pattern in errors:
+                if isinstance(error, CommandExecutionException):
+                    raise error
+                raise CommandExecutionException('Session returned \'{}\''.format(error))
+
+        result_output += self._clear_buffer(self._clear_buffer_timeout, logger)
+        return result_output
+
+    def _receive_all(self, timeout, logger):
+        """
+        Read as much as possible before the read timeout, chunks are joined once
+        """
+        if not timeout:
+            timeout = self._timeout
+        start_time = time.time()
+        chunks = []
+        while True:
+            try:
+                chunks.append(self._receive(0.1, logger))
+            except (SessionReadTimeout, SessionReadEmptyData):
+                if chunks:
+                    return ''.join(chunks)
+                elif time.time() - start_time > timeout:
+                    raise ExpectedSessionException(self.__class__.__name__, 'Socket closed by timeout')
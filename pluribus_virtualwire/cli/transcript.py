@@ -0,0 +1,240 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import gzip
+import json
+import os
+import threading
+import time
+from collections import deque
+
+from cloudshell.cli.session.session_exceptions import ExpectedSessionException, SessionReadTimeout
+from cloudshell.cli.session.telnet_session import TelnetSession
+
+REDACTED_USERNAME = '<username>'
+REDACTED_PASSWORD = '<password>'
+
+
+def transcript_path(file_path, address):
+    """
+    :param file_path: transcript file, '{address}' is replaced by the device address, relative to the Logs folder
+    :param address: device address
+    :rtype: str
+    """
+    file_path = file_path.format(address=address)
+    if not os.path.isabs(file_path):
+        file_path = os.path.join(os.environ.get('LOG_PATH', '.'), file_path)
+    return file_path
+
+
+def redact(command, output, username=None, password=None):
+    """
+    Replace credentials written to the device, the output of such command is redacted too, it may echo them
+    :return: command and output
+    :rtype: tuple
+    """
+    if not command:
+        return command, output
+    if password and password in command:
+        return command.replace(password, REDACTED_PASSWORD), output.replace(password, REDACTED_PASSWORD)
+    if username and command.strip() == username:
+        return command.replace(username, REDACTED_USERNAME), output.replace(username, REDACTED_USERNAME)
+    return command, output
+
+
+def _open(file_path, mode):
+    if file_path.endswith('.gz'):
+        return gzip.open(file_path, mode)
+    return open(file_path, mode)
+
+
+class TranscriptRecorder(object):
+    """
+    Append exchanges of CLI sessions to a transcript file, a JSON object per line, gzip compressed if the file
+    name ends with .gz. Raw data is stored as latin-1 text, so any byte is kept as is
+    """
+
+    def __init__(self, file_path):
+        self._file_path = file_path
+        self._file = None
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def record(self, command, output, elapsed):
+        """
+        :param command: data written to the session, None for the output read on connection
+        :param output: data read after the command until the next write
+        :param elapsed: seconds from the write to the last read
+        """
+        line = json.dumps({'command': command.decode('latin-1') if command is not None else None,
+                           'output': output.decode('latin-1'),
+                           'elapsed': round(elapsed, 6)}, separators=(',', ':'))
+        with self._lock:
+            if self._closed:
+                return
+            if not self._file:
+                directory = os.path.dirname(self._file_path)
+                if directory and not os.path.isdir(directory):
+                    os.makedirs(directory)
+                self._file = _open(self._file_path, 'ab')
+            self._file.write(line + '\n')
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            if self._file:
+                self._file.close()
+                self._file = None
+
+
+class Transcript(object):
+    """
+    Recorded outputs by command, a command gets its outputs in the recorded order, the last one repeats
+    """
+
+    def __init__(self, exchanges=()):
+        """
+        :param exchanges: (command, output, elapsed)
+        """
+        self._responses = {}
+        self._lock = threading.Lock()
+        for command, output, elapsed in exchanges:
+            self._responses.setdefault(command, deque()).append((output, elapsed))
+
+    @classmethod
+    def load(cls, file_path):
+        """
+        :rtype: Transcript
+        """
+        exchanges = []
+        with _open(file_path, 'rb') as transcript_file:
+            for line in transcript_file:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                command = record['command']
+                exchanges.append((command.encode('latin-1') if command is not None else None,
+                                  record['output'].encode('latin-1'), record['elapsed']))
+        return cls(exchanges)
+
+    def response(self, command):
+        """
+        :param command: redacted command
+        :return: output and elapsed seconds, None if the command is not recorded
+        :rtype: tuple
+        """
+        with self._lock:
+            responses = self._responses.get(command)
+            if not responses:
+                return None
+            return responses.popleft() if len(responses) > 1 else responses[0]
+
+
+class _Exchange(object):
+    def __init__(self, command):
+        self.command = command
+        self.chunks = []
+        self.start_time = self.end_time = time.time()
+
+    def add(self, data):
+        self.chunks.append(data)
+        self.end_time = time.time()
+
+
+class TranscriptRecordingSessionMixin(object):
+    """
+    Record every write and the data read after it until the next write to the transcript recorder of the session,
+    data read on connection is recorded with the None command
+    """
+    transcript_recorder = None
+    _transcript_exchange = None
+
+    def connect(self, prompt, logger):
+        if self.transcript_recorder:
+            self._record_exchange()
+            self._transcript_exchange = _Exchange(None)
+        return super(TranscriptRecordingSessionMixin, self).connect(prompt, logger)
+
+    def disconnect(self):
+        self._record_exchange()
+        return super(TranscriptRecordingSessionMixin, self).disconnect()
+
+    def _send(self, command, logger):
+        if self.transcript_recorder:
+            self._record_exchange()
+            self._transcript_exchange = _Exchange(command)
+        return super(TranscriptRecordingSessionMixin, self)._send(command, logger)
+
+    def _receive(self, timeout, logger):
+        data = super(TranscriptRecordingSessionMixin, self)._receive(timeout, logger)
+        if self._transcript_exchange:
+            self._transcript_exchange.add(data)
+        return data
+
+    def _record_exchange(self):
+        exchange, self._transcript_exchange = self._transcript_exchange, None
+        if exchange and self.transcript_recorder:
+            command, output = redact(exchange.command, ''.join(exchange.chunks), self.username, self.password)
+            self.transcript_recorder.record(command, output, exchange.end_time - exchange.start_time)
+
+
+class TranscriptReplaySession(TelnetSession):
+    """
+    Session answering writes with the outputs of the transcript instead of the device, it connects
+    like a telnet session. Output of a command is available after its recorded time multiplied by the time scale
+    """
+    SESSION_TYPE = 'REPLAY'
+
+    transcript = None
+    time_scale = 1.0
+
+    def __init__(self, *args, **kwargs):
+        super(TranscriptReplaySession, self).__init__(*args, **kwargs)
+        self._pending = deque()
+        self._last_line = ''
+
+    def _initialize_session(self, prompt, logger):
+        if not self.transcript:
+            raise ExpectedSessionException(self.__class__.__name__, 'Transcript is not defined')
+        self._queue(None, logger)
+
+    def disconnect(self):
+        self._pending.clear()
+        self._active = False
+
+    def _lookup(self, command, logger):
+        response = self.transcript.response(redact(command, '', self.username, self.password)[0])
+        if response:
+            return response
+        if command is None:
+            raise ExpectedSessionException(self.__class__.__name__, 'Transcript has no connection output')
+        lines = command.split(self._new_line)
+        if len(lines) > 2:
+            # Commands written at once, recorded separately
+            responses = [self._lookup(line + self._new_line, logger) for line in lines[:-1]]
+            return ''.join(output for output, _ in responses), sum(elapsed for _, elapsed in responses)
+        logger.warning('Command {} is not recorded, echoed with the last prompt'.format(repr(command)))
+        return command.rstrip(self._new_line) + '\r\n' + self._last_line, 0
+
+    def _queue(self, command, logger):
+        output, elapsed = self._lookup(command, logger)
+        self._last_line = output.rsplit('\n', 1)[-1]
+        self._pending.append((time.time() + elapsed * self.time_scale, output))
+
+    def _send(self, command, logger):
+        self._queue(command, logger)
+
+    def _receive(self, timeout, logger):
+        timeout = timeout or self._timeout
+        if not self._pending:
+            time.sleep(timeout * self.time_scale)
+            raise SessionReadTimeout()
+        ready_time, output = self._pending[0]
+        delay = ready_time - time.time()
+        if delay > timeout:
+            time.sleep(timeout)
+            raise SessionReadTimeout()
+        if delay > 0:
+            time.sleep(delay)
+        self._pending.popleft()
+        return output
@@ -1,14 +1,18 @@
 #!/usr/bin/python
 # -*- coding: utf-8 -*-
 
-from cloudshell.cli.cli import CLI
 from cloudshell.cli.command_mode_helper import CommandModeHelper
-from cloudshell.cli.session.telnet_session import TelnetSession
-from cloudshell.cli.session_pool_manager import SessionPoolManager
-from cloudshell.layer_one.core.helper.runtime_configuration import RuntimeConfiguration
+from cloudshell.cli.session_pool_context_manager import SessionPoolContextManager
 from cloudshell.layer_one.core.layer_one_driver_exception import LayerOneDriverException
 from pluribus_virtualwire.cli.command_modes import DefaultCommandMode
+from pluribus_virtualwire.cli.sticky_mode import StickySessionPoolContextManager
+from pluribus_virtualwire.cli.transcript import Transcript, TranscriptRecorder, transcript_path
+from pluribus_virtualwire.cli.vw_replay_session import VWReplaySession
+from pluribus_virtualwire.cli.vw_session_pool_manager import VWSessionPoolManager
 from pluribus_virtualwire.cli.vw_ssh_session import VWSSHSession
+from pluribus_virtualwire.cli.vw_telnet_session import VWTelnetSession
+from pluribus_virtualwire.helpers.command_stats import TimedContextManager
+from pluribus_virtualwire.helpers.command_timeouts import AdaptiveTimeouts
 
 
 class VWCliHandler(object):
@@ -19,14 +23,25 @@ class VWCliHandler(object):
         """
         self._logger = logger
         self._runtime_config = runtime_config
-        self._cli = CLI(session_pool=SessionPoolManager(max_pool_size=1))
+        self._session_pool = VWSessionPoolManager(
+            self._logger,
+            max_pool_size=self._runtime_config.read_key('CLI.POOL_SIZE', VWSessionPoolManager.MAX_POOL_SIZE),
+            pool_timeout=self._runtime_config.read_key('CLI.POOL_TIMEOUT', VWSessionPoolManager.POOL_TIMEOUT),
+            idle_timeout=self._runtime_config.read_key('CLI.IDLE_TIMEOUT', VWSessionPoolManager.IDLE_TIMEOUT),
+            keep_alive_interval=self._runtime_config.read_key('CLI.KEEP_ALIVE',
+                                                              VWSessionPoolManager.KEEP_ALIVE_INTERVAL))
+        self._sticky_mode = self._runtime_config.read_key('CLI.STICKY_MODE', True)
         self.modes = CommandModeHelper.create_command_mode()
         self._defined_session_types = {VWSSHSession.SESSION_TYPE: VWSSHSession,
-                                       TelnetSession.SESSION_TYPE: TelnetSession}
+                                       VWTelnetSession.SESSION_TYPE: VWTelnetSession,
+                                       VWReplaySession.SESSION_TYPE: VWReplaySession}
 
         self._session_types = self._runtime_config.read_key(
-            'CLI.TYPE', [VWSSHSession.SESSION_TYPE]) or self._defined_session_types.keys()
-        self._ports = RuntimeConfiguration().read_key('CLI.PORTS', {})
+            'CLI.TYPE', [VWSSHSession.SESSION_TYPE]) or [VWSSHSession.SESSION_TYPE, VWTelnetSession.SESSION_TYPE]
+        self._ports = self._runtime_config.read_key('CLI.PORTS', {})
+        self.command_timeouts = AdaptiveTimeouts.from_runtime_config(self._runtime_config)
+        self._transcript_recorder = None
+        self._replay_transcript = None
 
         self._host = None
         self._username = None
@@ -40,7 +55,15 @@ class VWCliHandler(object):
                 raise LayerOneDriverException(self.__class__.__name__,
                                               'Session type {} is not defined'.format(session_type))
             port = self._ports.get(session_type)
-            sessions.append(session_class(self._host, self._username, self._password, port))
+            session = session_class(self._host, self._username, self._password, port)
+            # Shared by all sessions of the device, used by the command template executor
+            session.command_timeouts = self.command_timeouts
+            if isinstance(session, VWReplaySession):
+                session.transcript = self._replay_transcript
+                session.time_scale = self._runtime_config.read_key('CLI.TRANSCRIPT.TIME_SCALE', 1)
+            else:
+                session.transcript_recorder = self._transcript_recorder
+            sessions.append(session)
         return sessions
 
     def define_session_attributes(self, address, username, password):
@@ -60,6 +83,20 @@ class VWCliHandler(object):
         self._username = username
         self._password = password
         self._default_mode.set_credentials(username, password)
+        self._open_transcripts()
+
+    def _open_transcripts(self):
+        """
+        Recorder of the CLI exchanges and the transcript replayed by REPLAY sessions, if configured
+        """
+        record_file = self._runtime_config.read_key('CLI.TRANSCRIPT.RECORD', None)
+        if record_file and not self._transcript_recorder:
+            self._transcript_recorder = TranscriptRecorder(transcript_path(record_file, self._host))
+        replay_file = self._runtime_config.read_key('CLI.TRANSCRIPT.REPLAY', None)
+        if VWReplaySession.SESSION_TYPE in self._session_types and not self._replay_transcript:
+            if not replay_file:
+                raise LayerOneDriverException(self.__class__.__name__, 'CLI.TRANSCRIPT.REPLAY is not defined')
+            self._replay_transcript = Transcript.load(transcript_path(replay_file, self._host))
 
     def get_cli_service(self, command_mode):
         """
@@ -70,7 +107,32 @@ class VWCliHandler(object):
         if not self._host or not self._username or not self._password:
             raise LayerOneDriverException(self.__class__.__name__,
                                           "Cli Attributes is not defined, call Login command first")
-        return self._cli.get_session(self._new_sessions(), command_mode, self._logger)
+        context_manager_class = StickySessionPoolContextManager if self._sticky_mode else SessionPoolContextManager
+        # Includes connection of a new session and enter actions of the mode
+        return TimedContextManager(context_manager_class(self._session_pool, self._new_sessions(), command_mode,
+                                                         self._logger), 'session.acquire')
+
+    def prewarm_sessions(self):
+        """
+        Open sessions up to the pool size, so the following commands do not wait for connection
+        """
+        prompt = r'|'.join(CommandModeHelper.defined_modes_by_prompt(self._default_mode).keys())
+        self._session_pool.prewarm(self._new_sessions, prompt, self._logger)
+
+    def has_idle_session(self):
+        """
+        Pool has a session which is not used by any command
+        :rtype: bool
+        """
+        return self._session_pool.has_idle_session()
+
+    def close(self):
+        """
+        Close pooled sessions
+        """
+        self._session_pool.close()
+        if self._transcript_recorder:
+            self._transcript_recorder.close()
 
     @property
     def _default_mode(self):
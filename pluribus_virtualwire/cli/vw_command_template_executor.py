@@ -0,0 +1,42 @@
+import time
+
+from cloudshell.cli.command_template.command_template_executor import CommandTemplateExecutor
+from cloudshell.cli.session.session_exceptions import CommandExecutionException, ExpectedSessionException
+from pluribus_virtualwire.helpers import command_stats
+
+
+def command_timeouts(cli_service):
+    """
+    Adaptive timeouts of the session, None for sessions of handlers without them
+    :rtype: pluribus_virtualwire.helpers.command_timeouts.AdaptiveTimeouts
+    """
+    return getattr(getattr(cli_service, 'session', None), 'command_timeouts', None)
+
+
+class VWCommandTemplateExecutor(CommandTemplateExecutor):
+    """
+    Command template executor recording latency of every command to the driver command stats
+    and running it under the adaptive timeout of the template
+    """
+
+    def execute_command(self, **command_kwargs):
+        name = command_stats.template_name(self._command_template)
+        timeouts = command_timeouts(self._cli_service)
+        if not timeouts:
+            with command_stats.timed(name):
+                return CommandTemplateExecutor.execute_command(self, **command_kwargs)
+        self.update_optional_kwargs(timeout=timeouts.timeout(name))
+        start_time = time.time()
+        try:
+            with command_stats.timed(name):
+                output = CommandTemplateExecutor.execute_command(self, **command_kwargs)
+        except CommandExecutionException:
+            # The switch answered with an error, it is a latency sample, not a hung session
+            timeouts.observe(name, time.time() - start_time)
+            raise
+        except ExpectedSessionException:
+            # Hung session, it is removed from the pool by the session context manager
+            timeouts.timed_out(name)
+            raise
+        timeouts.observe(name, time.time() - start_time)
+        return output
@@ -0,0 +1,10 @@
+from pluribus_virtualwire.cli.instrumented_session import InstrumentedSessionMixin
+from pluribus_virtualwire.cli.pipeline_session import PipelineSessionMixin
+from pluribus_virtualwire.cli.sticky_mode import PromptTrackingSessionMixin
+from pluribus_virtualwire.cli.tail_match_session import TailMatchSessionMixin
+from pluribus_virtualwire.cli.transcript import TranscriptReplaySession
+
+
+class VWReplaySession(PipelineSessionMixin, TailMatchSessionMixin, PromptTrackingSessionMixin,
+                      InstrumentedSessionMixin, TranscriptReplaySession):
+    pass
@@ -0,0 +1,168 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import time
+from threading import Thread, Event
+
+from cloudshell.cli.session_manager_impl import SessionManagerImpl
+from cloudshell.cli.session_pool_manager import SessionPoolManager
+from pluribus_virtualwire.helpers import command_stats
+
+
+class VWSessionManager(SessionManagerImpl):
+    """
+    Session manager which also counts sessions being connected outside of the pool lock
+    """
+
+    def __init__(self):
+        SessionManagerImpl.__init__(self)
+        self.reserved_count = 0
+
+    def existing_sessions_count(self):
+        return SessionManagerImpl.existing_sessions_count(self) + self.reserved_count
+
+
+class VWSessionPoolManager(SessionPoolManager):
+    """
+    Session pool which can be pre-filled, keeps idle sessions alive and closes sessions idle for too long
+    """
+    """Idle time after which pooled session is closed, 0 - never"""
+    IDLE_TIMEOUT = 0
+    """Interval between keep-alive probes of pooled sessions, 0 - disabled"""
+    KEEP_ALIVE_INTERVAL = 0
+
+    def __init__(self, logger, max_pool_size=SessionPoolManager.MAX_POOL_SIZE,
+                 pool_timeout=SessionPoolManager.POOL_TIMEOUT, idle_timeout=IDLE_TIMEOUT,
+                 keep_alive_interval=KEEP_ALIVE_INTERVAL):
+        """
+        :param logger:
+        :type logger: Logger
+        :param max_pool_size: max count of opened sessions
+        :type max_pool_size: int
+        :param pool_timeout: waiting session timeout
+        :type pool_timeout: int
+        :param idle_timeout: close pooled session not used during this time, seconds
+        :type idle_timeout: int
+        :param keep_alive_interval: probe pooled sessions with this interval, seconds
+        :type keep_alive_interval: int
+        """
+        SessionPoolManager.__init__(self, session_manager=VWSessionManager(), max_pool_size=max_pool_size,
+                                    pool_timeout=pool_timeout)
+        self._logger = logger
+        self._idle_timeout = idle_timeout
+        self._keep_alive_interval = keep_alive_interval
+        self._last_used = {}
+        self._prompts = {}
+        self._keep_alive_thread = None
+        self._stop_event = Event()
+
+    def has_idle_session(self):
+        return not self._pool.empty()
+
+    def prewarm(self, new_sessions_factory, prompt, logger):
+        """
+        Open sessions up to the pool size and put them to the pool. Best effort, sessions are connected without
+        holding the pool lock and pre-warming stops at the first session the device refuses
+        :param new_sessions_factory: callable returning list of new session objects
+        :param prompt:
+        :param logger:
+        """
+        while True:
+            with self._session_condition:
+                if self._session_manager.existing_sessions_count() >= self._pool.maxsize:
+                    return
+                self._session_manager.reserved_count += 1
+            try:
+                session = self._new_session(new_sessions_factory(), prompt, logger)
+            except Exception as e:
+                logger.warning('Failed to pre-warm session: {}'.format(e))
+                return
+            finally:
+                with self._session_condition:
+                    self._session_manager.reserved_count -= 1
+                    self._session_condition.notify()
+            self.return_session(session, logger)
+
+    def return_session(self, session, logger):
+        with self._session_condition:
+            self._last_used[session] = time.time()
+            SessionPoolManager.return_session(self, session, logger)
+        self._start_keep_alive()
+
+    def remove_session(self, session, logger):
+        with self._session_condition:
+            SessionPoolManager.remove_session(self, session, logger)
+            self._last_used.pop(session, None)
+            self._prompts.pop(session, None)
+        try:
+            session.disconnect()
+        except Exception as e:
+            logger.debug('Failed to disconnect session: {}'.format(e))
+
+    def _new_session(self, new_sessions, prompt, logger):
+        with command_stats.timed('session.connect'):
+            session = SessionPoolManager._new_session(self, new_sessions, prompt, logger)
+        self._prompts[session] = prompt
+        return session
+
+    def _get_from_pool(self, new_sessions, prompt, logger):
+        logger.debug('getting session from the pool')
+        session = self._pool.get(False)
+
+        if self._is_expired(session):
+            logger.debug('Session was idle for more than {} sec, creating new session'.format(self._idle_timeout))
+            self.remove_session(session, logger)
+            session = self._new_session(new_sessions, prompt, logger)
+        elif not self._session_manager.is_compatible(session, new_sessions, logger):
+            logger.debug('Session args was changed, creating session with new args')
+            self.remove_session(session, logger)
+            session = self._new_session(new_sessions, prompt, logger)
+        return session
+
+    def _is_expired(self, session):
+        return self._idle_timeout and time.time() - self._last_used.get(session, time.time()) > self._idle_timeout
+
+    def keep_alive(self):
+        """
+        Send empty line to every pooled session, close broken and expired sessions
+        """
+        with self._session_condition:
+            sessions = []
+            while not self._pool.empty():
+                sessions.append(self._pool.get(False))
+
+        for session in sessions:
+            if self._is_expired(session):
+                self._logger.debug('Closing session idle for more than {} sec'.format(self._idle_timeout))
+                self.remove_session(session, self._logger)
+                continue
+            try:
+                session.hardware_expect('', expected_string=self._prompts.get(session), logger=self._logger)
+            except Exception as e:
+                self._logger.debug('Keep-alive failed, removing session: {}'.format(e))
+                self.remove_session(session, self._logger)
+                continue
+            with self._session_condition:
+                self._pool.put(session)
+                self._session_condition.notify()
+
+    def _keep_alive_loop(self):
+        while not self._stop_event.wait(self._keep_alive_interval):
+            try:
+                self.keep_alive()
+            except Exception as e:
+                self._logger.debug('Keep-alive error: {}'.format(e))
+
+    def _start_keep_alive(self):
+        if self._keep_alive_interval and not self._keep_alive_thread:
+            self._keep_alive_thread = Thread(target=self._keep_alive_loop, name='VWSessionKeepAlive')
+            self._keep_alive_thread.daemon = True
+            self._keep_alive_thread.start()
+
+    def close(self):
+        """
+        Stop keep-alive and close pooled sessions
+        """
+        self._stop_event.set()
+        with self._session_condition:
+            while not self._pool.empty():
+                self.remove_session(self._pool.get(False), self._logger)
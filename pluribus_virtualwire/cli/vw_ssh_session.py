@@ -1,9 +1,13 @@
-import re
-
 from cloudshell.cli.session.ssh_session import SSHSession
+from pluribus_virtualwire.cli.instrumented_session import InstrumentedSessionMixin
+from pluribus_virtualwire.cli.pipeline_session import PipelineSessionMixin
+from pluribus_virtualwire.cli.sticky_mode import PromptTrackingSessionMixin
+from pluribus_virtualwire.cli.tail_match_session import TailMatchSessionMixin
+from pluribus_virtualwire.cli.transcript import TranscriptRecordingSessionMixin
 
 
-class VWSSHSession(SSHSession):
+class VWSSHSession(PipelineSessionMixin, TailMatchSessionMixin, PromptTrackingSessionMixin, InstrumentedSessionMixin,
+                   TranscriptRecordingSessionMixin, SSHSession):
     def _connect_actions(self, prompt, logger):
         self.hardware_expect(None, expected_string=prompt, timeout=self._timeout, logger=logger)
         # self.hardware_expect('switch-local', expected_string=prompt, timeout=self._timeout, logger=logger)
@@ -0,0 +1,11 @@
+from cloudshell.cli.session.telnet_session import TelnetSession
+from pluribus_virtualwire.cli.instrumented_session import InstrumentedSessionMixin
+from pluribus_virtualwire.cli.pipeline_session import PipelineSessionMixin
+from pluribus_virtualwire.cli.sticky_mode import PromptTrackingSessionMixin
+from pluribus_virtualwire.cli.tail_match_session import TailMatchSessionMixin
+from pluribus_virtualwire.cli.transcript import TranscriptRecordingSessionMixin
+
+
+class VWTelnetSession(PipelineSessionMixin, TailMatchSessionMixin, PromptTrackingSessionMixin, InstrumentedSessionMixin,
+                      TranscriptRecordingSessionMixin, TelnetSession):
+    pass
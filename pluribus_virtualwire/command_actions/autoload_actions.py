@@ -4,103 +4,121 @@ import os
 import re
 
 import pluribus_virtualwire.command_templates.autoload as command_template
-from cloudshell.cli.command_template.command_template_executor import CommandTemplateExecutor
+from pluribus_virtualwire.autoload.port_table import PortRecord
+from pluribus_virtualwire.cli.command_loop import CommandLoop, Return
+from pluribus_virtualwire.cli.command_pipeline import CommandPipeline
+from pluribus_virtualwire.cli.vw_command_template_executor import VWCommandTemplateExecutor
+from pluribus_virtualwire.helpers.associations_table import AssociationsTable
+from pluribus_virtualwire.helpers.parsable_output import ParsableOutput
+from pluribus_virtualwire.helpers.topology_cache import TopologyCache
 
 
 class AutoloadActions(object):
     """
     Autoload actions
     """
+    PORT_SHOW_PARSER = ParsableOutput(command_template.PORT_SHOW)
+    PHYS_PORT_SHOW_PARSER = ParsableOutput(command_template.PHYS_PORT_SHOW)
 
-    def __init__(self, cli_service, logger):
+    def __init__(self, cli_service, logger, topology_cache=None):
         """
         :param cli_service: default mode cli_service
         :type cli_service: CliService
         :param logger:
         :type logger: Logger
+        :param topology_cache: topology shared with other actions, filled with the tables read by autoload
+        :type topology_cache: TopologyCache
         :return:
         """
         self._cli_service = cli_service
         self._logger = logger
+        self._topology_cache = topology_cache or TopologyCache(logger)
+
+    def _run(self, coroutine):
+        return CommandLoop(self._logger).run_sync(coroutine)
 
     def board_table(self):
         """
         :rtype: dict
         """
-        board_table = {}
-        info_out = CommandTemplateExecutor(self._cli_service, command_template.SWITCH_INFO).execute_command()
-
-        board_table.update(self._parse_data(info_out.strip()))
+        return self._run(self.board_table_async())
 
-        sw_version_out = CommandTemplateExecutor(self._cli_service, command_template.SOFTWARE_VERSION).execute_command()
-        board_table.update(self._parse_data(sw_version_out.strip()))
-
-        sw_setup_out = CommandTemplateExecutor(self._cli_service, command_template.SWITCH_SETUP).execute_command()
-        board_table.update(self._parse_data(sw_setup_out.strip()))
+    def board_table_async(self):
+        """
+        Coroutine of board_table, run by CommandLoop
+        """
+        board_table = {}
+        outputs = yield CommandPipeline(self._cli_service, self._logger).add(command_template.SWITCH_INFO).add(
+            command_template.SOFTWARE_VERSION).add(command_template.SWITCH_SETUP)
+        for output in outputs:
+            board_table.update(self._parse_data(output.strip()))
+        raise Return(board_table)
 
-        return board_table
+    def software_version(self):
+        """
+        :rtype: str
+        """
+        output = VWCommandTemplateExecutor(self._cli_service, command_template.SOFTWARE_VERSION).execute_command()
+        return self._parse_data(output.strip()).get('version')
 
     def ports_table(self):
         """
+        :return: port records by logical id
         :rtype: dict
         """
+        return self._run(self.ports_table_async())
+
+    def ports_table_async(self):
+        """
+        Coroutine of ports_table, run by CommandLoop
+        """
         port_table = {}
-        logic_ports_output = CommandTemplateExecutor(self._cli_service,
-                                                     command_template.PORT_SHOW).execute_command()
-
-        phys_ports = self.phys_ports_table()
-        for record in re.findall(r'^\d+:.+:.+$', logic_ports_output, flags=re.MULTILINE):
-            port_id, speed, autoneg = re.split(r':', record.strip())
-            port_id = port_id
-            speed = speed
-            autoneg = autoneg
-            phys_id = phys_ports.get(port_id)
-            if phys_id:
-                port_table[port_id] = {'speed': speed, 'autoneg': autoneg, 'phys_id': phys_id}
+        generation = self._topology_cache.generation
+        logic_ports_output, phys_ports_output = yield CommandPipeline(self._cli_service, self._logger).add(
+            command_template.PORT_SHOW).add(command_template.PHYS_PORT_SHOW)
 
-        return port_table
+        phys_ports = self._parse_phys_ports(phys_ports_output, generation)
+        for record in self.PORT_SHOW_PARSER.records(logic_ports_output):
+            phys_id = phys_ports.get(record.port)
+            if phys_id:
+                port_table[record.port] = PortRecord(record.port, phys_id, record.speed, record.autoneg)
 
-    def phys_ports_table(self):
-        phys_ports_table = {}
-        phys_ports_output = CommandTemplateExecutor(self._cli_service,
-                                                    command_template.PHYS_PORT_SHOW).execute_command()
-        for record in re.findall(r'^\d+:.+$', phys_ports_output, flags=re.MULTILINE):
-            logical_id, phys_id = re.split(r':', record.strip())
-            phys_ports_table[logical_id] = phys_id
+        raise Return(port_table)
 
+    def _parse_phys_ports(self, phys_ports_output, generation):
+        phys_ports_table = {record.port: record.bezel_intf
+                            for record in self.PHYS_PORT_SHOW_PARSER.records(phys_ports_output)}
+        phys_to_logical = {phys_id: logical_id for logical_id, phys_id in phys_ports_table.iteritems()}
+        self._topology_cache.store(generation, phys_to_logical=phys_to_logical)
         return phys_ports_table
 
-    @staticmethod
-    def _parse_ports(ports):
-        port_list = []
-        single_records = ports.split(',')
-        for record in single_records:
-            if '-' in record:
-                start, end = map(int, record.split("-"))
-                range_list = map(str, range(start, end + 1))
-            else:
-                range_list = [record]
-            port_list.extend(range_list)
-        return port_list
-
     def _validate_port(self, port):
         if re.search(r'[-,]', port):
             raise Exception(self.__class__.__name__, 'Cannot build mappings, driver does not support port ranges')
 
     def associations_table(self):
+        return self._run(self.associations_table_async())
+
+    def associations_table_async(self):
+        """
+        Coroutine of associations_table, run by CommandLoop
+        """
         associations_table = {}
-        associations_output = CommandTemplateExecutor(self._cli_service,
-                                                      command_template.ASSOCIATIONS).execute_command()
-        for record in re.findall(r'^[\d,-]+:[\d,-]+:\w+$', associations_output, flags=re.MULTILINE):
-            master_ports, slave_ports, bidir = re.split(r':', record.strip())
+        generation = self._topology_cache.generation
+        associations_output, = yield CommandPipeline(self._cli_service, self._logger).add(
+            command_template.ASSOCIATIONS)
+        associations = AssociationsTable.parse(associations_output)
+        for attributes in associations.itervalues():
+            master_ports, slave_ports = attributes.get(AssociationsTable.PORTS)
             self._validate_port(master_ports)
             self._validate_port(slave_ports)
-            if bidir.lower() == 'true':
+            if attributes.get(AssociationsTable.BIDIR):
                 associations_table[master_ports] = slave_ports
                 associations_table[slave_ports] = master_ports
             else:
                 associations_table[slave_ports] = master_ports
-        return associations_table
+        self._topology_cache.store(generation, associations=associations)
+        raise Return(associations_table)
 
     @staticmethod
     def _parse_data(out):
@@ -1,30 +1,43 @@
-import re
-from copy import copy
-
 import pluribus_virtualwire.command_templates.mapping as command_template
-from cloudshell.cli.command_template.command_template_executor import CommandTemplateExecutor
+from pluribus_virtualwire.cli.command_pipeline import CommandPipeline
+from pluribus_virtualwire.helpers.associations_table import AssociationsTable
+from pluribus_virtualwire.helpers.mapping_plan import MappingPlan
+from pluribus_virtualwire.helpers.parsable_output import ParsableOutput
+from pluribus_virtualwire.helpers.topology_cache import TopologyCache
 
 
 class MappingActions(object):
-    PORTS = 'ports'
-    BIDIR = 'bidir'
-    MONITOR_PORTS = 'monitor_ports'
+    PORTS = AssociationsTable.PORTS
+    BIDIR = AssociationsTable.BIDIR
+    MONITOR_PORTS = AssociationsTable.MONITOR_PORTS
+
+    PHYS_TO_LOGICAL_PARSER = ParsableOutput(command_template.PHYS_TO_LOGICAL)
+    PORTS_STATE_PARSER = ParsableOutput(command_template.PORTS_STATE)
+    TABLE_TEMPLATES = {'phys_to_logical': command_template.PHYS_TO_LOGICAL,
+                       'ports_state': command_template.PORTS_STATE,
+                       'associations': command_template.ASSOCIATIONS}
 
     """
     Autoload actions
     """
 
-    def __init__(self, cli_service, logger):
+    def __init__(self, cli_service, logger, topology_cache=None, optimistic=False):
         """
         :param logger:
         :type logger: Logger
+        :param topology_cache: topology shared with other actions
+        :type topology_cache: TopologyCache
+        :param optimistic: send mappings without validating ports, the switch rejects invalid ones,
+            ports state and associations are read only to explain the error
+        :type optimistic: bool
         :return:
         """
         self._logger = logger
         self._cli_service = cli_service
+        self._topology_cache = topology_cache or TopologyCache(logger)
+        self._optimistic = optimistic
 
-        self.__associations_table = None
-        self.__phys_to_logical_table = None
+        self.__tables = {}
 
     @property
     def cli_service(self):
@@ -33,46 +46,69 @@ class MappingActions(object):
     @cli_service.setter
     def cli_service(self, cli_service):
         self._cli_service = cli_service
+        # Tables are used during one driver command, shared ones are taken from the topology cache again
+        self.__tables = {}
+
+    def _load_tables(self, ports_state=False, associations=False):
+        """
+        Read all missing tables required by the command in one pipeline. Shared tables are taken from the topology
+        cache, the ones read from the device are cached if the driver did not change them during the read
+        """
+        generation = self._topology_cache.generation
+        names = ['phys_to_logical']
+        if ports_state:
+            names.append('ports_state')
+        if associations:
+            names.append('associations')
+        missing_tables = []
+        for name in names:
+            if self.__tables.get(name) is None and name in TopologyCache.TABLES:
+                self.__tables[name] = getattr(self._topology_cache, name)
+            if self.__tables.get(name) is None:
+                missing_tables.append(name)
+        if not missing_tables:
+            return
+        command_pipeline = CommandPipeline(self._cli_service, self._logger)
+        for name in missing_tables:
+            command_pipeline.add(self.TABLE_TEMPLATES[name])
+        read_tables = {name: getattr(self, '_parse_{}_table'.format(name))(output)
+                       for name, output in zip(missing_tables, command_pipeline.execute())}
+        self.__tables.update(read_tables)
+        self._topology_cache.store(generation, **{name: table for name, table in read_tables.iteritems()
+                                                  if name in TopologyCache.TABLES})
 
     @staticmethod
-    def _parse_complex_ports(port_string):
-        ports = []
-        for port in port_string.split(','):
-            if '-' in port:
-                start, end = port.split('-')
-                ports.extend(map(str, range(int(start), int(end) + 1)))
-            elif port:
-                ports.append(port)
-        return ports
-
-    def _build_associations_table(self):
-        associations_table = {}
-        output = CommandTemplateExecutor(self._cli_service, command_template.ASSOCIATIONS).execute_command()
-        for master_port, slave_port, name, bidir, monitor_ports in re.findall(r'^(\d+):(\d+):([\w-]+):(\w+):([\d,-]*)$',
-                                                                              output, flags=re.MULTILINE):
-            associations_table[name] = {self.PORTS: [master_port, slave_port],
-                                        self.BIDIR: bidir.lower() == 'true',
-                                        self.MONITOR_PORTS: self._parse_complex_ports(monitor_ports)}
-        return associations_table
+    def _parse_associations_table(output):
+        return AssociationsTable.parse(output)
 
     @property
     def _associations_table(self):
-        if not self.__associations_table:
-            self.__associations_table = self._build_associations_table()
-        return self.__associations_table
+        """
+        :rtype: AssociationsTable
+        """
+        if self.__tables.get('associations') is None:
+            self._load_tables(associations=True)
+        return self.__tables['associations']
 
-    def _build_phys_to_logical_table(self):
-        logical_to_phys_dict = {}
-        output = CommandTemplateExecutor(self._cli_service, command_template.PHYS_TO_LOGICAL).execute_command()
-        for phys_id, logical_id in re.findall(r'^([\d.]+):(\d+)$', output, flags=re.MULTILINE):
-            logical_to_phys_dict[phys_id] = logical_id
-        return logical_to_phys_dict
+    @classmethod
+    def _parse_phys_to_logical_table(cls, output):
+        return {record.bezel_intf: record.port for record in cls.PHYS_TO_LOGICAL_PARSER.records(output)}
 
     @property
     def _phys_to_logical_table(self):
-        if not self.__phys_to_logical_table:
-            self.__phys_to_logical_table = self._build_phys_to_logical_table()
-        return self.__phys_to_logical_table
+        if self.__tables.get('phys_to_logical') is None:
+            self._load_tables()
+        return self.__tables['phys_to_logical']
+
+    @classmethod
+    def _parse_ports_state_table(cls, output):
+        return {record.intf: record.enable for record in cls.PORTS_STATE_PARSER.records(output)}
+
+    @property
+    def _ports_state_table(self):
+        if self.__tables.get('ports_state') is None:
+            self._load_tables(ports_state=True)
+        return self.__tables['ports_state']
 
     def _get_logical(self, phys_name):
         logical_id = self._phys_to_logical_table.get(phys_name)
@@ -82,9 +118,7 @@ class MappingActions(object):
             raise Exception(self.__class__.__name__, 'Cannot convert physical port name to logical')
 
     def _find_association(self, port):
-        for name, attributes in self._associations_table.iteritems():
-            if port in attributes.get(self.PORTS):
-                return name
+        return self._associations_table.find(port)
 
     # def _find_unidir_association(self, ports):
     #     for name, attributes in self._associations_table.iteritems():
@@ -93,114 +127,184 @@ class MappingActions(object):
     # def _find_monitor_association(self, port):
     #     for name, attributes in self._associations_table.iteritems():
 
+    @staticmethod
+    def _exception_message(exception):
+        if len(exception.args) > 1:
+            return exception.args[1]
+        elif len(exception.args) == 1:
+            return exception.args[0]
+
+    def _execute_plan(self, mapping_plan):
+        """
+        Send commands of the plan and apply succeeded operations to the associations table
+        :type mapping_plan: MappingPlan
+        :return: (operation, command output or exception) pairs
+        :rtype: list
+        """
+        results = mapping_plan.execute(self._cli_service, self._logger)
+        for operation, result in results:
+            if isinstance(result, Exception):
+                continue
+            if operation.kind == MappingPlan.CREATE:
+                self._update_associations(AssociationsTable.add, operation.name, operation.arguments['master_port'],
+                                          operation.arguments['slave_port'], operation.arguments['bidir'])
+            elif operation.kind == MappingPlan.DELETE:
+                self._update_associations(AssociationsTable.remove, operation.name)
+            else:
+                self._update_associations(self._set_monitor_ports, operation.name,
+                                          operation.arguments['monitor_ports'])
+        return results
+
     def map_uni(self, master_port, slave_ports):
+        self._load_tables(ports_state=not self._optimistic)
         logical_master_id = self._get_logical(master_port)
-        self._validate_port(logical_master_id)
-        command_executor = CommandTemplateExecutor(self._cli_service, command_template.MAP_UNI)
+        self._pre_validate_port(logical_master_id)
+        mapping_plan = MappingPlan()
         exception_messages = []
         for slave_port in slave_ports:
             try:
                 logical_slave_id = self._get_logical(slave_port)
-                self._validate_port(logical_slave_id)
-                command_executor.execute_command(master_ports=logical_master_id, slave_ports=logical_slave_id,
-                                                 name='{0}-uni-{1}'.format(logical_master_id, logical_slave_id))
+                self._pre_validate_port(logical_slave_id)
+                mapping_plan.create('{0}-uni-{1}'.format(logical_master_id, logical_slave_id), logical_master_id,
+                                    logical_slave_id, False)
             except Exception as e:
-                if len(e.args) > 1:
-                    exception_messages.append(e.args[1])
-                elif len(e.args) == 1:
-                    exception_messages.append(e.args[0])
+                exception_messages.append(self._exception_message(e))
+        for operation, result in self._execute_plan(mapping_plan):
+            if isinstance(result, Exception):
+                logical_slave_id = operation.arguments['slave_port']
+                exception_messages.append(self._diagnose(result, [logical_master_id, logical_slave_id],
+                                                         [logical_slave_id]))
         if exception_messages:
             raise Exception(self.__class__.__name__, ', '.join(exception_messages))
 
     def map_bidi(self, master_port, slave_port):
+        self._load_tables(ports_state=not self._optimistic)
         logical_master_id = self._get_logical(master_port)
-        self._validate_port(logical_master_id)
+        self._pre_validate_port(logical_master_id)
         logical_slave_id = self._get_logical(slave_port)
-        self._validate_port(logical_slave_id)
-        associations_output = CommandTemplateExecutor(self._cli_service, command_template.MAP_BIDI).execute_command(
-            master_ports=logical_master_id, slave_ports=logical_slave_id,
-            name='{0}-bidi-{1}'.format(logical_master_id, logical_slave_id))
-        return associations_output
+        self._pre_validate_port(logical_slave_id)
+        mapping_plan = MappingPlan()
+        mapping_plan.create('{0}-bidi-{1}'.format(logical_master_id, logical_slave_id), logical_master_id,
+                            logical_slave_id, True)
+        (_, result), = self._execute_plan(mapping_plan)
+        if isinstance(result, Exception):
+            if not self._optimistic:
+                raise result
+            ports = [logical_master_id, logical_slave_id]
+            raise Exception(self.__class__.__name__, self._diagnose(result, ports, ports))
+        return result
 
     def map_clear(self, ports):
+        self._load_tables(associations=True)
         exception_messages = []
+        mapping_plan = MappingPlan(self._associations_table)
         for port in ports:
             try:
-                port_id = self._get_logical(port)
-                association = self._find_association(port_id)
-                self._remove_association(association)
+                association_name = self._find_association(self._get_logical(port))
+                if association_name:
+                    # Both ends of a bidir association resolve to the same name, it is deleted once
+                    mapping_plan.delete(association_name)
             except Exception as e:
-                if len(e.args) > 1:
-                    exception_messages.append(e.args[1])
-                elif len(e.args) == 1:
-                    exception_messages.append(e.args[0])
+                exception_messages.append(self._exception_message(e))
+        for _, result in self._execute_plan(mapping_plan):
+            if isinstance(result, Exception):
+                exception_messages.append(self._exception_message(result))
         if exception_messages:
             raise Exception(self.__class__.__name__, ', '.join(exception_messages))
 
-    def _remove_association(self, association_name):
-        if association_name:
-            command_executor = CommandTemplateExecutor(self._cli_service, command_template.MAP_CLEAR)
-            command_executor.execute_command(name=association_name)
-            del self._associations_table[association_name]
+    def _update_associations(self, update, *args):
+        # Not loaded table is read from the device on the first access, it contains the change
+        self._topology_cache.update_associations(self.__tables.get('associations'), update, *args)
 
-    def _modify_monitor_ports(self, association_name, monitor_ports):
-        association_attributes = self._associations_table.get(association_name)
-        if association_attributes.get(self.MONITOR_PORTS) != monitor_ports:
-            command_executor = CommandTemplateExecutor(self._cli_service, command_template.MODIFY_MONITOR_PORTS)
-            command_executor.execute_command(name=association_name, ports=','.join(monitor_ports))
-            association_attributes[self.MONITOR_PORTS] = monitor_ports
+    @staticmethod
+    def _set_monitor_ports(associations, association_name, monitor_ports):
+        # Association could be deleted by a concurrent command
+        if association_name in associations:
+            associations.set_monitor_ports(association_name, monitor_ports)
 
     def map_clear_to(self, master_port, slave_ports):
+        self._load_tables(associations=True)
         master_port_logical_id = self._get_logical(master_port)
         slave_ports_logical_ids = map(self._get_logical, slave_ports)
-        exception_messages = []
-        try:
-            association_name = self._find_association(master_port_logical_id)
-            if association_name:
-                association_attributes = self._associations_table.get(association_name)
-                association_ports = association_attributes.get(self.PORTS)
-                # Second port of association
-                association_second_port = association_ports[1 - association_ports.index(master_port_logical_id)]
-                if association_second_port in slave_ports_logical_ids:
-                    self._remove_association(association_name)
-                else:
-                    monitor_ports = copy(association_attributes.get(self.MONITOR_PORTS))
-                    for port in slave_ports_logical_ids:
-                        if port in monitor_ports:
-                            monitor_ports.remove(port)
-                    self._modify_monitor_ports(association_name, monitor_ports)
-
-        except Exception as e:
-            if len(e.args) > 1:
-                exception_messages.append(e.args[1])
-            elif len(e.args) == 1:
-                exception_messages.append(e.args[0])
+        association_name = self._find_association(master_port_logical_id)
+        if not association_name:
+            return
+        mapping_plan = MappingPlan(self._associations_table)
+        association_ports = self._associations_table.get(association_name).get(self.PORTS)
+        # Second port of association
+        association_second_port = association_ports[1 - association_ports.index(master_port_logical_id)]
+        for slave_port in slave_ports_logical_ids:
+            if slave_port == association_second_port:
+                mapping_plan.delete(association_name)
+            else:
+                monitor_ports = mapping_plan.monitor_ports(association_name)
+                monitor_ports.discard(slave_port)
+                mapping_plan.set_monitor_ports(association_name, monitor_ports)
+        exception_messages = [self._exception_message(result) for _, result in self._execute_plan(mapping_plan)
+                              if isinstance(result, Exception)]
         if exception_messages:
             raise Exception(self.__class__.__name__, ', '.join(exception_messages))
 
     def map_tap(self, master_port, monitor_ports):
+        self._load_tables(ports_state=not self._optimistic, associations=True)
         master_port_logical = self._get_logical(master_port)
-        self._validate_port(master_port_logical)
+        self._pre_validate_port(master_port_logical)
         monitor_ports_logical = map(self._get_logical, monitor_ports)
         association_name = self._find_association(master_port_logical)
         if not association_name:
             raise Exception(self.__class__.__name__,
                             "Cannot find association with port {}".format(master_port_logical))
-        association_attributes = self._associations_table.get(association_name)
-        association_monitor_ports = copy(association_attributes.get(self.MONITOR_PORTS))
+        mapping_plan = MappingPlan(self._associations_table)
+        association_monitor_ports = mapping_plan.monitor_ports(association_name)
         for port in monitor_ports_logical:
-            self._validate_port(port)
+            self._pre_validate_port(port)
             if port in association_monitor_ports:
                 raise Exception(self.__class__.__name__,
                                 'Port {0} has already exist in monitor ports for association {1}'.format(port,
                                                                                                          association_name))
             else:
-                association_monitor_ports.append(port)
-        self._modify_monitor_ports(association_name, association_monitor_ports)
+                association_monitor_ports.add(port)
+        mapping_plan.set_monitor_ports(association_name, association_monitor_ports)
+        for _, result in self._execute_plan(mapping_plan):
+            if isinstance(result, Exception):
+                if not self._optimistic:
+                    raise result
+                raise Exception(self.__class__.__name__,
+                                self._diagnose(result, [master_port_logical] + monitor_ports_logical))
+
+    def _pre_validate_port(self, logical_port_id):
+        if not self._optimistic:
+            self._validate_port(logical_port_id)
+
+    def _diagnose(self, exception, ports, exclusive_ports=()):
+        """
+        Explain the rejected mapping by the ports state and associations read from the device after the error
+        :param exception: error returned by the switch
+        :param ports: ports which have to be enabled
+        :param exclusive_ports: ports which cannot be used by other associations
+        :return: exception message
+        :rtype: str
+        """
+        if not self._optimistic:
+            return self._exception_message(exception)
+        if self.__tables.get('ports_state') is None:
+            # The first error of the command re-reads associations, the cached table could cause it
+            self._topology_cache.drop_associations()
+            self.__tables.pop('associations', None)
+            self._load_tables(ports_state=True, associations=True)
+        messages = []
+        for port in ports:
+            try:
+                self._validate_port(port)
+            except Exception as e:
+                messages.append(self._exception_message(e))
+        for port in exclusive_ports:
+            association_name = self._find_association(port)
+            if association_name:
+                messages.append('Port {0} is used by association {1}'.format(port, association_name))
+        return ', '.join(messages) or self._exception_message(exception)
 
     def _validate_port(self, logical_port_id):
-        output = CommandTemplateExecutor(self._cli_service, command_template.IS_ENABLED).execute_command(
-            port=logical_port_id)
-        if '{}:on'.format(logical_port_id) in output.lower():
+        if self._ports_state_table.get(logical_port_id):
             return
         raise Exception('Port {} is disabled'.format(logical_port_id))
@@ -1,26 +1,30 @@
 import re
 
 import pluribus_virtualwire.command_templates.system as command_template
-from cloudshell.cli.command_template.command_template_executor import CommandTemplateExecutor
+from pluribus_virtualwire.cli.vw_command_template_executor import VWCommandTemplateExecutor
+from pluribus_virtualwire.helpers.parsable_output import ParsableOutput
+from pluribus_virtualwire.helpers.topology_cache import TopologyCache
 
 
 class SystemActions(object):
     """
     Autoload actions
     """
+    PHYS_TO_LOGICAL_PARSER = ParsableOutput(command_template.PHYS_TO_LOGICAL)
 
-    def __init__(self, cli_service, logger):
+    def __init__(self, cli_service, logger, topology_cache=None):
         """
         :param cli_service: default mode cli_service
         :type cli_service: CliService
         :param logger:
         :type logger: Logger
+        :param topology_cache: topology shared with other actions
+        :type topology_cache: TopologyCache
         :return:
         """
         self._cli_service = cli_service
         self._logger = logger
-
-        self.__phys_to_logical_table = None
+        self._topology_cache = topology_cache or TopologyCache(logger)
 
     @property
     def cli_service(self):
@@ -31,17 +35,17 @@ class SystemActions(object):
         self._cli_service = cli_service
 
     def _build_phys_to_logical_table(self):
-        logical_to_phys_dict = {}
-        output = CommandTemplateExecutor(self._cli_service, command_template.PHYS_TO_LOGICAL).execute_command()
-        for phys_id, logical_id in re.findall(r'^([\d\.]+):(\d+)$', output, flags=re.MULTILINE):
-            logical_to_phys_dict[phys_id] = logical_id
-        return logical_to_phys_dict
+        output = VWCommandTemplateExecutor(self._cli_service, command_template.PHYS_TO_LOGICAL).execute_command()
+        return {record.bezel_intf: record.port for record in self.PHYS_TO_LOGICAL_PARSER.records(output)}
 
     @property
     def _phys_to_logical_table(self):
-        if not self.__phys_to_logical_table:
-            self.__phys_to_logical_table = self._build_phys_to_logical_table()
-        return self.__phys_to_logical_table
+        phys_to_logical = self._topology_cache.phys_to_logical
+        if phys_to_logical is None:
+            generation = self._topology_cache.generation
+            phys_to_logical = self._build_phys_to_logical_table()
+            self._topology_cache.store(generation, phys_to_logical=phys_to_logical)
+        return phys_to_logical
 
     def _get_logical(self, phys_name):
         logical_id = self._phys_to_logical_table.get(phys_name)
@@ -51,19 +55,27 @@ class SystemActions(object):
             raise Exception(self.__class__.__name__, 'Cannot convert physical port name to logical')
 
     def get_state_id(self):
-        state_id = CommandTemplateExecutor(self._cli_service, command_template.GET_STATE_ID).execute_command()
-        return re.split(r'\s', state_id.strip())[1]
+        output = VWCommandTemplateExecutor(self._cli_service, command_template.GET_STATE_ID).execute_command()
+        return self.parse_state_id(output)
+
+    @staticmethod
+    def parse_state_id(output):
+        """
+        :param output: output of GET_STATE_ID, 'motd: 1234'
+        :rtype: str
+        """
+        return re.split(r'\s', output.strip())[1]
 
     def set_state_id(self, state_id):
-        out = CommandTemplateExecutor(self._cli_service, command_template.SET_STATE_ID).execute_command(
+        out = VWCommandTemplateExecutor(self._cli_service, command_template.SET_STATE_ID).execute_command(
             state_id=state_id)
         return out
 
     def set_auto_negotiation(self, phys_port, value):
         logical_port_id = self._get_logical(phys_port)
         if value.lower() == 'true':
-            out = CommandTemplateExecutor(self._cli_service, command_template.SET_AUTO_NEG_ON).execute_command(
+            out = VWCommandTemplateExecutor(self._cli_service, command_template.SET_AUTO_NEG_ON).execute_command(
                 port_id=logical_port_id)
         else:
-            out = CommandTemplateExecutor(self._cli_service, command_template.SET_AUTO_NEG_OFF).execute_command(
+            out = VWCommandTemplateExecutor(self._cli_service, command_template.SET_AUTO_NEG_OFF).execute_command(
                 port_id=logical_port_id)
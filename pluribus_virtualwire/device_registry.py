@@ -0,0 +1,173 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import threading
+import time
+from collections import OrderedDict
+
+from pluribus_virtualwire.autoload.autoload_cache import AutoloadCache
+from pluribus_virtualwire.cli.vw_cli_handler import VWCliHandler
+from pluribus_virtualwire.command_actions.mapping_actions import MappingActions
+from pluribus_virtualwire.command_actions.system_actions import SystemActions
+from pluribus_virtualwire.helpers.topology_cache import TopologyCache
+from pluribus_virtualwire.topology_refresher import TopologyRefresher
+
+
+class DeviceContext(object):
+    """
+    CLI handler with pooled sessions, actions and caches of one device
+    """
+
+    def __init__(self, address, username, password, logger, runtime_config):
+        """
+        :param address: resource address, "192.168.42.240"
+        :type address: str
+        :type logger: Logger
+        :type runtime_config: cloudshell.layer_one.core.helper.runtime_configuration.RuntimeConfiguration
+        """
+        self.address = address
+        self.credentials = (username, password)
+        self.cli_handler = VWCliHandler(logger, runtime_config)
+        self.cli_handler.define_session_attributes(address, username, password)
+        self.topology_cache = TopologyCache(logger)
+        self.autoload_cache = AutoloadCache(logger)
+        self._logger = logger
+        self._optimistic = runtime_config.read_key('MAPPING.OPTIMISTIC', False)
+        self.topology_refresher = None
+        refresh_interval = runtime_config.read_key('TOPOLOGY_REFRESH.INTERVAL', 0)
+        if refresh_interval:
+            self.topology_refresher = TopologyRefresher(address, self.cli_handler, self.topology_cache, logger,
+                                                        refresh_interval)
+            self.topology_refresher.start()
+        self.last_used = time.time()
+        self.closed = False
+        self._users = 0
+        self._retired = False
+        self._lock = threading.Lock()
+
+    @property
+    def mapping_actions(self):
+        """
+        New actions for every driver command, concurrent commands use own CLI sessions, the topology is shared
+        :rtype: MappingActions
+        """
+        return MappingActions(None, self._logger, self.topology_cache, self._optimistic)
+
+    @property
+    def system_actions(self):
+        """
+        :rtype: SystemActions
+        """
+        return SystemActions(None, self._logger, self.topology_cache)
+
+    def touch(self):
+        self.last_used = time.time()
+
+    def acquire(self):
+        """
+        Use the device in a driver command, it is not closed until released
+        :return: False if the device is already closed
+        :rtype: bool
+        """
+        with self._lock:
+            if self.closed:
+                return False
+            self._users += 1
+            return True
+
+    def release(self):
+        with self._lock:
+            self._users -= 1
+            close = self._retired and not self._users and not self.closed
+            self.closed = self.closed or close
+        if close:
+            self._close()
+
+    def retire(self):
+        """
+        Close the device now, or when the last driver command using it releases it
+        """
+        with self._lock:
+            self._retired = True
+            close = not self._users and not self.closed
+            self.closed = self.closed or close
+        if close:
+            self._close()
+
+    def _close(self):
+        if self.topology_refresher:
+            self.topology_refresher.stop()
+        self.cli_handler.close()
+
+
+class DeviceRegistry(object):
+    """
+    Device contexts by address, least recently used and idle devices are closed when driver commands release them
+    """
+    MAX_DEVICES = 16
+    IDLE_TIMEOUT = 3600
+
+    def __init__(self, logger, runtime_config, max_devices=MAX_DEVICES, idle_timeout=IDLE_TIMEOUT):
+        """
+        :param logger:
+        :type logger: Logger
+        :type runtime_config: cloudshell.layer_one.core.helper.runtime_configuration.RuntimeConfiguration
+        :param max_devices: count of devices kept open
+        :type max_devices: int
+        :param idle_timeout: seconds after which unused device is closed, 0 - never
+        :type idle_timeout: int
+        """
+        self._logger = logger
+        self._runtime_config = runtime_config
+        self._max_devices = max_devices
+        self._idle_timeout = idle_timeout
+        self._devices = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, address, username, password):
+        """
+        Context of the device, created on the first login or if credentials changed
+        :type address: str
+        :type username: str
+        :type password: str
+        :rtype: DeviceContext
+        """
+        with self._lock:
+            closed = self._pop_idle()
+            context = self._devices.pop(address, None)
+            if context and context.credentials != (username, password):
+                self._logger.debug('Credentials of {} changed, closing device sessions'.format(address))
+                closed.append(context)
+                context = None
+            if not context:
+                context = DeviceContext(address, username, password, self._logger, self._runtime_config)
+            context.touch()
+            self._devices[address] = context
+            while self._max_devices and len(self._devices) > self._max_devices:
+                _, evicted = self._devices.popitem(last=False)
+                self._logger.debug('Device {} evicted, too many devices'.format(evicted.address))
+                closed.append(evicted)
+        for evicted in closed:
+            evicted.retire()
+        return context
+
+    def _pop_idle(self):
+        idle = []
+        if self._idle_timeout:
+            for address, context in self._devices.items():
+                if time.time() - context.last_used > self._idle_timeout:
+                    self._logger.debug('Device {} evicted, idle'.format(address))
+                    idle.append(self._devices.pop(address))
+        return idle
+
+    def __contains__(self, address):
+        return address in self._devices
+
+    def __len__(self):
+        return len(self._devices)
+
+    def close(self):
+        with self._lock:
+            contexts = self._devices.values()
+            self._devices.clear()
+        for context in contexts:
+            context.retire()
@@ -1,22 +1,28 @@
 #!/usr/bin/python
 # -*- coding: utf-8 -*-
+import os
+import threading
+from contextlib import contextmanager
 
 from cloudshell.layer_one.core.driver_commands_interface import DriverCommandsInterface
 from cloudshell.layer_one.core.layer_one_driver_exception import LayerOneDriverException
-from cloudshell.layer_one.core.response.response_info import GetStateIdResponseInfo, ResourceDescriptionResponseInfo, \
-    AttributeValueResponseInfo
+from cloudshell.layer_one.core.response.response_info import GetStateIdResponseInfo, AttributeValueResponseInfo
 from pluribus_virtualwire.autoload.autoload import Autoload
-from pluribus_virtualwire.cli.vw_cli_handler import VWCliHandler
+from pluribus_virtualwire.autoload.chassis_facts_cache import ChassisFactsCache
+from pluribus_virtualwire.autoload.resource_stream import ResourceDescriptionStreamResponseInfo
+from pluribus_virtualwire.cli.command_loop import CommandLoop
 from pluribus_virtualwire.command_actions.actions_helper import ActionsManager
 from pluribus_virtualwire.command_actions.autoload_actions import AutoloadActions
-from pluribus_virtualwire.command_actions.mapping_actions import MappingActions
-from pluribus_virtualwire.command_actions.system_actions import SystemActions
+from pluribus_virtualwire.device_registry import DeviceRegistry
+from pluribus_virtualwire.helpers.command_stats import CommandStats
+from pluribus_virtualwire.helpers.single_flight import SingleFlight
 
 
 class DriverCommands(DriverCommandsInterface):
     """
     Driver commands implementation
     """
+    AUTOLOAD_TABLES = ['board_table', 'ports_table', 'associations_table']
 
     def __init__(self, logger, runtime_config):
         """
@@ -25,23 +31,90 @@ class DriverCommands(DriverCommandsInterface):
         """
         self._logger = logger
         self._runtime_config = runtime_config
-        self._cli_handler = VWCliHandler(self._logger, runtime_config)
+        self._devices = DeviceRegistry(self._logger, runtime_config,
+                                       runtime_config.read_key('DEVICES.MAX_COUNT', DeviceRegistry.MAX_DEVICES),
+                                       runtime_config.read_key('DEVICES.IDLE_TIMEOUT', DeviceRegistry.IDLE_TIMEOUT))
+        # Device of the last login in the request thread, commands except login do not have the address
+        self._local = threading.local()
+        self._last_device = None
+        # Concurrent identical read-only commands share one execution
+        self._single_flight = SingleFlight()
+        self._command_stats = CommandStats(self._logger, runtime_config.read_key('STATS.ENABLED', True),
+                                           self._log_file_path(runtime_config.read_key('STATS.FILE', None)),
+                                           runtime_config.read_key('STATS.FLUSH_INTERVAL',
+                                                                   CommandStats.FLUSH_INTERVAL))
+        self._chassis_facts_cache = ChassisFactsCache(
+            self._logger, self._log_file_path(runtime_config.read_key('CHASSIS_CACHE.FILE', None)),
+            runtime_config.read_key('CHASSIS_CACHE.TTL', 86400))
 
-        self.__mapping_actions = None
-        self.__system_actions = None
+    @staticmethod
+    def _log_file_path(file_path):
+        if file_path and not os.path.isabs(file_path):
+            return os.path.join(os.environ.get('LOG_PATH', '.'), file_path)
+        return file_path
+
+    @property
+    def _device(self):
+        """
+        :rtype: pluribus_virtualwire.device_registry.DeviceContext
+        """
+        device = getattr(self._local, 'device', None) or self._last_device
+        if not device:
+            raise LayerOneDriverException(self.__class__.__name__, 'Device is not defined, call Login command first')
+        device.touch()
+        return device
+
+    @property
+    def _address(self):
+        return self._device.address
+
+    @property
+    def _cli_handler(self):
+        return self._device.cli_handler
+
+    @property
+    def _topology_cache(self):
+        return self._device.topology_cache
+
+    @property
+    def _autoload_cache(self):
+        return self._device.autoload_cache
 
     @property
     def _mapping_actions(self):
-        if not self.__mapping_actions:
-            self.__mapping_actions = MappingActions(None, self._logger)
-        return self.__mapping_actions
+        return self._device.mapping_actions
 
     @property
     def _system_actions(self):
-        if not self.__system_actions:
-            self.__system_actions = SystemActions(None, self._logger)
-        return self.__system_actions
+        return self._device.system_actions
 
+    @contextmanager
+    def _default_mode_service(self):
+        """
+        Default mode session of the device, the device is not closed while the session is used
+        """
+        device = self._device
+        while not device.acquire():
+            # Closed as least recently used or idle, opened again with the credentials of the last login
+            device = self._local.device = self._devices.get(device.address, *device.credentials)
+        try:
+            with device.cli_handler.default_mode_service() as session:
+                yield session
+        finally:
+            device.release()
+
+    @contextmanager
+    def _changing_associations(self):
+        """
+        Outdate cached autoload mappings when the mapping command completed, a failed command could change some
+        associations as well
+        """
+        try:
+            yield
+        finally:
+            self._autoload_cache.mark_associations_changed()
+
+    @CommandStats.driver_command('Login')
     def login(self, address, username, password):
         """
         Perform login operation on the device
@@ -60,13 +133,32 @@ class DriverCommands(DriverCommandsInterface):
                 device_info = session.send_command('show version')
                 self._logger.info(device_info)
         """
-        self._cli_handler.define_session_attributes(address, username, password)
-        with self._cli_handler.default_mode_service() as session:
-            autoload_actions = AutoloadActions(session, self._logger)
-            self._logger.info(autoload_actions.board_table())
-            self.__mapping_actions = None
-            self.__system_actions = None
-
+        self._local.device = self._last_device = self._devices.get(address, username, password)
+        with self._default_mode_service() as session:
+            board_table = self._chassis_facts_cache.get(address)
+            # Software version is the only fact checked on the device if the chassis is known
+            if not board_table or not self._chassis_facts_cache.validate_version(
+                    address, AutoloadActions(session, self._logger).software_version()):
+                board_table = self._read_board_table(address, session)
+            self._logger.info(board_table)
+            # Tables kept warm by the refresher are not dropped
+            if not self._device.topology_refresher:
+                self._topology_cache.invalidate()
+            self._cli_handler.prewarm_sessions()
+
+    def _get_board_table(self, address):
+        board_table = self._chassis_facts_cache.get(address)
+        if not board_table:
+            with self._default_mode_service() as session:
+                board_table = self._read_board_table(address, session)
+        return board_table
+
+    def _read_board_table(self, address, session):
+        board_table = AutoloadActions(session, self._logger).board_table()
+        self._chassis_facts_cache.put(address, board_table)
+        return board_table
+
+    @CommandStats.driver_command('GetStateId')
     def get_state_id(self):
         """
         Check if CS synchronized with the device.
@@ -81,10 +173,19 @@ class DriverCommands(DriverCommandsInterface):
                 chassis_name = session.send_command('show chassis name')
                 return chassis_name
         """
-        with self._cli_handler.default_mode_service() as session:
-            with ActionsManager(self._system_actions, session) as system_actions:
-                return GetStateIdResponseInfo(system_actions.get_state_id())
+        return self._single_flight.do(('GetStateId', self._address), self._get_state_id)
 
+    def _get_state_id(self):
+        with self._default_mode_service() as session:
+            return GetStateIdResponseInfo(self._read_state_id(session))
+
+    def _read_state_id(self, session):
+        with ActionsManager(self._system_actions, session) as system_actions:
+            state_id = system_actions.get_state_id()
+            self._topology_cache.update_state_id(state_id)
+            return state_id
+
+    @CommandStats.driver_command('SetStateId')
     def set_state_id(self, state_id):
         """
         Set synchronization state id to the device, called after Autoload or SyncFomDevice commands
@@ -99,10 +200,13 @@ class DriverCommands(DriverCommandsInterface):
                 # Execute command
                 session.send_command('set chassis name {}'.format(state_id))
         """
-        with self._cli_handler.default_mode_service() as session:
+        with self._default_mode_service() as session:
             with ActionsManager(self._system_actions, session) as system_actions:
                 system_actions.set_state_id(state_id)
+                self._topology_cache.state_id = state_id
+                self._autoload_cache.update_state_id(self._address, state_id)
 
+    @CommandStats.driver_command('MapBidi')
     def map_bidi(self, src_port, dst_port):
         """
         Create a bidirectional connection between source and destination ports
@@ -119,12 +223,13 @@ class DriverCommands(DriverCommandsInterface):
 
         """
         self._logger.info('MapBidi, SrcPort: {0}, DstPort: {1}'.format(src_port, dst_port))
-        with self._cli_handler.default_mode_service() as session:
+        with self._changing_associations(), self._default_mode_service() as session:
             with ActionsManager(self._mapping_actions, session) as mapping_actions:
                 src_logical_port = self._convert_port_address(src_port)
                 dst_logical_port = self._convert_port_address(dst_port)
                 mapping_actions.map_bidi(src_logical_port, dst_logical_port)
 
+    @CommandStats.driver_command('MapUni')
     def map_uni(self, src_port, dst_ports):
         """
         Unidirectional mapping of two ports
@@ -141,11 +246,12 @@ class DriverCommands(DriverCommandsInterface):
                     session.send_command('map {0} also-to {1}'.format(convert_port(src_port), convert_port(dst_port)))
         """
         self._logger.info('MapUni, SrcPort: {0}, DstPorts: {1}'.format(src_port, ','.join(dst_ports)))
-        with self._cli_handler.default_mode_service() as session:
+        with self._changing_associations(), self._default_mode_service() as session:
             with ActionsManager(self._mapping_actions, session) as mapping_actions:
                 mapping_actions.map_uni(self._convert_port_address(src_port),
                                         [self._convert_port_address(port) for port in dst_ports])
 
+    @CommandStats.driver_command('GetResourceDescription')
     def get_resource_description(self, address):
         """
         Auto-load function to retrieve all information from the device
@@ -180,14 +286,55 @@ class DriverCommands(DriverCommandsInterface):
             return ResourceDescriptionResponseInfo([chassis])
         """
         self._logger.info('GetResourceDescriprion for: {}'.format(address))
-        with self._cli_handler.default_mode_service() as session:
-            autoload_actions = AutoloadActions(session, self._logger)
-            boart_table = autoload_actions.board_table()
-            ports_table = autoload_actions.ports_table()
-            association_table = autoload_actions.associations_table()
-            autoload_helper = Autoload(address, boart_table, ports_table, association_table, self._logger)
-            return ResourceDescriptionResponseInfo(autoload_helper.build_structure())
-
+        return self._single_flight.do(('GetResourceDescription', address), self._get_resource_description, address)
+
+    def _get_resource_description(self, address):
+        with self._default_mode_service() as session:
+            state_id = self._read_state_id(session)
+            # Taken before the associations are read, a mapping completed meanwhile outdates them
+            associations_generation = self._autoload_cache.associations_generation
+            cache_entry = self._autoload_cache.get(address, state_id)
+            if not cache_entry:
+                self._topology_cache.invalidate()
+                boart_table, ports_table, association_table = self._collect_autoload_tables(session)
+                self._chassis_facts_cache.put(address, boart_table)
+                autoload_helper = Autoload(address, boart_table, ports_table, association_table, self._logger)
+                cache_entry = self._autoload_cache.put(address, state_id, autoload_helper, associations_generation)
+            elif self._autoload_cache.associations_changed(cache_entry):
+                self._logger.debug('Device state is not changed, re-reading associations only')
+                autoload_actions = AutoloadActions(session, self._logger, self._topology_cache)
+                self._autoload_cache.update_associations(cache_entry, associations_generation,
+                                                         autoload_actions.associations_table())
+        return ResourceDescriptionStreamResponseInfo(cache_entry.autoload)
+
+    def _collect_autoload_tables(self, session):
+        """
+        Read autoload tables, spread over the session and the idle pooled sessions of the device, so the sessions
+        wait for the device in parallel; commands of the tables of one session are written at once
+        :return: tables in order of AUTOLOAD_TABLES
+        :rtype: list
+        """
+        with self._idle_sessions(len(self.AUTOLOAD_TABLES) - 1) as sessions:
+            autoload_actions = [AutoloadActions(cli_service, self._logger, self._topology_cache)
+                                for cli_service in [session] + sessions]
+            return CommandLoop(self._logger).run(
+                *[getattr(autoload_actions[index % len(autoload_actions)], '{}_async'.format(table))()
+                  for index, table in enumerate(self.AUTOLOAD_TABLES)])
+
+    @contextmanager
+    def _idle_sessions(self, count):
+        """
+        Up to count more sessions of the device, taken while the pool has idle ones. A session used by another
+        command is not waited for and new sessions are not connected, that takes longer than the autoload commands
+        """
+        if count <= 0 or not self._cli_handler.has_idle_session():
+            yield []
+            return
+        with self._default_mode_service() as session:
+            with self._idle_sessions(count - 1) as sessions:
+                yield [session] + sessions
+
+    @CommandStats.driver_command('MapClear')
     def map_clear(self, ports):
         """
         Remove simplex/multi-cast/duplex connection ending on the destination port
@@ -208,10 +355,11 @@ class DriverCommands(DriverCommandsInterface):
                     raise Exception('self.__class__.__name__', ','.join(exceptions))
         """
         self._logger.info('MapClear, Ports: {}'.format(','.join(ports)))
-        with self._cli_handler.default_mode_service() as session:
+        with self._changing_associations(), self._default_mode_service() as session:
             with ActionsManager(self._mapping_actions, session) as mapping_actions:
                 mapping_actions.map_clear([self._convert_port_address(port) for port in ports])
 
+    @CommandStats.driver_command('MapClearTo')
     def map_clear_to(self, src_port, dst_ports):
         """
         Remove simplex/multi-cast/duplex connection ending on the destination port
@@ -230,11 +378,12 @@ class DriverCommands(DriverCommandsInterface):
                     session.send_command('map clear-to {0} {1}'.format(_src_port, _dst_port))
         """
         self._logger.info('MapClearTo, SrcPort: {0}, DstPorts: {1}'.format(src_port, ','.join(dst_ports)))
-        with self._cli_handler.default_mode_service() as session:
+        with self._changing_associations(), self._default_mode_service() as session:
             with ActionsManager(self._mapping_actions, session) as mapping_actions:
                 mapping_actions.map_clear_to(self._convert_port_address(src_port),
                                              [self._convert_port_address(port) for port in dst_ports])
 
+    @CommandStats.driver_command('GetAttributeValue')
     def get_attribute_value(self, cs_address, attribute_name):
         """
         Retrieve attribute value from the device
@@ -254,15 +403,14 @@ class DriverCommands(DriverCommandsInterface):
         """
         if attribute_name == 'Serial Number':
             if len(cs_address.split('/')) == 1:
-                with self._cli_handler.default_mode_service() as session:
-                    autoload_actions = AutoloadActions(session, self._logger)
-                    board_table = autoload_actions.board_table()
-                    return AttributeValueResponseInfo(board_table.get('chassis-serial'))
+                board_table = self._single_flight.do(('BoardTable', cs_address), self._get_board_table, cs_address)
+                return AttributeValueResponseInfo(board_table.get('chassis-serial'))
             else:
                 return AttributeValueResponseInfo('NA')
         else:
             raise LayerOneDriverException(self.__class__.__name__, 'GetAttributeValue command is not supported')
 
+    @CommandStats.driver_command('SetAttributeValue')
     def set_attribute_value(self, cs_address, attribute_name, attribute_value):
         """
         Set attribute value to the device
@@ -283,16 +431,17 @@ class DriverCommands(DriverCommandsInterface):
                 return AttributeValueResponseInfo(attribute_value)
         """
         if attribute_name == 'Auto Negotiation':
-            with self._cli_handler.default_mode_service() as session:
+            with self._default_mode_service() as session:
                 with ActionsManager(self._system_actions, session) as system_actions:
                     system_actions.set_auto_negotiation(self._convert_port_address(cs_address), attribute_value)
         else:
             raise LayerOneDriverException(self.__class__.__name__,
                                           'SetAttributeValue for address {} is not supported'.format(cs_address))
 
+    @CommandStats.driver_command('MapTap')
     def map_tap(self, src_port, dst_ports):
         self._logger.info('MapTap, SrcPort: {0}, DstPorts: {1}'.format(src_port, ','.join(dst_ports)))
-        with self._cli_handler.default_mode_service() as session:
+        with self._changing_associations(), self._default_mode_service() as session:
             with ActionsManager(self._mapping_actions, session) as mapping_actions:
                 mapping_actions.map_tap(self._convert_port_address(src_port),
                                         [self._convert_port_address(port) for port in dst_ports])
@@ -308,6 +457,13 @@ class DriverCommands(DriverCommandsInterface):
         """
         pass
 
+    def close(self):
+        """
+        Close CLI sessions and transcripts of all devices, write pending stats
+        """
+        self._devices.close()
+        self._command_stats.close()
+
     @staticmethod
     def _convert_port_address(port):
         """
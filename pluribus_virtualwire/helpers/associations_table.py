@@ -0,0 +1,114 @@
+import pluribus_virtualwire.command_templates.mapping as command_template
+from pluribus_virtualwire.helpers.parsable_output import ParsableOutput
+from pluribus_virtualwire.helpers.port_set import PortSet
+
+
+class AssociationsTable(object):
+    """
+    Port associations by name with reverse indexes from association and monitor ports to association names
+    """
+    PORTS = 'ports'
+    BIDIR = 'bidir'
+    MONITOR_PORTS = 'monitor_ports'
+
+    PARSER = ParsableOutput(command_template.ASSOCIATIONS)
+
+    def __init__(self):
+        self._associations = {}
+        self._ports_index = {}
+        self._monitor_ports_index = {}
+
+    @classmethod
+    def parse(cls, output):
+        """
+        Build associations table from 'format master-ports,slave-ports,name,bidir,monitor-ports' output
+        :param output: command output
+        :type output: str
+        :rtype: AssociationsTable
+        """
+        associations_table = cls()
+        for record in cls.PARSER.records(output):
+            associations_table.add(record.name, record.master_ports, record.slave_ports, record.bidir,
+                                   record.monitor_ports)
+        return associations_table
+
+    @staticmethod
+    def _index(index, ports, name):
+        for port in ports:
+            index.setdefault(port, []).append(name)
+
+    @staticmethod
+    def _unindex(index, ports, name):
+        for port in ports:
+            names = index.get(port)
+            if names and name in names:
+                names.remove(name)
+                if not names:
+                    del index[port]
+
+    def add(self, name, master_port, slave_port, bidir, monitor_ports=None):
+        """
+        :type name: str
+        :type master_port: str
+        :type slave_port: str
+        :type bidir: bool
+        :type monitor_ports: PortSet
+        """
+        if name in self._associations:
+            self.remove(name)
+        attributes = {self.PORTS: [master_port, slave_port],
+                      self.BIDIR: bidir,
+                      self.MONITOR_PORTS: PortSet(monitor_ports)}
+        self._associations[name] = attributes
+        self._index(self._ports_index, attributes[self.PORTS], name)
+        self._index(self._monitor_ports_index, attributes[self.MONITOR_PORTS], name)
+
+    def remove(self, name):
+        attributes = self._associations.pop(name, None)
+        if attributes:
+            self._unindex(self._ports_index, attributes[self.PORTS], name)
+            self._unindex(self._monitor_ports_index, attributes[self.MONITOR_PORTS], name)
+
+    def set_monitor_ports(self, name, monitor_ports):
+        attributes = self._associations[name]
+        current_monitor_ports = attributes[self.MONITOR_PORTS]
+        monitor_ports = PortSet(monitor_ports)
+        self._unindex(self._monitor_ports_index, current_monitor_ports - monitor_ports, name)
+        self._index(self._monitor_ports_index, monitor_ports - current_monitor_ports, name)
+        attributes[self.MONITOR_PORTS] = monitor_ports
+
+    def get(self, name):
+        return self._associations.get(name)
+
+    def find(self, port):
+        """
+        Association name which has the port as master or slave port
+        :type port: str
+        :rtype: str
+        """
+        names = self._ports_index.get(port)
+        if names:
+            return names[0]
+
+    def find_monitoring(self, port):
+        """
+        Names of associations which have the port in monitor ports
+        :type port: str
+        :rtype: list
+        """
+        return list(self._monitor_ports_index.get(port, []))
+
+    def iteritems(self):
+        return self._associations.iteritems()
+
+    def itervalues(self):
+        return self._associations.itervalues()
+
+    def __contains__(self, name):
+        return name in self._associations
+
+    def __len__(self):
+        return len(self._associations)
+
+    def __iter__(self):
+        return iter(self._associations)
@@ -0,0 +1,289 @@
+import json
+import threading
+import time
+from bisect import bisect_left
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import wraps
+
+from cloudshell.cli.command_template.command_template import CommandTemplate
+
+_local = threading.local()
+
+
+def current_scope():
+    """
+    Stats scope of the driver command running in the current thread
+    :rtype: CommandScope
+    """
+    return getattr(_local, 'scope', None)
+
+
+@contextmanager
+def activate(scope):
+    """
+    Record stats of the current thread to the scope, used by worker threads of a driver command
+    :type scope: CommandScope
+    """
+    previous_scope = current_scope()
+    _local.scope = scope
+    try:
+        yield scope
+    finally:
+        _local.scope = previous_scope
+
+
+def record(key, elapsed):
+    scope = current_scope()
+    if scope:
+        scope.record(key, elapsed)
+
+
+def count_round_trip():
+    scope = current_scope()
+    if scope:
+        scope.count_round_trip()
+
+
+def count_bytes(bytes_received):
+    scope = current_scope()
+    if scope:
+        scope.count_bytes(bytes_received)
+
+
+@contextmanager
+def timed(key):
+    start_time = time.time()
+    try:
+        yield
+    finally:
+        record(key, time.time() - start_time)
+
+
+_template_names = {}
+
+
+def template_name(command_template):
+    """
+    Name of the command template in pluribus_virtualwire.command_templates, 'mapping.MAP_BIDI'
+    :type command_template: CommandTemplate
+    :rtype: str
+    """
+    if not _template_names:
+        import pluribus_virtualwire.command_templates.autoload as autoload
+        import pluribus_virtualwire.command_templates.mapping as mapping
+        import pluribus_virtualwire.command_templates.system as system
+        for module in (autoload, mapping, system):
+            for name, value in vars(module).iteritems():
+                if isinstance(value, CommandTemplate):
+                    _template_names[id(value)] = '{0}.{1}'.format(module.__name__.split('.')[-1], name)
+    return _template_names.get(id(command_template), 'unknown')
+
+
+class LatencyHistogram(object):
+    """
+    Latency distribution over fixed buckets, milliseconds
+    """
+    BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000)
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = 0.0
+        self.buckets = [0] * (len(self.BUCKETS) + 1)
+
+    def add(self, latency):
+        self.count += 1
+        self.total += latency
+        self.min = latency if self.min is None else min(self.min, latency)
+        self.max = max(self.max, latency)
+        self.buckets[bisect_left(self.BUCKETS, latency)] += 1
+
+    def to_dict(self):
+        buckets = OrderedDict()
+        for limit, count in zip(self.BUCKETS, self.buckets):
+            buckets['<={}'.format(limit)] = count
+        buckets['>{}'.format(self.BUCKETS[-1])] = self.buckets[-1]
+        return OrderedDict([('count', self.count),
+                            ('mean_ms', round(self.total / self.count, 3) if self.count else 0),
+                            ('min_ms', round(self.min or 0, 3)),
+                            ('max_ms', round(self.max, 3)),
+                            ('buckets', buckets)])
+
+
+class CommandScope(object):
+    """
+    Stats of one driver command call
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.start_time = time.time()
+        self.round_trips = 0
+        self.bytes_received = 0
+        self.records = OrderedDict()
+        self._lock = threading.Lock()
+
+    def record(self, key, elapsed):
+        with self._lock:
+            self.records.setdefault(key, []).append(elapsed)
+
+    def count_round_trip(self):
+        with self._lock:
+            self.round_trips += 1
+
+    def count_bytes(self, bytes_received):
+        with self._lock:
+            self.bytes_received += bytes_received
+
+    def summary(self, elapsed):
+        items = ['{0:.1f} ms, {1} round trips, {2} bytes'.format(elapsed * 1000, self.round_trips,
+                                                                  self.bytes_received)]
+        for key, latencies in self.records.iteritems():
+            items.append('{0} {1:.1f} ms x{2}'.format(key, sum(latencies) * 1000, len(latencies)))
+        return 'Stats {0}: {1}'.format(self.name, '; '.join(items))
+
+
+class CommandStats(object):
+    """
+    Latency histograms, round trips and received bytes aggregated per driver command and command template
+    """
+    """Seconds between writes of the stats file"""
+    FLUSH_INTERVAL = 60
+
+    def __init__(self, logger, enabled=True, file_path=None, flush_interval=FLUSH_INTERVAL):
+        """
+        :param logger: command logger, every driver command logs its stats summary
+        :type logger: Logger
+        :param enabled:
+        :type enabled: bool
+        :param file_path: json file rewritten with aggregated stats by a background thread and on close
+        :type file_path: str
+        :param flush_interval: seconds between writes of the file, 0 - written on close only
+        :type flush_interval: int
+        """
+        self._logger = logger
+        self._enabled = enabled
+        self._file_path = file_path
+        self._flush_interval = flush_interval
+        self._stats = OrderedDict()
+        self._changed = False
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._flush_thread = None
+        self._stop_event = threading.Event()
+
+    @contextmanager
+    def command(self, name):
+        """
+        Collect stats of the driver command executed in the current thread
+        :param name: driver command name, 'MapBidi'
+        :type name: str
+        """
+        if not self._enabled:
+            yield None
+            return
+        scope = CommandScope(name)
+        with activate(scope):
+            try:
+                yield scope
+            finally:
+                self._complete(scope)
+
+    @staticmethod
+    def driver_command(name):
+        """
+        Decorator for DriverCommands methods, the instance must have _command_stats attribute
+        """
+
+        def decorator(method):
+            @wraps(method)
+            def wrapper(self, *args, **kwargs):
+                with self._command_stats.command(name):
+                    return method(self, *args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def _complete(self, scope):
+        elapsed = time.time() - scope.start_time
+        self._logger.info(scope.summary(elapsed))
+        with self._lock:
+            command_stats = self._stats.get(scope.name)
+            if not command_stats:
+                command_stats = self._stats[scope.name] = {'latency': LatencyHistogram(), 'round_trips': 0,
+                                                           'bytes_received': 0, 'templates': OrderedDict()}
+            command_stats['latency'].add(elapsed * 1000)
+            command_stats['round_trips'] += scope.round_trips
+            command_stats['bytes_received'] += scope.bytes_received
+            for key, latencies in scope.records.iteritems():
+                histogram = command_stats['templates'].setdefault(key, LatencyHistogram())
+                for latency in latencies:
+                    histogram.add(latency * 1000)
+            self._changed = True
+            self._start_flush()
+
+    def to_dict(self):
+        stats = OrderedDict()
+        for name, command_stats in self._stats.iteritems():
+            stats[name] = OrderedDict([
+                ('latency', command_stats['latency'].to_dict()),
+                ('round_trips', command_stats['round_trips']),
+                ('bytes_received', command_stats['bytes_received']),
+                ('templates', OrderedDict((key, histogram.to_dict())
+                                          for key, histogram in command_stats['templates'].iteritems()))])
+        return stats
+
+    def flush(self):
+        """
+        Write the stats file if stats changed since the last write
+        """
+        if not self._file_path:
+            return
+        with self._flush_lock:
+            with self._lock:
+                if not self._changed:
+                    return
+                stats = self.to_dict()
+                self._changed = False
+            try:
+                with open(self._file_path, 'w') as stats_file:
+                    json.dump(stats, stats_file, indent=2)
+            except (IOError, OSError) as e:
+                self._logger.warning('Cannot write stats file {0}: {1}'.format(self._file_path, e))
+
+    def _flush_loop(self):
+        while not self._stop_event.wait(self._flush_interval):
+            self.flush()
+
+    def _start_flush(self):
+        if self._file_path and self._flush_interval and not self._flush_thread and not self._stop_event.is_set():
+            self._flush_thread = threading.Thread(target=self._flush_loop, name='VWCommandStatsFlush')
+            self._flush_thread.daemon = True
+            self._flush_thread.start()
+
+    def close(self):
+        """
+        Stop periodic writes and write the pending stats
+        """
+        self._stop_event.set()
+        self.flush()
+
+
+class TimedContextManager(object):
+    """
+    Context manager wrapper recording time spent in __enter__
+    """
+
+    def __init__(self, context_manager, key):
+        self._context_manager = context_manager
+        self._key = key
+
+    def __enter__(self):
+        with timed(self._key):
+            return self._context_manager.__enter__()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return self._context_manager.__exit__(exc_type, exc_val, exc_tb)
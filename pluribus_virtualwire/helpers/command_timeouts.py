@@ -0,0 +1,92 @@
+import math
+import threading
+from collections import deque
+
+
+class AdaptiveTimeouts(object):
+    """
+    Command timeouts per command template derived from the observed latency percentile,
+    bounded by the floor and the ceiling. Templates without enough samples use the ceiling
+    """
+    FLOOR = 5
+    CEILING = 30
+    MULTIPLIER = 4
+    PERCENTILE = 99
+    MIN_SAMPLES = 20
+    WINDOW = 200
+
+    def __init__(self, floor=FLOOR, ceiling=CEILING, multiplier=MULTIPLIER, percentile=PERCENTILE,
+                 min_samples=MIN_SAMPLES, window=WINDOW, template_limits=None):
+        """
+        :param floor: min timeout, seconds
+        :param ceiling: max timeout, seconds
+        :param multiplier: timeout is the latency percentile multiplied by it
+        :param percentile: latency percentile, 99
+        :param min_samples: count of samples required to adapt the timeout
+        :param window: count of the last samples kept per template
+        :param template_limits: floor and ceiling by template name, {'mapping.ASSOCIATIONS': {'CEILING': 120}}
+        :type template_limits: dict
+        """
+        self._floor = floor
+        self._ceiling = ceiling
+        self._multiplier = multiplier
+        self._percentile = percentile
+        self._min_samples = min_samples
+        self._window = window
+        self._template_limits = template_limits or {}
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_runtime_config(cls, runtime_config):
+        """
+        :type runtime_config: cloudshell.layer_one.core.helper.runtime_configuration.RuntimeConfiguration
+        :return: timeouts, None if disabled
+        :rtype: AdaptiveTimeouts
+        """
+        if not runtime_config.read_key('CLI.TIMEOUTS.ADAPTIVE', False):
+            return None
+        return cls(floor=runtime_config.read_key('CLI.TIMEOUTS.FLOOR', cls.FLOOR),
+                   ceiling=runtime_config.read_key('CLI.TIMEOUTS.CEILING', cls.CEILING),
+                   multiplier=runtime_config.read_key('CLI.TIMEOUTS.MULTIPLIER', cls.MULTIPLIER),
+                   percentile=runtime_config.read_key('CLI.TIMEOUTS.PERCENTILE', cls.PERCENTILE),
+                   min_samples=runtime_config.read_key('CLI.TIMEOUTS.MIN_SAMPLES', cls.MIN_SAMPLES),
+                   template_limits=runtime_config.read_key('CLI.TIMEOUTS.TEMPLATES', {}))
+
+    def _limits(self, name):
+        limits = self._template_limits.get(name) or {}
+        return limits.get('FLOOR', self._floor), limits.get('CEILING', self._ceiling)
+
+    def timeout(self, name):
+        """
+        :param name: command template name, 'mapping.ASSOCIATIONS'
+        :type name: str
+        :return: seconds
+        :rtype: float
+        """
+        floor, ceiling = self._limits(name)
+        with self._lock:
+            samples = sorted(self._samples.get(name, ()))
+        if len(samples) < self._min_samples:
+            return ceiling
+        index = int(math.ceil(len(samples) * self._percentile / 100.0)) - 1
+        return min(max(samples[max(index, 0)] * self._multiplier, floor), ceiling)
+
+    def observe(self, name, elapsed):
+        """
+        :param name: command template name
+        :param elapsed: command latency, seconds
+        """
+        with self._lock:
+            samples = self._samples.get(name)
+            if samples is None:
+                samples = self._samples[name] = deque(maxlen=self._window)
+            samples.append(elapsed)
+
+    def timed_out(self, name):
+        """
+        Drop samples of the template, it uses the ceiling until new samples are collected,
+        so a command which became slower is not failed by the old percentile again
+        """
+        with self._lock:
+            self._samples.pop(name, None)
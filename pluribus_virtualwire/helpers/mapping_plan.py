@@ -0,0 +1,103 @@
+from collections import namedtuple, OrderedDict
+
+import pluribus_virtualwire.command_templates.mapping as command_template
+from pluribus_virtualwire.cli.command_pipeline import CommandPipeline
+from pluribus_virtualwire.helpers.port_set import PortSet
+
+MappingOperation = namedtuple('MappingOperation', ['kind', 'name', 'arguments'])
+
+
+class MappingPlan(object):
+    """
+    Association changes requested by one driver command reduced to at most one switch command per association.
+    Delete supersedes other changes of the association, the last monitor ports win and are skipped if not changed.
+    Deletes are sent first, so ports they free can be used by the created associations
+    """
+    DELETE = 'delete'
+    MODIFY = 'modify'
+    CREATE = 'create'
+
+    def __init__(self, associations_table=None):
+        """
+        :param associations_table: current associations, required for delete and monitor ports changes
+        :type associations_table: pluribus_virtualwire.helpers.associations_table.AssociationsTable
+        """
+        self._associations_table = associations_table
+        self._deletes = OrderedDict()
+        self._modifies = OrderedDict()
+        self._creates = OrderedDict()
+
+    def delete(self, name):
+        """
+        :param name: association name
+        :type name: str
+        """
+        if name in self._associations_table:
+            self._modifies.pop(name, None)
+            self._deletes[name] = {}
+
+    def monitor_ports(self, name):
+        """
+        Monitor ports of the association including planned changes
+        :rtype: PortSet
+        """
+        monitor_ports = self._modifies.get(name)
+        if monitor_ports is None:
+            monitor_ports = self._associations_table.get(name).get(self._associations_table.MONITOR_PORTS)
+        return monitor_ports.copy()
+
+    def set_monitor_ports(self, name, monitor_ports):
+        """
+        :type name: str
+        :type monitor_ports: PortSet
+        """
+        if name in self._deletes:
+            return
+        monitor_ports = PortSet(monitor_ports)
+        if monitor_ports == self._associations_table.get(name).get(self._associations_table.MONITOR_PORTS):
+            self._modifies.pop(name, None)
+        else:
+            self._modifies[name] = monitor_ports
+
+    def create(self, name, master_port, slave_port, bidir):
+        """
+        :type name: str
+        :type master_port: str
+        :type slave_port: str
+        :type bidir: bool
+        """
+        self._creates[name] = {'master_port': master_port, 'slave_port': slave_port, 'bidir': bidir}
+
+    def operations(self):
+        """
+        :return: operations in execution order
+        :rtype: list
+        """
+        return ([MappingOperation(self.DELETE, name, arguments) for name, arguments in self._deletes.iteritems()] +
+                [MappingOperation(self.MODIFY, name, {'monitor_ports': monitor_ports})
+                 for name, monitor_ports in self._modifies.iteritems()] +
+                [MappingOperation(self.CREATE, name, arguments) for name, arguments in self._creates.iteritems()])
+
+    def __len__(self):
+        return len(self._deletes) + len(self._modifies) + len(self._creates)
+
+    def execute(self, cli_service, logger):
+        """
+        Send commands of all operations in one pipeline
+        :return: (operation, command output or exception) pairs
+        :rtype: list
+        """
+        operations = self.operations()
+        command_pipeline = CommandPipeline(cli_service, logger)
+        for operation in operations:
+            if operation.kind == self.DELETE:
+                command_pipeline.add(command_template.MAP_CLEAR, name=operation.name)
+            elif operation.kind == self.MODIFY:
+                command_pipeline.add(command_template.MODIFY_MONITOR_PORTS, name=operation.name,
+                                     ports=str(operation.arguments['monitor_ports']))
+            else:
+                command_pipeline.add(command_template.MAP_BIDI if operation.arguments['bidir'] else
+                                     command_template.MAP_UNI, name=operation.name,
+                                     master_ports=operation.arguments['master_port'],
+                                     slave_ports=operation.arguments['slave_port'])
+        return zip(operations, command_pipeline.execute(raise_on_error=False))
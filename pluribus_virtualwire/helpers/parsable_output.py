@@ -0,0 +1,101 @@
+import re
+from collections import namedtuple
+
+from pluribus_virtualwire.helpers.port_set import PortSet
+
+
+def _match(pattern):
+    compiled = re.compile(pattern + r'\Z')
+
+    def convert(value):
+        if not compiled.match(value):
+            raise ValueError(value)
+        return value
+
+    return convert
+
+
+def _flag(value):
+    value = value.lower()
+    if value in ('true', 'on', 'yes'):
+        return True
+    if value in ('false', 'off', 'no'):
+        return False
+    raise ValueError(value)
+
+
+def _port_set(value):
+    if not re.match(r'[\d,-]*\Z', value):
+        raise ValueError(value)
+    return PortSet.parse(value)
+
+
+def iter_lines(output):
+    """
+    Lines of the output one by one, without building a list of them
+    :param output: command output or iterable of lines
+    :type output: str|collections.Iterable
+    """
+    if not isinstance(output, basestring):
+        for line in output:
+            yield line.rstrip('\r\n')
+        return
+    start = 0
+    length = len(output)
+    while start < length:
+        end = output.find('\n', start)
+        if end == -1:
+            end = length
+        yield output[start:end].rstrip('\r')
+        start = end + 1
+
+
+class ParsableOutput(object):
+    """
+    Single pass parser of 'format ... parsable-delim' output, record fields are taken from the command template
+    """
+    FIELD_TYPES = {
+        'port': _match(r'\d+'),
+        'intf': _match(r'\d+'),
+        'bezel-intf': _match(r'\S+'),
+        'master-ports': _match(r'[\d,-]+'),
+        'slave-ports': _match(r'[\d,-]+'),
+        'name': _match(r'.+'),
+        'bidir': _flag,
+        'enable': _flag,
+        'monitor-ports': _port_set,
+    }
+
+    def __init__(self, command_template):
+        """
+        :param command_template: template of the command with 'format' and 'parsable-delim' options
+        :type command_template: cloudshell.cli.command_template.command_template.CommandTemplate
+        """
+        try:
+            command = command_template.prepare_command()
+        except KeyError as e:
+            raise ValueError('Parsable command cannot have parameters, {}'.format(e))
+        fields_match = re.search(r'\sformat\s+([\w,-]+)', command)
+        delimiter_match = re.search(r'\sparsable-delim\s+"?([^"\s])"?', command)
+        if not fields_match or not delimiter_match:
+            raise ValueError('Command "{}" does not have parsable output'.format(command))
+        self.fields = fields_match.group(1).split(',')
+        self.delimiter = delimiter_match.group(1)
+        self.record_type = namedtuple('Record', [field.replace('-', '_') for field in self.fields])
+        self._converters = [self.FIELD_TYPES.get(field, _match(r'.+')) for field in self.fields]
+
+    def records(self, output):
+        """
+        Records of the output, lines which do not match the fields are skipped
+        :param output: command output or iterable of lines
+        :type output: str|collections.Iterable
+        """
+        fields_count = len(self.fields)
+        for line in iter_lines(output):
+            values = line.strip().split(self.delimiter)
+            if len(values) != fields_count:
+                continue
+            try:
+                yield self.record_type._make(convert(value) for convert, value in zip(self._converters, values))
+            except ValueError:
+                continue
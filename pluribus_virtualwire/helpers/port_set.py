@@ -0,0 +1,102 @@
+class PortSet(object):
+    """
+    Set of logical port ids backed by a bitset, parsed from and formatted to the switch range syntax, "1-3,5"
+    """
+
+    def __init__(self, ports=None):
+        """
+        :param ports: logical port ids
+        :type ports: collections.Iterable
+        """
+        self._bits = 0
+        for port in ports or []:
+            self.add(port)
+
+    @classmethod
+    def parse(cls, ports):
+        """
+        :param ports: ports in the switch range syntax, "1-3,5"
+        :type ports: str
+        :rtype: PortSet
+        :raises ValueError: if a record is not a port id or an ascending range
+        """
+        port_set = cls()
+        for record in ports.split(','):
+            record = record.strip()
+            if '-' in record:
+                start, end = map(int, record.split('-'))
+                if start > end:
+                    raise ValueError('Reversed port range "{}"'.format(record))
+                port_set._bits |= (1 << end + 1) - (1 << start)
+            elif record:
+                port_set.add(record)
+        return port_set
+
+    @classmethod
+    def _from_bits(cls, bits):
+        port_set = cls()
+        port_set._bits = bits
+        return port_set
+
+    def add(self, port):
+        self._bits |= 1 << int(port)
+
+    def discard(self, port):
+        self._bits &= ~(1 << int(port))
+
+    def __contains__(self, port):
+        return bool(self._bits >> int(port) & 1)
+
+    def __iter__(self):
+        """
+        Port ids as strings in ascending order
+        """
+        bits = self._bits
+        while bits:
+            lowest_bit = bits & -bits
+            yield str(lowest_bit.bit_length() - 1)
+            bits ^= lowest_bit
+
+    def __len__(self):
+        return bin(self._bits).count('1')
+
+    def __nonzero__(self):
+        return bool(self._bits)
+
+    def __or__(self, other):
+        return self._from_bits(self._bits | other._bits)
+
+    def __and__(self, other):
+        return self._from_bits(self._bits & other._bits)
+
+    def __sub__(self, other):
+        return self._from_bits(self._bits & ~other._bits)
+
+    def __eq__(self, other):
+        return isinstance(other, PortSet) and self._bits == other._bits
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self._bits)
+
+    def copy(self):
+        return self._from_bits(self._bits)
+
+    def __str__(self):
+        ranges = []
+        start = end = None
+        for port in map(int, self):
+            if end is not None and port == end + 1:
+                end = port
+                continue
+            if start is not None:
+                ranges.append(str(start) if start == end else '{0}-{1}'.format(start, end))
+            start = end = port
+        if start is not None:
+            ranges.append(str(start) if start == end else '{0}-{1}'.format(start, end))
+        return ','.join(ranges)
+
+    def __repr__(self):
+        return 'PortSet({})'.format(self)
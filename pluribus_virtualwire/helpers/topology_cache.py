@@ -0,0 +1,115 @@
+import threading
+
+
+class TopologyCache(object):
+    """
+    Device topology shared by the actions, bezel to logical ports map and associations table.
+    A table read from the device is stored only if the cached one was not changed or replaced since the read started
+    """
+    TABLES = ('phys_to_logical', 'associations')
+
+    def __init__(self, logger):
+        """
+        :param logger:
+        :type logger: Logger
+        """
+        self._logger = logger
+        self.phys_to_logical = None
+        self.associations = None
+        self.state_id = None
+        # Incremented on every change made by the driver and on every replace, a table read meanwhile is outdated
+        self._generations = dict.fromkeys(self.TABLES, 0)
+        self._lock = threading.Lock()
+
+    @property
+    def generation(self):
+        """
+        Generation of the tables, taken before the tables are read from the device
+        :rtype: dict
+        """
+        with self._lock:
+            return dict(self._generations)
+
+    def invalidate(self):
+        """
+        Drop cached tables, next access re-reads them from the device
+        """
+        with self._lock:
+            for name in self.TABLES:
+                self._replace(name, None)
+
+    def drop_associations(self):
+        """
+        Drop the cached associations table, next access re-reads it from the device
+        """
+        with self._lock:
+            self._replace('associations', None)
+
+    def _replace(self, name, table):
+        self._generations[name] += 1
+        setattr(self, name, table)
+
+    def store(self, generation, **tables):
+        """
+        Keep tables read from the device, each one if it was not changed or replaced since the generation was taken
+        :param generation: generation before the tables were read
+        :type generation: dict
+        :param tables: phys_to_logical and associations tables by name
+        :return: True if all tables were stored
+        :rtype: bool
+        """
+        stored = True
+        with self._lock:
+            for name, table in tables.iteritems():
+                if generation[name] != self._generations[name]:
+                    self._logger.debug('Topology changed while {} was read, the table is not cached'.format(name))
+                    stored = False
+                    continue
+                self._replace(name, table)
+        return stored
+
+    def update_associations(self, associations, update, *args):
+        """
+        Apply a change made on the device by the driver to the cached associations table
+        :param associations: table used by the driver command, updated as well if another command replaced the cached
+            one meanwhile
+        :type associations: pluribus_virtualwire.helpers.associations_table.AssociationsTable
+        :param update: AssociationsTable method, called with the table and args
+        """
+        with self._lock:
+            self._generations['associations'] += 1
+            if self.associations is not None:
+                update(self.associations, *args)
+            if associations is not None and associations is not self.associations:
+                update(associations, *args)
+
+    def swap(self, generation, state_id, phys_to_logical, associations):
+        """
+        Replace tables with a snapshot read from the device, if the driver did not change them meanwhile
+        :param generation: generation before the snapshot was read
+        :type generation: dict
+        :type state_id: str
+        :type phys_to_logical: dict
+        :type associations: pluribus_virtualwire.helpers.associations_table.AssociationsTable
+        :return: True if replaced
+        :rtype: bool
+        """
+        with self._lock:
+            if generation != self._generations:
+                return False
+            self.state_id = state_id
+            self._replace('phys_to_logical', phys_to_logical)
+            self._replace('associations', associations)
+            return True
+
+    def update_state_id(self, state_id):
+        """
+        Invalidate tables if the device state id was changed
+        :param state_id: motd state id read from the device
+        :type state_id: str
+        """
+        if self.state_id is not None and self.state_id != state_id:
+            self._logger.debug('State id changed from {0} to {1}, invalidating topology cache'.format(
+                self.state_id, state_id))
+            self.invalidate()
+        self.state_id = state_id
@@ -0,0 +1,88 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+from threading import Thread, Event
+
+import pluribus_virtualwire.command_templates.mapping as mapping_template
+import pluribus_virtualwire.command_templates.system as system_template
+from pluribus_virtualwire.cli.command_pipeline import CommandPipeline
+from pluribus_virtualwire.command_actions.mapping_actions import MappingActions
+from pluribus_virtualwire.command_actions.system_actions import SystemActions
+from pluribus_virtualwire.helpers.associations_table import AssociationsTable
+
+
+class TopologyRefresher(object):
+    """
+    Background thread which keeps the topology cache warm, state id, ports map and associations are polled
+    over an idle pooled session
+    """
+
+    def __init__(self, address, cli_handler, topology_cache, logger, interval):
+        """
+        :param address: resource address
+        :type address: str
+        :type cli_handler: pluribus_virtualwire.cli.vw_cli_handler.VWCliHandler
+        :type topology_cache: pluribus_virtualwire.helpers.topology_cache.TopologyCache
+        :param logger:
+        :type logger: Logger
+        :param interval: seconds between polls
+        :type interval: int
+        """
+        self._address = address
+        self._cli_handler = cli_handler
+        self._topology_cache = topology_cache
+        self._logger = logger
+        self._interval = interval
+        self._thread = None
+        self._stop_event = Event()
+
+    def start(self):
+        if not self._thread:
+            self._thread = Thread(target=self._refresh_loop, name='VWTopologyRefresher')
+            self._thread.daemon = True
+            self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def _refresh_loop(self):
+        while not self._stop_event.wait(self._interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                self._logger.debug('Topology refresh of {0} failed: {1}'.format(self._address, e))
+
+    def refresh(self):
+        """
+        Read a topology snapshot and swap it in the cache
+        :return: True if the cache was updated
+        :rtype: bool
+        """
+        # Driver commands have priority, a new session is not opened for polling
+        if not self._cli_handler.has_idle_session():
+            return False
+        generation = self._topology_cache.generation
+        with self._cli_handler.default_mode_service() as session:
+            state_id_output, phys_to_logical_output, associations_output = CommandPipeline(
+                session, self._logger).add(system_template.GET_STATE_ID).add(mapping_template.PHYS_TO_LOGICAL).add(
+                mapping_template.ASSOCIATIONS).execute()
+        phys_to_logical = {record.bezel_intf: record.port
+                           for record in MappingActions.PHYS_TO_LOGICAL_PARSER.records(phys_to_logical_output)}
+        associations = AssociationsTable.parse(associations_output)
+        previous_associations = self._topology_cache.associations
+        if not self._topology_cache.swap(generation, SystemActions.parse_state_id(state_id_output), phys_to_logical,
+                                         associations):
+            self._logger.debug('Topology of {} changed by a driver command, snapshot dropped'.format(self._address))
+            return False
+        if previous_associations is not None:
+            self._log_changes(previous_associations, associations)
+        return True
+
+    def _log_changes(self, previous_associations, associations):
+        added = [name for name in associations if name not in previous_associations]
+        removed = [name for name in previous_associations if name not in associations]
+        modified = [name for name in associations
+                    if name in previous_associations and associations.get(name) != previous_associations.get(name)]
+        if added or removed or modified:
+            self._logger.info(
+                'Associations of {0} changed out of band, added: {1}, removed: {2}, modified: {3}'.format(
+                    self._address, ', '.join(sorted(added)), ', '.join(sorted(removed)), ', '.join(sorted(modified))))
@@ -0,0 +1,5 @@
+import os
+from unittest import skipUnless
+
+# Benchmarks driving the simulator over TCP take seconds each, they are run on demand
+slow = skipUnless(os.environ.get('RUN_SLOW_TESTS'), 'slow benchmark, set RUN_SLOW_TESTS=1 to run it')
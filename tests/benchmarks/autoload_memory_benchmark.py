@@ -0,0 +1,111 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""
+Per-port memory footprint and build time of the autoload port table and of the materialized resource entities
+
+    python -m tests.benchmarks.autoload_memory_benchmark --ports-count 64 256 1024
+"""
+import argparse
+import gc
+import json
+import logging
+import sys
+import time
+import types
+from collections import OrderedDict
+
+from pluribus_virtualwire.autoload.autoload import Autoload
+from pluribus_virtualwire.command_actions.autoload_actions import AutoloadActions
+from tests.simulator.cli_service import SimulatorCliService
+from tests.simulator.pluribus_device import PluribusDevice
+
+SHARED_TYPES = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType)
+
+
+def deep_sizeof(obj):
+    """
+    Size of the object and of all objects reachable from it, classes and modules are not counted
+    :rtype: int
+    """
+    seen = set()
+    pending = [obj]
+    size = 0
+    while pending:
+        current = pending.pop()
+        if id(current) in seen or isinstance(current, SHARED_TYPES):
+            continue
+        seen.add(id(current))
+        size += sys.getsizeof(current)
+        pending.extend(gc.get_referents(current))
+    return size
+
+
+class AutoloadMemoryBenchmark(object):
+    """
+    Read the port table from the simulator and materialize the resource structure of it
+    """
+    ADDRESS = '127.0.0.1'
+
+    def __init__(self, logger=None):
+        self._logger = logger or logging.getLogger('benchmark')
+
+    def run_ports_count(self, ports_count, associations_count=0):
+        """
+        :return: footprint in bytes per port and build times
+        :rtype: collections.OrderedDict
+        """
+        device = PluribusDevice(ports_count, associations_count)
+        autoload_actions = AutoloadActions(SimulatorCliService(device), self._logger)
+        board_table = autoload_actions.board_table()
+        associations_table = autoload_actions.associations_table()
+
+        start_time = time.time()
+        ports_table = autoload_actions.ports_table()
+        table_time = time.time() - start_time
+
+        autoload = Autoload(self.ADDRESS, board_table, ports_table, associations_table, self._logger)
+        start_time = time.time()
+        chassis = autoload.build_structure()
+        materialize_time = time.time() - start_time
+        ports = chassis[0].child_resources.values()[0].child_resources
+
+        return OrderedDict([('ports', len(ports_table)),
+                            ('table_bytes_per_port', float(deep_sizeof(ports_table)) / len(ports_table)),
+                            ('entity_bytes_per_port', float(deep_sizeof(ports)) / len(ports)),
+                            ('table_ms', 1000 * table_time),
+                            ('materialize_ms', 1000 * materialize_time)])
+
+    def run(self, ports_counts):
+        """
+        :type ports_counts: list
+        :rtype: list
+        """
+        return [self.run_ports_count(ports_count, ports_count / 8) for ports_count in ports_counts]
+
+
+def format_results(results):
+    lines = ['{0:>7}{1:>16}{2:>17}{3:>11}{4:>17}'.format('Ports', 'Table B/port', 'Entity B/port', 'Table ms',
+                                                          'Materialize ms')]
+    for record in results:
+        lines.append('{0:>7}{1:>16.0f}{2:>17.0f}{3:>11.1f}{4:>17.1f}'.format(
+            record['ports'], record['table_bytes_per_port'], record['entity_bytes_per_port'], record['table_ms'],
+            record['materialize_ms']))
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Autoload memory benchmark')
+    parser.add_argument('--ports-count', type=int, nargs='+', default=[64, 256, 1024])
+    parser.add_argument('--json', help='Write results to the file')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    results = AutoloadMemoryBenchmark().run(args.ports_count)
+    print(format_results(results))
+    if args.json:
+        with open(args.json, 'w') as json_file:
+            json.dump(results, json_file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
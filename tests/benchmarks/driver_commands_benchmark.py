@@ -0,0 +1,159 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""
+End-to-end latency benchmark of DriverCommands against the local Pluribus simulator
+
+    python -m tests.benchmarks.driver_commands_benchmark --ports-count 128 --associations-count 32 --latency 0.005
+"""
+import argparse
+import json
+import logging
+import time
+from collections import OrderedDict
+
+from pluribus_virtualwire.driver_commands import DriverCommands
+from tests.simulator.pluribus_device import PluribusDevice, parse_latency
+from tests.simulator.pluribus_server import SERVERS
+from tests.simulator.runtime_configuration import SimulatorRuntimeConfiguration
+
+
+class DriverCommandsBenchmark(object):
+    """
+    Run every DriverCommands method against the simulator and collect wall time and CLI round trips
+    """
+    ADDRESS = '127.0.0.1'
+    USERNAME = 'admin'
+    PASSWORD = 'admin'
+
+    def __init__(self, device, session_type='SSH', uni_ports_count=16, tap_ports_count=8, logger=None,
+                 runtime_config=None):
+        """
+        :type device: tests.simulator.pluribus_device.PluribusDevice
+        :param session_type: SSH or TELNET
+        :param uni_ports_count: count of destination ports for MapUni
+        :param tap_ports_count: count of monitor ports for MapTap
+        :param runtime_config: additional runtime configuration keys
+        :type runtime_config: dict
+        """
+        self._device = device
+        self._session_type = session_type
+        self._uni_ports_count = uni_ports_count
+        self._tap_ports_count = tap_ports_count
+        self._logger = logger or logging.getLogger('benchmark')
+        self._runtime_config = runtime_config or {}
+        self._results = OrderedDict()
+
+        free_ports = range(len(device.associations) * 2 + 1, device.ports_count + 1)
+        required_ports = 2 + tap_ports_count + 1 + uni_ports_count
+        if len(free_ports) < required_ports:
+            raise ValueError('Simulator needs at least {} ports without associations'.format(required_ports))
+        self._bidi_ports = [self._address(port) for port in free_ports[:2]]
+        self._tap_ports = [self._address(port) for port in free_ports[2:2 + tap_ports_count]]
+        uni_ports = free_ports[2 + tap_ports_count:required_ports]
+        self._uni_src_port = self._address(uni_ports[0])
+        self._uni_dst_ports = [self._address(port) for port in uni_ports[1:]]
+
+    def _address(self, logical_port):
+        return '{0}/1/{1}'.format(self.ADDRESS, self._device.bezel_intf(logical_port))
+
+    def _measure(self, name, method, *args):
+        record = self._results.setdefault(name, {'calls': 0, 'errors': 0, 'wall_time': [], 'round_trips': []})
+        round_trips = self._device.round_trips
+        start_time = time.time()
+        try:
+            method(*args)
+        except Exception as e:
+            self._logger.warning('{0} failed: {1}'.format(name, e))
+            record['errors'] += 1
+        record['calls'] += 1
+        record['wall_time'].append(time.time() - start_time)
+        record['round_trips'].append(self._device.round_trips - round_trips)
+
+    def _create_driver(self, server):
+        configuration = {'CLI': {'TYPE': [self._session_type], 'PORTS': {self._session_type: server.port}}}
+        for key, value in self._runtime_config.iteritems():
+            if isinstance(value, dict):
+                configuration.setdefault(key, {}).update(value)
+            else:
+                configuration[key] = value
+        return DriverCommands(self._logger, SimulatorRuntimeConfiguration(configuration))
+
+    def run_iteration(self, driver):
+        """
+        One full reservation cycle, leaves the simulator in the initial state
+        :type driver: DriverCommands
+        """
+        self._measure('Login', driver.login, self.ADDRESS, self.USERNAME, self.PASSWORD)
+        self._measure('GetResourceDescription', driver.get_resource_description, self.ADDRESS)
+        self._measure('GetStateId', driver.get_state_id)
+        self._measure('MapBidi', driver.map_bidi, *self._bidi_ports)
+        self._measure('MapTap', driver.map_tap, self._bidi_ports[0], self._tap_ports)
+        self._measure('MapClearTo', driver.map_clear_to, self._bidi_ports[0], self._tap_ports)
+        self._measure('MapUni', driver.map_uni, self._uni_src_port, self._uni_dst_ports)
+        self._measure('MapClear', driver.map_clear, [self._uni_src_port] + self._uni_dst_ports + self._bidi_ports)
+
+    def run(self, iterations=1):
+        """
+        :return: results per driver command
+        :rtype: collections.OrderedDict
+        """
+        self._results = OrderedDict()
+        with SERVERS[self._session_type](self._device, self.USERNAME, self.PASSWORD) as server:
+            driver = self._create_driver(server)
+            try:
+                for _ in range(iterations):
+                    self.run_iteration(driver)
+            finally:
+                driver.close()
+        return self.summary()
+
+    def summary(self):
+        summary = OrderedDict()
+        for name, record in self._results.iteritems():
+            wall_time = record['wall_time']
+            summary[name] = OrderedDict([('calls', record['calls']),
+                                         ('errors', record['errors']),
+                                         ('mean_ms', 1000 * sum(wall_time) / len(wall_time)),
+                                         ('min_ms', 1000 * min(wall_time)),
+                                         ('max_ms', 1000 * max(wall_time)),
+                                         ('round_trips', float(sum(record['round_trips'])) / record['calls'])])
+        return summary
+
+
+def format_summary(summary):
+    lines = ['{0:<24}{1:>7}{2:>8}{3:>11}{4:>11}{5:>11}{6:>13}'.format('Command', 'Calls', 'Errors', 'Mean ms',
+                                                                     'Min ms', 'Max ms', 'Round trips')]
+    for name, record in summary.iteritems():
+        lines.append('{0:<24}{1:>7}{2:>8}{3:>11.1f}{4:>11.1f}{5:>11.1f}{6:>13.1f}'.format(
+            name, record['calls'], record['errors'], record['mean_ms'], record['min_ms'], record['max_ms'],
+            record['round_trips']))
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='DriverCommands latency benchmark')
+    parser.add_argument('--type', default='SSH', choices=SERVERS.keys())
+    parser.add_argument('--ports-count', type=int, default=64)
+    parser.add_argument('--associations-count', type=int, default=8)
+    parser.add_argument('--latency', default='0',
+                        help='Default latency and per-command overrides, 0.01,port-association-show=0.2')
+    parser.add_argument('--uni-ports', type=int, default=16)
+    parser.add_argument('--tap-ports', type=int, default=8)
+    parser.add_argument('--iterations', type=int, default=3)
+    parser.add_argument('--pool-size', type=int, default=1, help='CLI.POOL_SIZE of the driver')
+    parser.add_argument('--json', help='Write results to the file')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    latency, command_latency = parse_latency(args.latency)
+    device = PluribusDevice(args.ports_count, args.associations_count, latency, command_latency)
+    summary = DriverCommandsBenchmark(device, args.type, args.uni_ports, args.tap_ports,
+                                      runtime_config={'CLI': {'POOL_SIZE': args.pool_size}}).run(args.iterations)
+    print(format_summary(summary))
+    if args.json:
+        with open(args.json, 'w') as json_file:
+            json.dump(summary, json_file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,382 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""
+Concurrent load of the driver over its TCP port: DriverListener -> CommandExecutor -> DriverCommands
+against the local Pluribus simulator, many clients replay a weighted mix of XML requests
+
+    python -m tests.benchmarks.driver_load_benchmark --clients 16 --requests 50 --pool-size 2 \
+        --mix GetStateId=4,MapBidi=2,MapClear=2,GetResourceDescription=1,Login=1
+"""
+import argparse
+import json
+import logging
+import math
+import random
+import re
+import socket
+import threading
+import time
+from collections import OrderedDict
+from xml.etree import ElementTree
+
+from cloudshell.layer_one.core.command_executor import CommandExecutor
+from cloudshell.layer_one.core.driver_listener import DriverListener
+from pluribus_virtualwire.driver_commands import DriverCommands
+from tests.simulator.pluribus_device import PluribusDevice, parse_latency
+from tests.simulator.pluribus_server import SERVERS
+from tests.simulator.runtime_configuration import SimulatorRuntimeConfiguration
+
+COMMANDS_NAMESPACE = 'http://schemas.qualisystems.com/ResourceManagement/DriverCommands.xsd'
+DEFAULT_MIX = 'GetStateId=4,MapBidi=2,MapClear=2,GetResourceDescription=1,Login=1'
+
+
+def parse_mix(mix):
+    """
+    :param mix: weights by command name, 'GetStateId=4,MapBidi=2'
+    :rtype: collections.OrderedDict
+    """
+    weights = OrderedDict()
+    for item in mix.split(','):
+        name, _, weight = item.partition('=')
+        if name.strip() not in DriverLoadClient.COMMANDS:
+            raise ValueError('Unsupported command {}'.format(name))
+        weights[name.strip()] = float(weight or 1)
+    return weights
+
+
+def percentile(samples, value):
+    """
+    Nearest-rank percentile
+    :param samples: sorted samples
+    :param value: 0-100
+    """
+    index = int(math.ceil(len(samples) * value / 100.0)) - 1
+    return samples[max(index, 0)]
+
+
+def command_request(name, command_id, parameters=()):
+    """
+    :param name: driver command name, 'MapBidi'
+    :param parameters: (name, value) pairs, a name repeats for list parameters
+    :return: XML request of one command
+    :rtype: str
+    """
+    commands_node = ElementTree.Element('Commands', xmlns=COMMANDS_NAMESPACE)
+    command_node = ElementTree.SubElement(commands_node, 'Command', CommandName=name, CommandId=command_id)
+    parameters_node = ElementTree.SubElement(command_node, 'Parameters')
+    for parameter_name, value in parameters:
+        ElementTree.SubElement(parameters_node, parameter_name).text = value
+    return ElementTree.tostring(commands_node)
+
+
+class DriverLoadClient(object):
+    """
+    One CloudShell connection sending one command per request, mapping commands use the own port pair of the client,
+    MapBidi of a mapped pair is sent as MapClear and vice versa, so the mix does not produce expected errors
+    """
+    COMMANDS = ('Login', 'GetResourceDescription', 'GetStateId', 'MapBidi', 'MapClear')
+    RESPONSE_END = re.compile(r'</Responses>\s*$')
+    BUFFER_SIZE = 65536
+
+    def __init__(self, index, driver_port, address, username, password, ports, mix, requests_count, reconnect=False,
+                 timeout=120, seed=0):
+        """
+        :param driver_port: TCP port of the driver listener
+        :param address: switch address
+        :param ports: two port addresses used by mapping commands
+        :param mix: weights by command name
+        :type mix: collections.OrderedDict
+        :param requests_count: count of requests after Login
+        :param reconnect: open a new connection for every request
+        :param timeout: response timeout, seconds
+        """
+        self._index = index
+        self._driver_port = driver_port
+        self._address = address
+        self._username = username
+        self._password = password
+        self._ports = ports
+        self._requests_count = requests_count
+        self._reconnect = reconnect
+        self._timeout = timeout
+        self._random = random.Random(seed + index)
+        self._names = mix.keys()
+        self._cumulative_weights = []
+        total = 0
+        for weight in mix.values():
+            total += weight
+            self._cumulative_weights.append(total)
+        self._mapped = False
+        self._connection = None
+        self._requests_sent = 0
+        self.samples = []
+
+    def _next_command(self):
+        point = self._random.random() * self._cumulative_weights[-1]
+        for name, cumulative_weight in zip(self._names, self._cumulative_weights):
+            if point < cumulative_weight:
+                break
+        if name in ('MapBidi', 'MapClear'):
+            return 'MapClear' if self._mapped else 'MapBidi'
+        return name
+
+    def _parameters(self, name):
+        if name == 'Login':
+            return [('Address', self._address), ('User', self._username), ('Password', self._password)]
+        elif name == 'GetResourceDescription':
+            return [('Address', self._address)]
+        elif name == 'MapBidi':
+            return [('MapPort_A', self._ports[0]), ('MapPort_B', self._ports[1])]
+        elif name == 'MapClear':
+            return [('MapPort', port) for port in self._ports]
+        return []
+
+    def _connect(self):
+        if not self._connection:
+            self._connection = socket.create_connection(('127.0.0.1', self._driver_port), self._timeout)
+
+    def close(self):
+        if self._connection:
+            self._connection.close()
+            self._connection = None
+
+    def _exchange(self, request):
+        self._connect()
+        try:
+            self._connection.sendall(request)
+            chunks = []
+            tail = ''
+            while True:
+                chunk = self._connection.recv(self.BUFFER_SIZE)
+                if not chunk:
+                    raise socket.error('Connection closed by the driver')
+                chunks.append(chunk)
+                tail = (tail + chunk)[-64:]
+                if self.RESPONSE_END.search(tail):
+                    return ''.join(chunks)
+        except Exception:
+            self.close()
+            raise
+        finally:
+            if self._reconnect:
+                self.close()
+
+    @staticmethod
+    def _response_error(response):
+        """
+        :return: error of the command response, None on success
+        """
+        responses_node = ElementTree.fromstring(response.strip())
+        if responses_node.get('Success') == 'false':
+            return 'Request failed'
+        for node in responses_node:
+            if node.tag.endswith('CommandResponse') and node.get('Success') != 'true':
+                errors = [child.text for child in node if child.tag.endswith('Error') and child.text]
+                return errors[0] if errors else 'Command failed'
+        return None
+
+    def send(self, name):
+        """
+        Send one command and record (name, latency, error)
+        """
+        self._requests_sent += 1
+        request = command_request(name, '{0}-{1}'.format(self._index, self._requests_sent), self._parameters(name))
+        start_time = time.time()
+        try:
+            error = self._response_error(self._exchange(request))
+        except Exception as e:
+            error = type(e).__name__
+        self.samples.append((name, time.time() - start_time, error))
+        if not error and name in ('MapBidi', 'MapClear'):
+            self._mapped = name == 'MapBidi'
+
+    def run(self, start_event=None):
+        if start_event:
+            start_event.wait()
+        try:
+            self.send('Login')
+            for _ in range(self._requests_count):
+                self.send(self._next_command())
+            if self._mapped:
+                self.send('MapClear')
+        finally:
+            self.close()
+
+
+class DriverLoadBenchmark(object):
+    """
+    Serve the driver with DriverListener the way main.Main.run_driver wires it and load it with concurrent clients
+    """
+    ADDRESS = '127.0.0.1'
+    USERNAME = 'admin'
+    PASSWORD = 'admin'
+
+    def __init__(self, device, session_type='SSH', clients_count=8, requests_count=20, mix=None, reconnect=False,
+                 logger=None, runtime_config=None, seed=0):
+        """
+        :type device: tests.simulator.pluribus_device.PluribusDevice
+        :param session_type: SSH or TELNET
+        :param clients_count: concurrent connections to the driver
+        :param requests_count: requests per client after Login
+        :param mix: weights by command name
+        :type mix: collections.OrderedDict
+        :param reconnect: clients open a new connection for every request
+        :param runtime_config: additional runtime configuration keys
+        :type runtime_config: dict
+        """
+        self._device = device
+        self._session_type = session_type
+        self._clients_count = clients_count
+        self._requests_count = requests_count
+        self._mix = mix or parse_mix(DEFAULT_MIX)
+        self._reconnect = reconnect
+        self._logger = logger or logging.getLogger('benchmark')
+        self._runtime_config = runtime_config or {}
+        self._seed = seed
+
+        free_ports = range(len(device.associations) * 2 + 1, device.ports_count + 1)
+        if len(free_ports) < clients_count * 2:
+            raise ValueError('Simulator needs at least {} ports without associations'.format(clients_count * 2))
+        self._client_ports = [[self._address(port) for port in free_ports[index * 2:index * 2 + 2]]
+                              for index in range(clients_count)]
+
+    def _address(self, logical_port):
+        return '{0}/1/{1}'.format(self.ADDRESS, self._device.bezel_intf(logical_port))
+
+    def _create_driver(self, server):
+        configuration = {'CLI': {'TYPE': [self._session_type], 'PORTS': {self._session_type: server.port}}}
+        for key, value in self._runtime_config.iteritems():
+            if isinstance(value, dict):
+                configuration.setdefault(key, {}).update(value)
+            else:
+                configuration[key] = value
+        return DriverCommands(self._logger, SimulatorRuntimeConfiguration(configuration))
+
+    @staticmethod
+    def _free_port():
+        probe_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        try:
+            probe_socket.bind(('127.0.0.1', 0))
+            return probe_socket.getsockname()[1]
+        finally:
+            probe_socket.close()
+
+    def _start_listener(self, driver):
+        listener = DriverListener(CommandExecutor(driver, self._logger), self._logger, self._logger)
+        port = self._free_port()
+        thread = threading.Thread(target=listener.start_listening, args=('127.0.0.1', port))
+        thread.daemon = True
+        thread.start()
+        deadline = time.time() + 10
+        while True:
+            try:
+                socket.create_connection(('127.0.0.1', port), 1).close()
+                break
+            except socket.error:
+                if time.time() > deadline or not thread.is_alive():
+                    raise
+                time.sleep(0.01)
+        return listener, port, thread
+
+    @staticmethod
+    def _stop_listener(listener, port, thread):
+        listener.set_running(False)
+        # Wake up accept, the listener checks the flag after it
+        socket.create_connection(('127.0.0.1', port), 1).close()
+        thread.join(10)
+
+    def run(self):
+        """
+        :return: results per driver command
+        :rtype: collections.OrderedDict
+        """
+        with SERVERS[self._session_type](self._device, self.USERNAME, self.PASSWORD) as server:
+            driver = self._create_driver(server)
+            listener, port, listener_thread = self._start_listener(driver)
+            try:
+                clients = [DriverLoadClient(index, port, self.ADDRESS, self.USERNAME, self.PASSWORD,
+                                            self._client_ports[index], self._mix, self._requests_count,
+                                            self._reconnect, seed=self._seed)
+                           for index in range(self._clients_count)]
+                start_event = threading.Event()
+                threads = [threading.Thread(target=client.run, args=(start_event,)) for client in clients]
+                for thread in threads:
+                    thread.start()
+                start_time = time.time()
+                start_event.set()
+                for thread in threads:
+                    thread.join()
+                wall_time = time.time() - start_time
+            finally:
+                self._stop_listener(listener, port, listener_thread)
+        return self.summary([sample for client in clients for sample in client.samples], wall_time)
+
+    def summary(self, samples, wall_time):
+        """
+        :param samples: (command name, latency, error) of every request
+        :param wall_time: duration of the load, seconds
+        """
+        records = OrderedDict((name, []) for name in DriverLoadClient.COMMANDS)
+        records['Total'] = []
+        for sample in samples:
+            records[sample[0]].append(sample)
+            records['Total'].append(sample)
+        summary = OrderedDict()
+        for name, command_samples in records.iteritems():
+            if not command_samples:
+                continue
+            latency = sorted(sample[1] for sample in command_samples)
+            errors = [sample[2] for sample in command_samples if sample[2]]
+            summary[name] = OrderedDict([('requests', len(command_samples)),
+                                         ('errors', len(errors)),
+                                         ('error_rate', float(len(errors)) / len(command_samples)),
+                                         ('throughput_rps', len(command_samples) / wall_time),
+                                         ('p50_ms', 1000 * percentile(latency, 50)),
+                                         ('p95_ms', 1000 * percentile(latency, 95)),
+                                         ('p99_ms', 1000 * percentile(latency, 99)),
+                                         ('max_ms', 1000 * latency[-1])])
+            if errors:
+                summary[name]['first_error'] = errors[0]
+        return summary
+
+
+def format_summary(summary):
+    lines = ['{0:<24}{1:>10}{2:>8}{3:>9}{4:>10}{5:>10}{6:>10}{7:>10}{8:>10}'.format(
+        'Command', 'Requests', 'Errors', 'Error %', 'Req/s', 'p50 ms', 'p95 ms', 'p99 ms', 'Max ms')]
+    for name, record in summary.iteritems():
+        lines.append('{0:<24}{1:>10}{2:>8}{3:>9.1f}{4:>10.1f}{5:>10.1f}{6:>10.1f}{7:>10.1f}{8:>10.1f}'.format(
+            name, record['requests'], record['errors'], 100 * record['error_rate'], record['throughput_rps'],
+            record['p50_ms'], record['p95_ms'], record['p99_ms'], record['max_ms']))
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Driver concurrent load benchmark')
+    parser.add_argument('--type', default='SSH', choices=SERVERS.keys())
+    parser.add_argument('--ports-count', type=int, default=64)
+    parser.add_argument('--associations-count', type=int, default=8)
+    parser.add_argument('--latency', default='0',
+                        help='Default latency and per-command overrides, 0.01,port-association-show=0.2')
+    parser.add_argument('--clients', type=int, default=8, help='Concurrent connections to the driver')
+    parser.add_argument('--requests', type=int, default=20, help='Requests per client after Login')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help='Weights of the commands')
+    parser.add_argument('--reconnect', action='store_true', help='Open a new connection for every request')
+    parser.add_argument('--pool-size', type=int, default=2, help='CLI.POOL_SIZE of the driver')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help='Write results to the file')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    latency, command_latency = parse_latency(args.latency)
+    device = PluribusDevice(args.ports_count, args.associations_count, latency, command_latency)
+    summary = DriverLoadBenchmark(device, args.type, args.clients, args.requests, parse_mix(args.mix),
+                                  args.reconnect, runtime_config={'CLI': {'POOL_SIZE': args.pool_size}},
+                                  seed=args.seed).run()
+    print(format_summary(summary))
+    if args.json:
+        with open(args.json, 'w') as json_file:
+            json.dump(summary, json_file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""
+Time of reading large command outputs with the generic expect loop and with the tail-window prompt detection
+
+    python -m tests.benchmarks.prompt_detection_benchmark --output-size 1 4 16 --chunk-size 16384
+"""
+import argparse
+import json
+import logging
+import time
+from collections import deque, OrderedDict
+
+import pluribus_virtualwire.command_templates.mapping as mapping_template
+from cloudshell.cli.session.expect_session import ExpectSession
+from cloudshell.cli.session.session_exceptions import SessionReadTimeout
+from pluribus_virtualwire.cli.command_modes import DefaultCommandMode
+from pluribus_virtualwire.cli.tail_match_session import TailMatchSessionMixin
+
+PROMPT = 'CLI (network-admin@pluribus-sim) > '
+
+
+def associations_output(size):
+    """
+    Synthetic 'port-association-show' parsable output
+    :param size: bytes
+    :rtype: str
+    """
+    lines = []
+    length = 0
+    index = 0
+    while length < size:
+        master_port, slave_port = index * 2 + 1, index * 2 + 2
+        line = '{0}:{1}:{0}-bidi-{1}:true:{2}-{3}\n'.format(master_port, slave_port, master_port + 2,
+                                                            slave_port + 2)
+        lines.append(line)
+        length += len(line)
+        index += 1
+    return ''.join(lines)
+
+
+class ChunkedOutputSession(ExpectSession):
+    """
+    Expect session which answers every command with the output split to chunks, one chunk per read cycle
+    """
+
+    def __init__(self, output, chunk_size):
+        ExpectSession.__init__(self)
+        self._output = output
+        self._chunk_size = chunk_size
+        self._chunks = deque()
+        self._has_data = False
+
+    def connect(self, prompt, logger):
+        pass
+
+    def disconnect(self):
+        pass
+
+    def _connect_actions(self, prompt, logger):
+        pass
+
+    def _initialize_session(self, prompt, logger):
+        pass
+
+    def _send(self, command, logger):
+        data = command + '\n' + self._output + PROMPT
+        self._chunks = deque(data[start:start + self._chunk_size] for start in range(0, len(data), self._chunk_size))
+        self._has_data = True
+
+    def _receive(self, timeout, logger):
+        # Every other read times out, so every read cycle gets one chunk
+        if self._has_data and self._chunks:
+            self._has_data = False
+            return self._chunks.popleft()
+        self._has_data = True
+        raise SessionReadTimeout()
+
+    def _clear_buffer(self, timeout, logger):
+        return ''
+
+
+class TailMatchChunkedOutputSession(TailMatchSessionMixin, ChunkedOutputSession):
+    pass
+
+
+SESSIONS = OrderedDict([('generic', ChunkedOutputSession), ('tail_window', TailMatchChunkedOutputSession)])
+
+
+class PromptDetectionBenchmark(object):
+    def __init__(self, chunk_size=16384, logger=None):
+        """
+        :param chunk_size: bytes received per read cycle
+        """
+        self._chunk_size = chunk_size
+        self._logger = logger or logging.getLogger('benchmark')
+
+    def run_output_size(self, output_size):
+        """
+        :param output_size: bytes
+        :return: read time per session, milliseconds
+        :rtype: collections.OrderedDict
+        """
+        output = associations_output(output_size)
+        command = mapping_template.ASSOCIATIONS.prepare_command()
+        record = OrderedDict([('output_bytes', len(output))])
+        for name, session_class in SESSIONS.iteritems():
+            session = session_class(output, self._chunk_size)
+            start_time = time.time()
+            result = session.hardware_expect(command, DefaultCommandMode.PROMPT, self._logger,
+                                             error_map=mapping_template.ERROR_MAP)
+            record['{}_ms'.format(name)] = 1000 * (time.time() - start_time)
+            if len(result) < len(output):
+                raise AssertionError('{} session returned incomplete output'.format(name))
+        return record
+
+    def run(self, output_sizes):
+        return [self.run_output_size(output_size) for output_size in output_sizes]
+
+
+def format_results(results):
+    lines = ['{0:>12}{1:>14}{2:>16}'.format('Output MB', 'Generic ms', 'Tail window ms')]
+    for record in results:
+        lines.append('{0:>12.1f}{1:>14.1f}{2:>16.1f}'.format(float(record['output_bytes']) / 2 ** 20,
+                                                            record['generic_ms'], record['tail_window_ms']))
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Prompt detection benchmark')
+    parser.add_argument('--output-size', type=float, nargs='+', default=[1, 4, 16], help='Output size, MB')
+    parser.add_argument('--chunk-size', type=int, default=16384, help='Bytes received per read')
+    parser.add_argument('--json', help='Write results to the file')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    results = PromptDetectionBenchmark(args.chunk_size).run([int(size * 2 ** 20) for size in args.output_size])
+    print(format_results(results))
+    if args.json:
+        with open(args.json, 'w') as json_file:
+            json.dump(results, json_file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
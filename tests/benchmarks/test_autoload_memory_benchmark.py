@@ -0,0 +1,16 @@
+from unittest import TestCase
+
+from mock import Mock
+
+from tests.benchmarks.autoload_memory_benchmark import AutoloadMemoryBenchmark, deep_sizeof
+
+
+class TestAutoloadMemoryBenchmark(TestCase):
+    def test_run_ports_count(self):
+        record = AutoloadMemoryBenchmark(Mock()).run_ports_count(16, 2)
+        self.assertEqual(record['ports'], 16)
+        self.assertLess(record['table_bytes_per_port'], record['entity_bytes_per_port'])
+
+    def test_deep_sizeof_shared_objects(self):
+        value = ['x' * 100]
+        self.assertLess(deep_sizeof([value, value]), 2 * deep_sizeof(value))
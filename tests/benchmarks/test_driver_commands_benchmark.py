@@ -0,0 +1,23 @@
+from unittest import TestCase
+
+from mock import Mock
+
+from tests.benchmarks import slow
+from tests.benchmarks.driver_commands_benchmark import DriverCommandsBenchmark
+from tests.simulator.pluribus_device import PluribusDevice
+
+
+class TestDriverCommandsBenchmark(TestCase):
+    @slow
+    def test_run_iteration(self):
+        device = PluribusDevice(ports_count=12, associations_count=2)
+        initial_associations = device.associations
+        summary = DriverCommandsBenchmark(device, 'TELNET', uni_ports_count=2, tap_ports_count=2,
+                                          logger=Mock()).run()
+        self.assertEqual(summary.keys(), ['Login', 'GetResourceDescription', 'GetStateId', 'MapBidi', 'MapTap',
+                                          'MapClearTo', 'MapUni', 'MapClear'])
+        for record in summary.values():
+            self.assertEqual(record['calls'], 1)
+            self.assertEqual(record['errors'], 0)
+            self.assertGreater(record['round_trips'], 0)
+        self.assertEqual(device.associations, initial_associations)
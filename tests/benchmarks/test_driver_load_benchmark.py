@@ -0,0 +1,26 @@
+from unittest import TestCase
+
+from mock import Mock
+
+from tests.benchmarks import slow
+from tests.benchmarks.driver_load_benchmark import DriverLoadBenchmark, parse_mix
+from tests.simulator.pluribus_device import PluribusDevice
+
+
+class TestDriverLoadBenchmark(TestCase):
+    def test_parse_mix(self):
+        self.assertEqual(parse_mix('GetStateId=3,MapBidi').items(), [('GetStateId', 3.0), ('MapBidi', 1.0)])
+        self.assertRaises(ValueError, parse_mix, 'MapTap=1')
+
+    @slow
+    def test_run(self):
+        device = PluribusDevice(ports_count=12, associations_count=2)
+        initial_associations = device.associations
+        summary = DriverLoadBenchmark(device, 'TELNET', clients_count=3, requests_count=6, logger=Mock(),
+                                      runtime_config={'CLI': {'POOL_SIZE': 2}}).run()
+        self.assertGreaterEqual(summary['Total']['requests'], 3 * 7)
+        self.assertEqual(summary['Total']['errors'], 0)
+        self.assertIn('Login', summary)
+        for record in summary.values():
+            self.assertLessEqual(record['p50_ms'], record['p99_ms'])
+        self.assertEqual(device.associations, initial_associations)
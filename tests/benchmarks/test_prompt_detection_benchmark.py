@@ -0,0 +1,12 @@
+from unittest import TestCase
+
+from mock import Mock
+
+from tests.benchmarks.prompt_detection_benchmark import PromptDetectionBenchmark
+
+
+class TestPromptDetectionBenchmark(TestCase):
+    def test_run_output_size(self):
+        record = PromptDetectionBenchmark(chunk_size=4096, logger=Mock()).run_output_size(100000)
+        self.assertGreaterEqual(record['output_bytes'], 100000)
+        self.assertEqual(record.keys(), ['output_bytes', 'generic_ms', 'tail_window_ms'])
@@ -0,0 +1,27 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from mock import Mock
+
+from tests.benchmarks import slow
+from tests.benchmarks.transcript_replay_benchmark import TranscriptReplayBenchmark
+from tests.simulator.pluribus_device import PluribusDevice
+
+
+class TestTranscriptReplayBenchmark(TestCase):
+    @slow
+    def test_record_and_replay(self):
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        transcript_file = os.path.join(temp_dir, 'transcript.jsonl')
+        device = PluribusDevice(ports_count=12, associations_count=2)
+        benchmark = TranscriptReplayBenchmark(device, 'TELNET', uni_ports_count=2, tap_ports_count=2, logger=Mock())
+        recorded = benchmark.record(transcript_file)
+        round_trips = device.round_trips
+        replayed = benchmark.replay(transcript_file)
+        self.assertEqual(replayed.keys(), recorded.keys())
+        for record in replayed.values():
+            self.assertEqual(record['errors'], 0)
+        self.assertEqual(device.round_trips, round_trips)
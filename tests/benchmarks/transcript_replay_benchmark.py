@@ -0,0 +1,120 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""
+DriverCommands replayed offline from a CLI transcript recorded against the local Pluribus simulator,
+the replay time is the cost of the driver itself: parsing, autoload and mapping logic
+
+    python -m tests.benchmarks.transcript_replay_benchmark --ports-count 128 --associations-count 32 \
+        --latency 0.005 --transcript /tmp/pluribus.jsonl.gz
+"""
+import argparse
+import json
+import logging
+import os
+import shutil
+import tempfile
+from collections import OrderedDict
+
+from pluribus_virtualwire.cli.vw_replay_session import VWReplaySession
+from pluribus_virtualwire.driver_commands import DriverCommands
+from tests.benchmarks.driver_commands_benchmark import DriverCommandsBenchmark
+from tests.simulator.pluribus_device import PluribusDevice, parse_latency
+from tests.simulator.pluribus_server import SERVERS
+from tests.simulator.runtime_configuration import SimulatorRuntimeConfiguration
+
+
+class TranscriptReplayBenchmark(object):
+    """
+    Record the DriverCommandsBenchmark iterations to a transcript and replay the same iterations from it
+    """
+
+    def __init__(self, device, session_type='SSH', uni_ports_count=16, tap_ports_count=8, logger=None):
+        """
+        :type device: tests.simulator.pluribus_device.PluribusDevice
+        :param session_type: SSH or TELNET, used for recording
+        """
+        self._device = device
+        self._session_type = session_type
+        self._uni_ports_count = uni_ports_count
+        self._tap_ports_count = tap_ports_count
+        self._logger = logger or logging.getLogger('benchmark')
+
+    def _benchmark(self, runtime_config=None):
+        return DriverCommandsBenchmark(self._device, self._session_type, self._uni_ports_count, self._tap_ports_count,
+                                       self._logger, runtime_config)
+
+    def record(self, transcript_file, iterations=1):
+        """
+        :param transcript_file: absolute path, an existing transcript is extended
+        :return: results per driver command against the simulator
+        :rtype: collections.OrderedDict
+        """
+        return self._benchmark({'CLI': {'TRANSCRIPT': {'RECORD': transcript_file}}}).run(iterations)
+
+    def replay(self, transcript_file, iterations=1, time_scale=0):
+        """
+        :param time_scale: replay delay relative to the recorded timing, 0 - no delay
+        :return: results per driver command replayed from the transcript
+        :rtype: collections.OrderedDict
+        """
+        benchmark = self._benchmark()
+        driver = DriverCommands(self._logger, SimulatorRuntimeConfiguration(
+            {'CLI': {'TYPE': [VWReplaySession.SESSION_TYPE],
+                     'TRANSCRIPT': {'REPLAY': transcript_file, 'TIME_SCALE': time_scale}}}))
+        try:
+            for _ in range(iterations):
+                benchmark.run_iteration(driver)
+        finally:
+            driver.close()
+        return benchmark.summary()
+
+
+def format_results(recorded, replayed):
+    lines = ['{0:<24}{1:>14}{2:>13}{3:>10}'.format('Command', 'Recorded ms', 'Replay ms', 'Errors')]
+    for name, record in replayed.iteritems():
+        lines.append('{0:<24}{1:>14.1f}{2:>13.1f}{3:>10}'.format(
+            name, recorded[name]['mean_ms'] if name in recorded else float('nan'), record['mean_ms'],
+            record['errors']))
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='DriverCommands transcript replay benchmark')
+    parser.add_argument('--type', default='SSH', choices=SERVERS.keys())
+    parser.add_argument('--ports-count', type=int, default=64)
+    parser.add_argument('--associations-count', type=int, default=8)
+    parser.add_argument('--latency', default='0',
+                        help='Default latency and per-command overrides, 0.01,port-association-show=0.2')
+    parser.add_argument('--uni-ports', type=int, default=16)
+    parser.add_argument('--tap-ports', type=int, default=8)
+    parser.add_argument('--iterations', type=int, default=3)
+    parser.add_argument('--time-scale', type=float, default=0, help='Replay delay relative to the recorded timing')
+    parser.add_argument('--transcript', help='Transcript file, replayed without recording if it exists')
+    parser.add_argument('--json', help='Write results to the file')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    latency, command_latency = parse_latency(args.latency)
+    device = PluribusDevice(args.ports_count, args.associations_count, latency, command_latency)
+    benchmark = TranscriptReplayBenchmark(device, args.type, args.uni_ports, args.tap_ports)
+    temp_dir = None
+    transcript_file = args.transcript and os.path.abspath(args.transcript)
+    if not transcript_file:
+        temp_dir = tempfile.mkdtemp()
+        transcript_file = os.path.join(temp_dir, 'transcript.jsonl.gz')
+    try:
+        recorded = OrderedDict()
+        if not os.path.exists(transcript_file):
+            recorded = benchmark.record(transcript_file, args.iterations)
+        replayed = benchmark.replay(transcript_file, args.iterations, args.time_scale)
+    finally:
+        if temp_dir:
+            shutil.rmtree(temp_dir)
+    print(format_results(recorded, replayed))
+    if args.json:
+        with open(args.json, 'w') as json_file:
+            json.dump({'recorded': recorded, 'replayed': replayed}, json_file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,34 @@
+from unittest import TestCase
+
+from mock import Mock
+
+from pluribus_virtualwire.autoload.autoload_cache import AutoloadCache
+
+
+class TestAutoloadCache(TestCase):
+    def setUp(self):
+        self._instance = AutoloadCache(Mock())
+        self._autoload = Mock()
+        self._entry = self._instance.put('192.168.42.240', '1', self._autoload,
+                                         self._instance.associations_generation)
+
+    def test_get_by_state_id(self):
+        self.assertIs(self._instance.get('192.168.42.240', '1'), self._entry)
+        self.assertIsNone(self._instance.get('192.168.42.240', '2'))
+        self.assertIsNone(self._instance.get('192.168.42.240', '1'))
+
+    def test_mapping_completed_during_update(self):
+        self.assertFalse(self._instance.associations_changed(self._entry))
+        self._instance.mark_associations_changed()
+        associations_generation = self._instance.associations_generation
+        # Associations are re-read while another mapping completes
+        self._instance.mark_associations_changed()
+        self._instance.update_associations(self._entry, associations_generation, {'6': '5'})
+        self._autoload.update_associations.assert_called_once_with({'6': '5'})
+        self.assertTrue(self._instance.associations_changed(self._entry))
+
+        self._instance.update_associations(self._entry, self._instance.associations_generation, {})
+        self.assertFalse(self._instance.associations_changed(self._entry))
+        # Associations read earlier do not overwrite newer ones
+        self._instance.update_associations(self._entry, associations_generation, {'6': '5'})
+        self.assertEqual(self._autoload.update_associations.call_count, 2)
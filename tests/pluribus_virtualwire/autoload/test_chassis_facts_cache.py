@@ -0,0 +1,46 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from mock import Mock, patch
+
+from pluribus_virtualwire.autoload.chassis_facts_cache import ChassisFactsCache
+
+
+class TestChassisFactsCache(TestCase):
+    BOARD_TABLE = {'model': 'NSU', 'chassis-serial': '1234', 'version': '2.5.1', 'switch-name': 'sw'}
+
+    def setUp(self):
+        self._directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self._directory)
+        self._file_path = os.path.join(self._directory, 'chassis.json')
+
+    def test_persisted_between_instances(self):
+        ChassisFactsCache(Mock(), self._file_path).put('192.168.1.1', self.BOARD_TABLE)
+        instance = ChassisFactsCache(Mock(), self._file_path)
+        self.assertEqual(instance.get('192.168.1.1'), self.BOARD_TABLE)
+        self.assertIsNone(instance.get('192.168.1.2'))
+
+    def test_expired(self):
+        instance = ChassisFactsCache(Mock(), self._file_path, ttl=10)
+        with patch('time.time', return_value=1000):
+            instance.put('192.168.1.1', self.BOARD_TABLE)
+        with patch('time.time', return_value=1005):
+            self.assertEqual(instance.get('192.168.1.1'), self.BOARD_TABLE)
+        with patch('time.time', return_value=1011):
+            self.assertIsNone(instance.get('192.168.1.1'))
+
+    def test_dropped_on_version_change(self):
+        instance = ChassisFactsCache(Mock(), self._file_path)
+        instance.put('192.168.1.1', self.BOARD_TABLE)
+        self.assertTrue(instance.validate_version('192.168.1.1', '2.5.1'))
+        self.assertFalse(instance.validate_version('192.168.1.1', '2.6.0'))
+        self.assertIsNone(ChassisFactsCache(Mock(), self._file_path).get('192.168.1.1'))
+
+    def test_broken_file_ignored(self):
+        with open(self._file_path, 'w') as cache_file:
+            cache_file.write('{')
+        logger = Mock()
+        self.assertIsNone(ChassisFactsCache(logger, self._file_path).get('192.168.1.1'))
+        self.assertTrue(logger.warning.called)
@@ -0,0 +1,42 @@
+from unittest import TestCase
+from xml.etree import ElementTree
+
+from mock import Mock
+
+from cloudshell.layer_one.core.response.response_info import ResourceDescriptionResponseInfo
+from pluribus_virtualwire.autoload.autoload import Autoload
+from pluribus_virtualwire.autoload.resource_stream import ResourceDescriptionStreamResponseInfo
+from pluribus_virtualwire.command_actions.autoload_actions import AutoloadActions
+from tests.simulator.cli_service import SimulatorCliService
+from tests.simulator.pluribus_device import PluribusDevice
+
+
+def _resources(response_info):
+    """
+    Resource nodes with attributes and mapping, children order is not significant
+    """
+    resources = []
+    for node in response_info.build_xml_node().iter('ResourceInfo'):
+        attributes = sorted(tuple(sorted(attribute.attrib.items())) for attribute in node.find('ResourceAttributes'))
+        mapping = node.find('ResourceMapping/IncomingMapping')
+        resources.append((sorted(node.attrib.items()), attributes, mapping.text if mapping is not None else None))
+    return sorted(resources)
+
+
+class TestResourceDescriptionStreamResponseInfo(TestCase):
+    def setUp(self):
+        autoload_actions = AutoloadActions(SimulatorCliService(PluribusDevice(ports_count=24, associations_count=4)),
+                                           Mock())
+        self._autoload = Autoload('127.0.0.1', autoload_actions.board_table(), autoload_actions.ports_table(),
+                                  autoload_actions.associations_table(), Mock())
+
+    def test_same_as_entity_tree(self):
+        resources = _resources(ResourceDescriptionStreamResponseInfo(self._autoload))
+        self.assertEqual(len(resources), 26)
+        self.assertEqual(len([resource for resource in resources if resource[2]]), 8)
+        self.assertEqual(resources, _resources(ResourceDescriptionResponseInfo(self._autoload.build_structure())))
+
+    def test_serialized_twice(self):
+        response_info = ResourceDescriptionStreamResponseInfo(self._autoload)
+        self.assertEqual(ElementTree.tostring(response_info.build_xml_node()),
+                         ElementTree.tostring(response_info.build_xml_node()))
@@ -0,0 +1,88 @@
+import time
+from unittest import TestCase
+
+from mock import Mock
+
+import pluribus_virtualwire.command_templates.mapping as mapping_template
+import pluribus_virtualwire.command_templates.system as system_template
+from cloudshell.cli.session.session_exceptions import CommandExecutionException
+from pluribus_virtualwire.cli.command_loop import CommandLoop, Return
+from pluribus_virtualwire.cli.command_pipeline import CommandPipeline
+from pluribus_virtualwire.cli.vw_cli_handler import VWCliHandler
+from pluribus_virtualwire.helpers import command_stats
+from pluribus_virtualwire.helpers.command_stats import CommandScope
+from tests.simulator.cli_service import SimulatorCliService
+from tests.simulator.pluribus_device import PluribusDevice
+from tests.simulator.pluribus_server import PluribusTelnetServer
+from tests.simulator.runtime_configuration import SimulatorRuntimeConfiguration
+
+
+def _state_id(cli_service):
+    output, = yield CommandPipeline(cli_service, Mock()).add(system_template.GET_STATE_ID)
+    raise Return(output.split()[1])
+
+
+def _associations_count(cli_service):
+    try:
+        yield CommandPipeline(cli_service, Mock()).add(mapping_template.MAP_CLEAR, name='5-uni-6')
+    except CommandExecutionException:
+        pass
+    output, = yield CommandPipeline(cli_service, Mock()).add(mapping_template.ASSOCIATIONS)
+    raise Return(len(output.splitlines()) - 1)
+
+
+class TestCommandLoop(TestCase):
+    def setUp(self):
+        self._device = PluribusDevice(ports_count=4, associations_count=1)
+        server = PluribusTelnetServer(self._device, 'admin', 'admin').start()
+        self.addCleanup(server.stop)
+        self._cli_handler = VWCliHandler(Mock(), SimulatorRuntimeConfiguration(
+            {'CLI': {'TYPE': ['TELNET'], 'PORTS': {'TELNET': server.port}, 'POOL_SIZE': 2}}))
+        self._cli_handler.define_session_attributes('127.0.0.1', 'admin', 'admin')
+
+    def test_coroutines_share_write(self):
+        with self._cli_handler.default_mode_service() as cli_service:
+            with command_stats.activate(CommandScope('test')) as scope:
+                results = CommandLoop(Mock()).run(_state_id(cli_service), _associations_count(cli_service))
+        self.assertEqual(results, ['-1', 1])
+        # Second write is the associations command of the second coroutine
+        self.assertEqual(scope.round_trips, 2)
+
+    def test_sessions_in_parallel(self):
+        with self._cli_handler.default_mode_service() as first_service:
+            with self._cli_handler.default_mode_service() as second_service:
+                with command_stats.activate(CommandScope('test')) as scope:
+                    results = CommandLoop(Mock()).run(_state_id(first_service), _associations_count(second_service))
+        self.assertEqual(results, ['-1', 1])
+        # Writes of the worker threads are counted to the scope of the calling thread
+        self.assertEqual(scope.round_trips, 3)
+
+    def test_sessions_overlap(self):
+        device = PluribusDevice(ports_count=4, associations_count=1, latency=0.2)
+        first_service, second_service = SimulatorCliService(device), SimulatorCliService(device)
+        start_time = time.time()
+        results = CommandLoop(Mock()).run(_associations_count(first_service), _associations_count(second_service))
+        self.assertEqual(results, [1, 1])
+        # Two dependent commands per session, sessions in turn would take 0.8 sec
+        self.assertLess(time.time() - start_time, 0.6)
+
+    def test_blocking_session(self):
+        cli_service = SimulatorCliService(self._device)
+        self.assertEqual(CommandLoop(Mock()).run(_state_id(cli_service), _associations_count(cli_service)),
+                         ['-1', 1])
+
+    def test_error_raised(self):
+        def failing(cli_service):
+            yield CommandPipeline(cli_service, Mock()).add(mapping_template.MAP_CLEAR, name='5-uni-6')
+
+        with self._cli_handler.default_mode_service() as cli_service:
+            with self.assertRaises(CommandExecutionException):
+                CommandLoop(Mock()).run(failing(cli_service), _state_id(cli_service))
+
+    def test_error_of_parallel_session_raised(self):
+        def failing(cli_service):
+            yield CommandPipeline(cli_service, Mock()).add(mapping_template.MAP_CLEAR, name='5-uni-6')
+
+        with self.assertRaises(CommandExecutionException):
+            CommandLoop(Mock()).run(_state_id(SimulatorCliService(self._device)),
+                                    failing(SimulatorCliService(self._device)))
@@ -0,0 +1,45 @@
+from unittest import TestCase
+
+from mock import Mock
+
+import pluribus_virtualwire.command_templates.mapping as mapping_template
+import pluribus_virtualwire.command_templates.system as system_template
+from cloudshell.cli.session.session_exceptions import CommandExecutionException
+from pluribus_virtualwire.cli.command_pipeline import CommandPipeline
+from pluribus_virtualwire.cli.vw_cli_handler import VWCliHandler
+from tests.simulator.pluribus_device import PluribusDevice
+from tests.simulator.pluribus_server import PluribusTelnetServer
+from tests.simulator.runtime_configuration import SimulatorRuntimeConfiguration
+
+
+class TestCommandPipeline(TestCase):
+    def setUp(self):
+        self._device = PluribusDevice(ports_count=4, associations_count=1)
+        server = PluribusTelnetServer(self._device, 'admin', 'admin').start()
+        self.addCleanup(server.stop)
+        self._cli_handler = VWCliHandler(Mock(), SimulatorRuntimeConfiguration(
+            {'CLI': {'TYPE': ['TELNET'], 'PORTS': {'TELNET': server.port}}}))
+        self._cli_handler.define_session_attributes('127.0.0.1', 'admin', 'admin')
+
+    def test_execute(self):
+        with self._cli_handler.default_mode_service() as cli_service:
+            self._device.reset_stats()
+            state_id, _, associations = CommandPipeline(cli_service, Mock()).add(system_template.GET_STATE_ID).add(
+                system_template.SET_STATE_ID, state_id='1234').add(mapping_template.ASSOCIATIONS).execute()
+        self.assertEqual(self._device.round_trips, 3)
+        self.assertRegexpMatches(state_id, r'^motd:\s+-1\s')
+        self.assertRegexpMatches(associations, r'^1:2:1-bidi-2:true:\s')
+        self.assertEqual(self._device.motd, '1234')
+
+    def test_errors_per_command(self):
+        with self._cli_handler.default_mode_service() as cli_service:
+            results = CommandPipeline(cli_service, Mock()).add(
+                mapping_template.MAP_BIDI, master_ports='1', slave_ports='2', name='1-bidi-2').add(
+                mapping_template.MAP_UNI, master_ports='3', slave_ports='4', name='3-uni-4').execute(
+                raise_on_error=False)
+            self.assertIsInstance(results[0], CommandExecutionException)
+            self.assertNotIsInstance(results[1], Exception)
+            with self.assertRaises(CommandExecutionException):
+                CommandPipeline(cli_service, Mock()).add(mapping_template.MAP_CLEAR, name='5-uni-6').add(
+                    mapping_template.MAP_CLEAR, name='3-uni-4').execute()
+        self.assertEqual(sorted(self._device.associations), ['1-bidi-2'])
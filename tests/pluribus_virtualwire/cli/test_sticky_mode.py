@@ -0,0 +1,49 @@
+from unittest import TestCase
+
+from mock import Mock
+
+import pluribus_virtualwire.command_templates.system as system_template
+from pluribus_virtualwire.cli.vw_cli_handler import VWCliHandler
+from pluribus_virtualwire.cli.vw_command_template_executor import VWCommandTemplateExecutor
+from tests.simulator.pluribus_device import PluribusDevice
+from tests.simulator.pluribus_server import PluribusTelnetServer
+from tests.simulator.runtime_configuration import SimulatorRuntimeConfiguration
+
+
+class TestStickyMode(TestCase):
+    def setUp(self):
+        self._device = PluribusDevice(ports_count=4)
+        self._server = PluribusTelnetServer(self._device, 'admin', 'admin').start()
+        self.addCleanup(self._server.stop)
+
+    def _cli_handler(self, sticky_mode=True):
+        cli_handler = VWCliHandler(Mock(), SimulatorRuntimeConfiguration(
+            {'CLI': {'TYPE': ['TELNET'], 'PORTS': {'TELNET': self._server.port}, 'STICKY_MODE': sticky_mode}}))
+        cli_handler.define_session_attributes('127.0.0.1', 'admin', 'admin')
+        self.addCleanup(cli_handler.close)
+        return cli_handler
+
+    def _get_state_id(self, cli_handler):
+        with cli_handler.default_mode_service() as cli_service:
+            VWCommandTemplateExecutor(cli_service, system_template.GET_STATE_ID).execute_command()
+            return cli_service.session
+
+    def test_enter_actions_once_per_connection(self):
+        cli_handler = self._cli_handler()
+        for _ in range(3):
+            self._get_state_id(cli_handler)
+        self.assertEqual(self._device.commands['switch-local'], 1)
+        self.assertEqual(self._device.commands['switch-setup-show'], 3)
+
+    def test_session_not_at_prompt_initialized(self):
+        cli_handler = self._cli_handler()
+        session = self._get_state_id(cli_handler)
+        session.received_tail = 'Connection closed'
+        self._get_state_id(cli_handler)
+        self.assertEqual(self._device.commands['switch-local'], 2)
+
+    def test_disabled(self):
+        cli_handler = self._cli_handler(sticky_mode=False)
+        for _ in range(2):
+            self._get_state_id(cli_handler)
+        self.assertEqual(self._device.commands['switch-local'], 2)
@@ -0,0 +1,27 @@
+from unittest import TestCase
+
+from mock import Mock
+
+import pluribus_virtualwire.command_templates.mapping as mapping_template
+from cloudshell.cli.session.session_exceptions import CommandExecutionException
+from pluribus_virtualwire.cli.command_modes import DefaultCommandMode
+from tests.benchmarks.prompt_detection_benchmark import ChunkedOutputSession, TailMatchChunkedOutputSession, \
+    associations_output
+
+
+class TestTailMatchSessionMixin(TestCase):
+    def _expect(self, session_class, output, chunk_size):
+        return session_class(output, chunk_size).hardware_expect(
+            mapping_template.ASSOCIATIONS.prepare_command(), DefaultCommandMode.PROMPT, Mock(),
+            error_map=mapping_template.ERROR_MAP)
+
+    def test_same_output_as_generic(self):
+        output = associations_output(2000)
+        # Small chunks split the command echo and the prompt between reads
+        self.assertEqual(self._expect(TailMatchChunkedOutputSession, output, 7),
+                         self._expect(ChunkedOutputSession, output, 7))
+
+    def test_error_split_between_reads(self):
+        output = associations_output(10000) + 'port-association-show: Err' + 'or: timeout\n'
+        with self.assertRaisesRegexp(CommandExecutionException, 'Command error'):
+            self._expect(TailMatchChunkedOutputSession, output, 16)
@@ -0,0 +1,68 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from mock import Mock
+
+import pluribus_virtualwire.command_templates.system as system_template
+from pluribus_virtualwire.cli.transcript import Transcript, TranscriptRecorder, redact
+from pluribus_virtualwire.cli.vw_cli_handler import VWCliHandler
+from pluribus_virtualwire.cli.vw_command_template_executor import VWCommandTemplateExecutor
+from tests.simulator.pluribus_device import PluribusDevice
+from tests.simulator.pluribus_server import PluribusTelnetServer
+from tests.simulator.runtime_configuration import SimulatorRuntimeConfiguration
+
+
+class TestTranscript(TestCase):
+    def setUp(self):
+        self._temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self._temp_dir)
+        self._transcript_file = os.path.join(self._temp_dir, 'transcripts', 'transcript.jsonl.gz')
+
+    def test_redact(self):
+        self.assertEqual(redact('secret\r', 'secret\r\nCLI > ', 'admin', 'secret'),
+                         ('<password>\r', '<password>\r\nCLI > '))
+        self.assertEqual(redact('admin\r', 'admin\r\nPassword:', 'admin', 'secret'),
+                         ('<username>\r', '<username>\r\nPassword:'))
+        self.assertEqual(redact('software-show\r', 'network-admin', 'admin', 'secret'),
+                         ('software-show\r', 'network-admin'))
+
+    def test_recorded_order(self):
+        recorder = TranscriptRecorder(self._transcript_file)
+        recorder.record(None, 'login: ', 0.1)
+        recorder.record('show\r', 'first\xff', 0.2)
+        recorder.record('show\r', 'second', 0.3)
+        recorder.close()
+        transcript = Transcript.load(self._transcript_file)
+        self.assertEqual(transcript.response(None), ('login: ', 0.1))
+        self.assertEqual(transcript.response('show\r'), ('first\xff', 0.2))
+        self.assertEqual(transcript.response('show\r'), ('second', 0.3))
+        self.assertEqual(transcript.response('show\r'), ('second', 0.3))
+        self.assertIsNone(transcript.response('exit\r'))
+
+    def _get_state_id(self, cli_handler):
+        with cli_handler.default_mode_service() as cli_service:
+            return VWCommandTemplateExecutor(cli_service, system_template.GET_STATE_ID).execute_command()
+
+    def _cli_handler(self, cli_configuration):
+        cli_handler = VWCliHandler(Mock(), SimulatorRuntimeConfiguration({'CLI': cli_configuration}))
+        cli_handler.define_session_attributes('127.0.0.1', 'admin', 'secret')
+        return cli_handler
+
+    def test_record_and_replay(self):
+        device = PluribusDevice(ports_count=4)
+        with PluribusTelnetServer(device, 'admin', 'secret') as server:
+            cli_handler = self._cli_handler({'TYPE': ['TELNET'], 'PORTS': {'TELNET': server.port},
+                                             'TRANSCRIPT': {'RECORD': self._transcript_file}})
+            recorded_outputs = [self._get_state_id(cli_handler) for _ in range(2)]
+            cli_handler.close()
+        commands_count = sum(device.commands.values())
+        with open(self._transcript_file, 'rb') as transcript_file:
+            self.assertNotIn('secret', transcript_file.read())
+
+        cli_handler = self._cli_handler({'TYPE': ['REPLAY'], 'TRANSCRIPT': {'REPLAY': self._transcript_file,
+                                                                             'TIME_SCALE': 0}})
+        self.assertEqual([self._get_state_id(cli_handler) for _ in range(2)], recorded_outputs)
+        cli_handler.close()
+        self.assertEqual(sum(device.commands.values()), commands_count)
@@ -0,0 +1,49 @@
+import time
+from unittest import TestCase
+
+from mock import Mock
+
+import pluribus_virtualwire.command_templates.mapping as mapping_template
+import pluribus_virtualwire.command_templates.system as system_template
+from cloudshell.cli.session.session_exceptions import CommandExecutionException, ExpectedSessionException
+from pluribus_virtualwire.cli.vw_cli_handler import VWCliHandler
+from pluribus_virtualwire.cli.vw_command_template_executor import VWCommandTemplateExecutor
+from tests.simulator.pluribus_device import PluribusDevice
+from tests.simulator.pluribus_server import PluribusTelnetServer
+from tests.simulator.runtime_configuration import SimulatorRuntimeConfiguration
+
+
+class TestVWCommandTemplateExecutor(TestCase):
+    def setUp(self):
+        self._device = PluribusDevice(ports_count=4, associations_count=1,
+                                      command_latency={'port-association-show': 2})
+        server = PluribusTelnetServer(self._device, 'admin', 'admin').start()
+        self.addCleanup(server.stop)
+        self._cli_handler = VWCliHandler(Mock(), SimulatorRuntimeConfiguration(
+            {'CLI': {'TYPE': ['TELNET'], 'PORTS': {'TELNET': server.port},
+                     'TIMEOUTS': {'ADAPTIVE': True, 'FLOOR': 0.01, 'CEILING': 0.5, 'MULTIPLIER': 1,
+                                  'MIN_SAMPLES': 1}}}))
+        self._cli_handler.define_session_attributes('127.0.0.1', 'admin', 'admin')
+        self.addCleanup(self._cli_handler.close)
+
+    def test_latency_observed(self):
+        with self._cli_handler.default_mode_service() as cli_service:
+            VWCommandTemplateExecutor(cli_service, system_template.GET_STATE_ID).execute_command()
+        self.assertLess(self._cli_handler.command_timeouts.timeout('system.GET_STATE_ID'), 0.5)
+
+    def test_command_error_keeps_timeout(self):
+        with self._cli_handler.default_mode_service() as cli_service:
+            VWCommandTemplateExecutor(cli_service, mapping_template.MAP_CLEAR).execute_command(name='1-bidi-2')
+            timeout = self._cli_handler.command_timeouts.timeout('mapping.MAP_CLEAR')
+            with self.assertRaises(CommandExecutionException):
+                VWCommandTemplateExecutor(cli_service, mapping_template.MAP_CLEAR).execute_command(name='missing')
+        self.assertLess(timeout, 0.5)
+        self.assertLess(self._cli_handler.command_timeouts.timeout('mapping.MAP_CLEAR'), 0.5)
+
+    def test_hung_session_recycled(self):
+        start_time = time.time()
+        with self.assertRaises(ExpectedSessionException):
+            with self._cli_handler.default_mode_service() as cli_service:
+                VWCommandTemplateExecutor(cli_service, mapping_template.ASSOCIATIONS).execute_command()
+        self.assertLess(time.time() - start_time, 2)
+        self.assertFalse(self._cli_handler.has_idle_session())
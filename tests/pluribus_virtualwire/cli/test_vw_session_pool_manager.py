@@ -0,0 +1,77 @@
+import threading
+from unittest import TestCase
+
+from mock import Mock
+
+from pluribus_virtualwire.cli.vw_cli_handler import VWCliHandler
+from pluribus_virtualwire.cli.vw_session_pool_manager import VWSessionPoolManager
+from tests.simulator.pluribus_device import PluribusDevice
+from tests.simulator.pluribus_server import PluribusTelnetServer
+from tests.simulator.runtime_configuration import SimulatorRuntimeConfiguration
+
+
+class TestVWSessionPoolManager(TestCase):
+    def setUp(self):
+        self._device = PluribusDevice(ports_count=4)
+        self._server = PluribusTelnetServer(self._device, 'admin', 'admin').start()
+        self.addCleanup(self._server.stop)
+
+    def _cli_handler(self, **cli_config):
+        cli_config.update({'TYPE': ['TELNET'], 'PORTS': {'TELNET': self._server.port}})
+        cli_handler = VWCliHandler(Mock(), SimulatorRuntimeConfiguration({'CLI': cli_config}))
+        cli_handler.define_session_attributes('127.0.0.1', 'admin', 'admin')
+        self.addCleanup(cli_handler._session_pool.close)
+        return cli_handler
+
+    def test_prewarm_sessions(self):
+        cli_handler = self._cli_handler(POOL_SIZE=2)
+        cli_handler.prewarm_sessions()
+        self.assertEqual(self._server.connections, 2)
+        with cli_handler.default_mode_service() as first_session:
+            with cli_handler.default_mode_service() as second_session:
+                self.assertIsNot(first_session.session, second_session.session)
+        self.assertEqual(self._server.connections, 2)
+
+    def test_keep_alive(self):
+        cli_handler = self._cli_handler(POOL_SIZE=1)
+        cli_handler.prewarm_sessions()
+        self._device.reset_stats()
+        cli_handler._session_pool.keep_alive()
+        self.assertEqual(self._device.commands[''], 1)
+        with cli_handler.default_mode_service():
+            pass
+        self.assertEqual(self._server.connections, 1)
+
+    def test_idle_session_replaced(self):
+        cli_handler = self._cli_handler(POOL_SIZE=1, IDLE_TIMEOUT=0.01)
+        cli_handler.prewarm_sessions()
+        cli_handler._session_pool._last_used = dict.fromkeys(cli_handler._session_pool._last_used, 0)
+        with cli_handler.default_mode_service():
+            pass
+        self.assertEqual(self._server.connections, 2)
+
+    def test_prewarm_best_effort(self):
+        session_pool = VWSessionPoolManager(Mock(), max_pool_size=3)
+        pool_locked = []
+
+        def try_lock():
+            if session_pool._session_condition.acquire(False):
+                session_pool._session_condition.release()
+                pool_locked.append(False)
+            else:
+                pool_locked.append(True)
+
+        def connect(prompt, logger):
+            # Other commands can use the pool while a session is connecting
+            locker = threading.Thread(target=try_lock)
+            locker.start()
+            locker.join()
+
+        sessions = [Mock(connect=Mock(side_effect=connect)),
+                    Mock(connect=Mock(side_effect=Exception('Too many sessions'))), Mock()]
+        logger = Mock()
+        session_pool.prewarm(lambda: [sessions.pop(0)], 'prompt', logger)
+        self.assertEqual(pool_locked, [False])
+        self.assertEqual(session_pool._session_manager.existing_sessions_count(), 1)
+        self.assertEqual(session_pool._pool.qsize(), 1)
+        self.assertEqual(logger.warning.call_count, 1)
@@ -0,0 +1,109 @@
+import threading
+from unittest import TestCase
+
+from mock import Mock
+
+from pluribus_virtualwire.command_actions.actions_helper import ActionsManager
+from pluribus_virtualwire.command_actions.mapping_actions import MappingActions
+from pluribus_virtualwire.helpers.topology_cache import TopologyCache
+from tests.simulator.cli_service import SimulatorCliService
+from tests.simulator.pluribus_device import PluribusDevice
+
+
+class TestMappingActions(TestCase):
+    def setUp(self):
+        self._device = PluribusDevice(ports_count=24, associations_count=2, disabled_ports=[24])
+        self._cli_service = SimulatorCliService(self._device)
+        self._instance = MappingActions(self._cli_service, Mock())
+
+    def test_map_uni_validates_ports_once(self):
+        self._instance.map_uni('5', [str(port) for port in range(6, 22)])
+        self.assertEqual(self._device.commands['port-config-show'], 1)
+        self.assertEqual(len(self._device.associations), 18)
+
+    def test_map_uni_disabled_port(self):
+        with self.assertRaisesRegexp(Exception, 'Port 24 is disabled'):
+            self._instance.map_uni('5', ['6', '24'])
+        self.assertIn('5-uni-6', self._device.associations)
+
+    def test_ports_state_refreshed_per_command(self):
+        with ActionsManager(self._instance, self._cli_service) as mapping_actions:
+            mapping_actions.map_bidi('5', '6')
+        with ActionsManager(self._instance, self._cli_service) as mapping_actions:
+            mapping_actions.map_bidi('7', '8')
+        self.assertEqual(self._device.commands['port-config-show'], 2)
+
+    def test_map_tap_and_clear_to(self):
+        self._instance.map_bidi('5', '6')
+        self._instance.map_tap('5', [str(port) for port in range(7, 16)])
+        self._instance.map_clear_to('5', ['10', '11'])
+        self.assertEqual(self._device.associations['5-bidi-6']['monitor'], ['7', '8', '9', '12', '13', '14', '15'])
+        self.assertEqual(self._device.commands['port-association-modify'], 2)
+
+    def test_map_clear_deletes_association_once(self):
+        self._instance.map_bidi('5', '6')
+        self._instance.map_clear(['5', '6'])
+        self.assertEqual(self._device.commands['port-association-delete'], 1)
+        self.assertNotIn('5-bidi-6', self._device.associations)
+
+    def test_map_clear_to_deletes_without_modify(self):
+        self._instance.map_bidi('5', '6')
+        self._instance.map_tap('5', ['7', '8'])
+        self._instance.map_clear_to('5', ['7', '6', '8'])
+        self.assertEqual(self._device.commands['port-association-modify'], 1)
+        self.assertEqual(self._device.commands['port-association-delete'], 1)
+        self.assertNotIn('5-bidi-6', self._device.associations)
+
+    def test_optimistic_map_uni_single_round_trip(self):
+        instance = MappingActions(self._cli_service, Mock(), optimistic=True)
+        instance.map_uni('5', ['6'])
+        self.assertNotIn('port-config-show', self._device.commands)
+        self.assertEqual(self._device.commands['port-association-create'], 1)
+        self.assertIn('5-uni-6', self._device.associations)
+
+    def test_optimistic_map_bidi_diagnoses_error(self):
+        instance = MappingActions(self._cli_service, Mock(), optimistic=True)
+        with ActionsManager(instance, self._cli_service) as mapping_actions:
+            with self.assertRaisesRegexp(Exception, 'Port 24 is disabled'):
+                mapping_actions.map_bidi('5', '24')
+        # Association created outside of the driver is not in the cached table
+        self._device.execute('port-association-create name 5-bidi-6 master-ports 5 slave-ports 6 virtual-wire bidir')
+        with ActionsManager(instance, self._cli_service) as mapping_actions:
+            with self.assertRaisesRegexp(Exception, 'Port 5 is used by association 5-bidi-6'):
+                mapping_actions.map_bidi('5', '7')
+
+
+class _PausedCliService(SimulatorCliService):
+    """
+    Holds the output of the command until resumed, the command is executed on the device meanwhile
+    """
+
+    def __init__(self, device, command):
+        super(_PausedCliService, self).__init__(device)
+        self._command = command
+        self.paused = threading.Event()
+        self.resume = threading.Event()
+
+    def send_command(self, command, *args, **kwargs):
+        output = super(_PausedCliService, self).send_command(command, *args, **kwargs)
+        if command.startswith(self._command):
+            self.paused.set()
+            self.resume.wait(10)
+        return output
+
+
+class TestMappingActionsConcurrency(TestCase):
+    def test_associations_read_during_mapping_not_cached(self):
+        device = PluribusDevice(ports_count=8)
+        topology_cache = TopologyCache(Mock())
+        cli_service = SimulatorCliService(device)
+        paused_cli_service = _PausedCliService(device, 'port-association-show')
+        reader = threading.Thread(target=MappingActions(paused_cli_service, Mock(), topology_cache).map_clear,
+                                  args=(['7', '8'],))
+        reader.start()
+        self.assertTrue(paused_cli_service.paused.wait(10))
+        MappingActions(cli_service, Mock(), topology_cache).map_bidi('5', '6')
+        paused_cli_service.resume.set()
+        reader.join(10)
+        MappingActions(cli_service, Mock(), topology_cache).map_clear(['5', '6'])
+        self.assertEqual(device.associations, {})
@@ -0,0 +1,32 @@
+from unittest import TestCase
+
+from pluribus_virtualwire.helpers.associations_table import AssociationsTable
+from pluribus_virtualwire.helpers.port_set import PortSet
+
+
+class TestAssociationsTable(TestCase):
+    def setUp(self):
+        self._instance = AssociationsTable.parse('1:2:1-bidi-2:true:\n3:4:3-uni-4:false:5-6\n')
+
+    def test_parse(self):
+        self.assertEqual(self._instance.get('3-uni-4'),
+                         {'ports': ['3', '4'], 'bidir': False, 'monitor_ports': PortSet(['5', '6'])})
+        self.assertEqual(len(self._instance), 2)
+
+    def test_parse_any_name(self):
+        table = AssociationsTable.parse('1:2:my assoc.1:true:\n')
+        self.assertEqual(table.find('2'), 'my assoc.1')
+
+    def test_find(self):
+        self.assertEqual(self._instance.find('2'), '1-bidi-2')
+        self.assertEqual(self._instance.find_monitoring('5'), ['3-uni-4'])
+        self.assertIsNone(self._instance.find('5'))
+
+    def test_incremental_update(self):
+        self._instance.add('7-uni-8', '7', '8', False)
+        self._instance.set_monitor_ports('3-uni-4', ['6', '9'])
+        self._instance.remove('1-bidi-2')
+        self.assertEqual(self._instance.find('8'), '7-uni-8')
+        self.assertEqual(self._instance.find_monitoring('5'), [])
+        self.assertEqual(self._instance.find_monitoring('9'), ['3-uni-4'])
+        self.assertIsNone(self._instance.find('1'))
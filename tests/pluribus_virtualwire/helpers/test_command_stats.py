@@ -0,0 +1,64 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+from unittest import TestCase
+
+from mock import Mock
+
+import pluribus_virtualwire.command_templates.mapping as command_template
+from pluribus_virtualwire.command_actions.mapping_actions import MappingActions
+from pluribus_virtualwire.helpers import command_stats
+from pluribus_virtualwire.helpers.command_stats import CommandStats
+from tests.simulator.cli_service import SimulatorCliService
+from tests.simulator.pluribus_device import PluribusDevice
+
+
+class TestCommandStats(TestCase):
+    def setUp(self):
+        self._logger = Mock()
+        self._directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self._directory)
+        self._file_path = os.path.join(self._directory, 'stats.json')
+        self._instance = CommandStats(self._logger, file_path=self._file_path)
+
+    def test_template_name(self):
+        self.assertEqual(command_stats.template_name(command_template.MAP_BIDI), 'mapping.MAP_BIDI')
+
+    def test_driver_command(self):
+        mapping_actions = MappingActions(SimulatorCliService(PluribusDevice(ports_count=4)), Mock())
+        with self._instance.command('MapBidi'):
+            command_stats.count_round_trip()
+            command_stats.count_bytes(10)
+            mapping_actions.map_bidi('1', '2')
+        self.assertIsNone(command_stats.current_scope())
+        self.assertFalse(os.path.exists(self._file_path))
+
+        self._instance.close()
+        with open(self._file_path) as stats_file:
+            stats = json.load(stats_file)
+        self.assertEqual(stats['MapBidi']['latency']['count'], 1)
+        self.assertEqual(stats['MapBidi']['round_trips'], 1)
+        self.assertEqual(stats['MapBidi']['bytes_received'], 10)
+        self.assertEqual(sorted(stats['MapBidi']['templates']),
+                         ['mapping.MAP_BIDI', 'mapping.PHYS_TO_LOGICAL', 'mapping.PORTS_STATE'])
+        self.assertRegexpMatches(self._logger.info.call_args[0][0], r'^Stats MapBidi: .+ mapping\.MAP_BIDI')
+
+    def test_periodic_flush(self):
+        instance = CommandStats(self._logger, file_path=self._file_path, flush_interval=0.05)
+        with instance.command('GetStateId'):
+            pass
+        deadline = time.time() + 5
+        while not os.path.exists(self._file_path) and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertTrue(os.path.exists(self._file_path))
+        # Waits for the write in progress
+        instance.close()
+        with open(self._file_path) as stats_file:
+            self.assertEqual(json.load(stats_file)['GetStateId']['latency']['count'], 1)
+
+    def test_disabled(self):
+        with CommandStats(self._logger, enabled=False).command('MapBidi') as scope:
+            self.assertIsNone(scope)
+            self.assertIsNone(command_stats.current_scope())
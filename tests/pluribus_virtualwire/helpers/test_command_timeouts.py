@@ -0,0 +1,30 @@
+from unittest import TestCase
+
+from pluribus_virtualwire.helpers.command_timeouts import AdaptiveTimeouts
+
+
+class TestAdaptiveTimeouts(TestCase):
+    def setUp(self):
+        self._instance = AdaptiveTimeouts(floor=1, ceiling=30, multiplier=4, percentile=90, min_samples=10,
+                                          template_limits={'mapping.ASSOCIATIONS': {'FLOOR': 10}})
+
+    def _observe(self, name, latencies):
+        for latency in latencies:
+            self._instance.observe(name, latency)
+
+    def test_ceiling_without_samples(self):
+        self._observe('system.GET_STATE_ID', [0.1] * 9)
+        self.assertEqual(self._instance.timeout('system.GET_STATE_ID'), 30)
+
+    def test_percentile(self):
+        self._observe('system.GET_STATE_ID', [0.1] * 9 + [2, 20])
+        self.assertEqual(self._instance.timeout('system.GET_STATE_ID'), 8)
+        self._observe('autoload.PORT_SHOW', [0.01] * 10)
+        self.assertEqual(self._instance.timeout('autoload.PORT_SHOW'), 1)
+        self._observe('mapping.ASSOCIATIONS', [0.1] * 10)
+        self.assertEqual(self._instance.timeout('mapping.ASSOCIATIONS'), 10)
+
+    def test_timed_out_resets_samples(self):
+        self._observe('system.GET_STATE_ID', [0.1] * 10)
+        self._instance.timed_out('system.GET_STATE_ID')
+        self.assertEqual(self._instance.timeout('system.GET_STATE_ID'), 30)
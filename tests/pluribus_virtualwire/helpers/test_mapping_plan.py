@@ -0,0 +1,39 @@
+from unittest import TestCase
+
+from pluribus_virtualwire.helpers.associations_table import AssociationsTable
+from pluribus_virtualwire.helpers.mapping_plan import MappingPlan
+from pluribus_virtualwire.helpers.port_set import PortSet
+
+
+class TestMappingPlan(TestCase):
+    def setUp(self):
+        self._instance = MappingPlan(AssociationsTable.parse('1:2:1-bidi-2:true:5\n3:4:3-uni-4:false:6-7\n'))
+
+    def test_delete_supersedes_modify(self):
+        self._instance.set_monitor_ports('1-bidi-2', PortSet(['5', '8']))
+        self._instance.delete('1-bidi-2')
+        self._instance.delete('1-bidi-2')
+        self._instance.set_monitor_ports('1-bidi-2', PortSet())
+        self.assertEqual(self._instance.operations(), [(MappingPlan.DELETE, '1-bidi-2', {})])
+
+    def test_last_monitor_ports_win(self):
+        monitor_ports = self._instance.monitor_ports('3-uni-4')
+        monitor_ports.discard('6')
+        self._instance.set_monitor_ports('3-uni-4', monitor_ports)
+        monitor_ports = self._instance.monitor_ports('3-uni-4')
+        monitor_ports.discard('7')
+        self._instance.set_monitor_ports('3-uni-4', monitor_ports)
+        self.assertEqual(self._instance.operations(),
+                         [(MappingPlan.MODIFY, '3-uni-4', {'monitor_ports': PortSet()})])
+
+    def test_unchanged_monitor_ports_skipped(self):
+        self._instance.set_monitor_ports('3-uni-4', PortSet(['6', '8']))
+        self._instance.set_monitor_ports('3-uni-4', PortSet(['7', '6']))
+        self.assertEqual(len(self._instance), 0)
+
+    def test_deletes_sent_before_creates(self):
+        self._instance.create('1-uni-9', '1', '9', False)
+        self._instance.delete('1-bidi-2')
+        self._instance.delete('10-bidi-11')
+        self.assertEqual([operation.kind for operation in self._instance.operations()],
+                         [MappingPlan.DELETE, MappingPlan.CREATE])
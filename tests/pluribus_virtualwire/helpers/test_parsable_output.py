@@ -0,0 +1,25 @@
+from unittest import TestCase
+
+import pluribus_virtualwire.command_templates.mapping as command_template
+from pluribus_virtualwire.helpers.parsable_output import ParsableOutput
+from pluribus_virtualwire.helpers.port_set import PortSet
+
+
+class TestParsableOutput(TestCase):
+    def test_records(self):
+        parser = ParsableOutput(command_template.ASSOCIATIONS)
+        output = 'master-ports:slave-ports\r\n1:2:1-bidi-2:true:\r\n3:4:3-uni-4:false:5-6\r\nCLI (admin@sw) > '
+        records = list(parser.records(output))
+        self.assertEqual(len(records), 2)
+        self.assertEqual(records[0].name, '1-bidi-2')
+        self.assertTrue(records[0].bidir)
+        self.assertEqual(records[1].monitor_ports, PortSet(['5', '6']))
+
+    def test_line_stream(self):
+        parser = ParsableOutput(command_template.PORTS_STATE)
+        self.assertEqual([(record.intf, record.enable) for record in parser.records(['1:on\n', '2:off\n', 'x:on'])],
+                         [('1', True), ('2', False)])
+
+    def test_not_parsable_template(self):
+        with self.assertRaises(ValueError):
+            ParsableOutput(command_template.MAP_CLEAR)
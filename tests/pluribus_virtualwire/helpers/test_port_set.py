@@ -0,0 +1,28 @@
+from unittest import TestCase
+
+from pluribus_virtualwire.helpers.port_set import PortSet
+
+
+class TestPortSet(TestCase):
+    def test_parse(self):
+        port_set = PortSet.parse('1-3,5,')
+        self.assertEqual(list(port_set), ['1', '2', '3', '5'])
+        self.assertIn('2', port_set)
+        self.assertNotIn('4', port_set)
+        self.assertEqual(len(port_set), 4)
+        self.assertFalse(PortSet.parse(''))
+
+    def test_parse_reversed_range(self):
+        with self.assertRaises(ValueError):
+            PortSet.parse('5-3')
+
+    def test_format(self):
+        self.assertEqual(str(PortSet(['7', '1', '2', '3', '5', '9', '10'])), '1-3,5,7,9-10')
+        self.assertEqual(str(PortSet()), '')
+
+    def test_set_algebra(self):
+        port_set = PortSet.parse('1-10')
+        self.assertEqual(str(port_set - PortSet(['3', '4'])), '1-2,5-10')
+        self.assertEqual(str(port_set & PortSet.parse('8-12')), '8-10')
+        self.assertEqual(str(port_set | PortSet.parse('12')), '1-10,12')
+        self.assertEqual(port_set, PortSet.parse('1-10'))
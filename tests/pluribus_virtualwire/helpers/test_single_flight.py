@@ -0,0 +1,52 @@
+import threading
+import time
+from unittest import TestCase
+
+from pluribus_virtualwire.helpers.single_flight import SingleFlight
+
+
+class TestSingleFlight(TestCase):
+    def setUp(self):
+        self._instance = SingleFlight()
+        self._calls = []
+
+    def _slow(self, value):
+        self._calls.append(value)
+        time.sleep(0.2)
+        if isinstance(value, Exception):
+            raise value
+        return value
+
+    def _run_concurrently(self, key, value, count=4):
+        results = []
+
+        def call():
+            try:
+                results.append(self._instance.do(key, self._slow, value))
+            except Exception as e:
+                results.append(e)
+
+        threads = [threading.Thread(target=call) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_shared_result(self):
+        self.assertEqual(self._run_concurrently('state_id', 42), [42] * 4)
+        self.assertEqual(self._calls, [42])
+        self.assertEqual(self._instance.do('state_id', self._slow, 43), 43)
+
+    def test_shared_error(self):
+        error = ValueError('failed')
+        self.assertEqual(self._run_concurrently('state_id', error), [error] * 4)
+        self.assertEqual(len(self._calls), 1)
+
+    def test_different_keys(self):
+        threads = [threading.Thread(target=self._instance.do, args=(key, self._slow, key)) for key in ('a', 'b')]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(sorted(self._calls), ['a', 'b'])
@@ -0,0 +1,41 @@
+from unittest import TestCase
+
+from mock import Mock
+
+from pluribus_virtualwire.command_actions.autoload_actions import AutoloadActions
+from pluribus_virtualwire.command_actions.mapping_actions import MappingActions
+from pluribus_virtualwire.helpers.topology_cache import TopologyCache
+from tests.simulator.cli_service import SimulatorCliService
+from tests.simulator.pluribus_device import PluribusDevice
+
+
+class TestTopologyCache(TestCase):
+    def setUp(self):
+        self._device = PluribusDevice(ports_count=8, associations_count=1)
+        self._cli_service = SimulatorCliService(self._device)
+        self._instance = TopologyCache(Mock())
+
+    def test_autoload_fills_cache(self):
+        autoload_actions = AutoloadActions(self._cli_service, Mock(), self._instance)
+        autoload_actions.ports_table()
+        autoload_actions.associations_table()
+        self._device.reset_stats()
+        MappingActions(self._cli_service, Mock(), self._instance).map_clear(['1', '2'])
+        self.assertNotIn('bezel-portmap-show', self._device.commands)
+        self.assertNotIn('port-association-show', self._device.commands)
+        self.assertEqual(self._device.associations, {})
+
+    def test_update_state_id(self):
+        self._instance.update_state_id('1')
+        self._instance.associations = {}
+        self._instance.update_state_id('1')
+        self.assertEqual(self._instance.associations, {})
+        self._instance.update_state_id('2')
+        self.assertIsNone(self._instance.associations)
+
+    def test_swap_dropped_after_change(self):
+        generation = self._instance.generation
+        MappingActions(self._cli_service, Mock(), self._instance).map_bidi('3', '4')
+        self.assertFalse(self._instance.swap(generation, '1', {}, None))
+        self.assertTrue(self._instance.swap(self._instance.generation, '1', {}, None))
+        self.assertEqual(self._instance.state_id, '1')
@@ -0,0 +1,60 @@
+from unittest import TestCase
+
+from mock import Mock, patch
+
+from pluribus_virtualwire.device_registry import DeviceRegistry
+from tests.simulator.runtime_configuration import SimulatorRuntimeConfiguration
+
+
+@patch('pluribus_virtualwire.device_registry.VWCliHandler')
+class TestDeviceRegistry(TestCase):
+    def setUp(self):
+        self._instance = DeviceRegistry(Mock(), SimulatorRuntimeConfiguration({}), max_devices=2, idle_timeout=60)
+
+    def test_same_context(self, cli_handler_class):
+        context = self._instance.get('192.168.1.1', 'admin', 'admin')
+        self.assertIs(self._instance.get('192.168.1.1', 'admin', 'admin'), context)
+        context.cli_handler.define_session_attributes.assert_called_once_with('192.168.1.1', 'admin', 'admin')
+
+    def test_least_recently_used_evicted(self, cli_handler_class):
+        cli_handler_class.side_effect = lambda *args: Mock()
+        first = self._instance.get('192.168.1.1', 'admin', 'admin')
+        second = self._instance.get('192.168.1.2', 'admin', 'admin')
+        self._instance.get('192.168.1.1', 'admin', 'admin')
+        self._instance.get('192.168.1.3', 'admin', 'admin')
+        self.assertIn('192.168.1.1', self._instance)
+        self.assertNotIn('192.168.1.2', self._instance)
+        self.assertFalse(first.cli_handler.close.called)
+        self.assertTrue(second.cli_handler.close.called)
+
+    def test_evicted_closed_when_released(self, cli_handler_class):
+        cli_handler_class.side_effect = lambda *args: Mock()
+        context = self._instance.get('192.168.1.1', 'admin', 'admin')
+        self.assertTrue(context.acquire())
+        self._instance.get('192.168.1.2', 'admin', 'admin')
+        self._instance.get('192.168.1.3', 'admin', 'admin')
+        self.assertNotIn('192.168.1.1', self._instance)
+        self.assertFalse(context.cli_handler.close.called)
+        context.release()
+        self.assertTrue(context.cli_handler.close.called)
+        self.assertFalse(context.acquire())
+
+    def test_idle_evicted(self, cli_handler_class):
+        with patch('time.time', return_value=1000):
+            self._instance.get('192.168.1.1', 'admin', 'admin')
+        with patch('time.time', return_value=1061):
+            self._instance.get('192.168.1.2', 'admin', 'admin')
+        self.assertNotIn('192.168.1.1', self._instance)
+        self.assertIn('192.168.1.2', self._instance)
+
+    def test_credentials_changed(self, cli_handler_class):
+        context = self._instance.get('192.168.1.1', 'admin', 'admin')
+        self.assertIsNot(self._instance.get('192.168.1.1', 'admin', 'secret'), context)
+        self.assertTrue(context.cli_handler.close.called)
+
+    def test_actions_per_command(self, cli_handler_class):
+        context = self._instance.get('192.168.1.1', 'admin', 'admin')
+        first, second = context.mapping_actions, context.mapping_actions
+        self.assertIsNot(first, second)
+        self.assertIs(first._topology_cache, second._topology_cache)
+        self.assertIs(context.system_actions._topology_cache, context.topology_cache)
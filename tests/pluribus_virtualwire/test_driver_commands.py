@@ -1,17 +1,150 @@
+import os
+import shutil
+import tempfile
+import threading
 from unittest import TestCase
+from xml.etree import ElementTree
 
 from mock import Mock
 
 from cloudshell.layer_one.core.driver_commands_interface import DriverCommandsInterface
 from pluribus_virtualwire.driver_commands import DriverCommands
-
-
+from pluribus_virtualwire.helpers import command_stats
+from pluribus_virtualwire.helpers.command_stats import CommandScope
+from tests.simulator.pluribus_device import PluribusDevice
+from tests.simulator.pluribus_server import PluribusTelnetServer
+from tests.simulator.runtime_configuration import SimulatorRuntimeConfiguration
 
 
 class TestDriverCommands(TestCase):
     def setUp(self):
         self._logger = Mock()
-        self._instance = DriverCommands(self._logger)
+        self._runtime_config = Mock()
+        self._instance = DriverCommands(self._logger, self._runtime_config)
 
     def test_implementing_interface(self):
         self.assertIsInstance(self._instance, DriverCommandsInterface)
+
+
+class TestDriverCommandsAutoload(TestCase):
+    def setUp(self):
+        self._device = PluribusDevice(ports_count=8, associations_count=2)
+        self._server = PluribusTelnetServer(self._device, 'admin', 'admin').start()
+        self.addCleanup(self._server.stop)
+
+    def _driver_commands(self, pool_size=1, chassis_cache_file=None):
+        runtime_config = SimulatorRuntimeConfiguration(
+            {'CLI': {'TYPE': ['TELNET'], 'PORTS': {'TELNET': self._server.port}, 'POOL_SIZE': pool_size},
+             'CHASSIS_CACHE': {'FILE': chassis_cache_file}})
+        driver_commands = DriverCommands(Mock(), runtime_config)
+        driver_commands.login('127.0.0.1', 'admin', 'admin')
+        return driver_commands
+
+    @staticmethod
+    def _get_resource_description(driver_commands):
+        response_info = driver_commands.get_resource_description('127.0.0.1')
+        return ElementTree.tostring(response_info.build_xml_node())
+
+    def test_autoload_tables_in_one_write(self):
+        driver_commands = self._driver_commands()
+        with command_stats.activate(CommandScope('test')) as scope:
+            driver_commands._get_resource_description('127.0.0.1')
+        # State id, then commands of all autoload tables at once
+        self.assertEqual(scope.round_trips, 2)
+
+    def test_parallel_autoload(self):
+        driver_commands = self._driver_commands(3)
+        # Enters the mode on every session
+        driver_commands._get_resource_description('127.0.0.1')
+        self._device.execute('switch-setup-modify motd 4321')
+        with command_stats.activate(CommandScope('test')) as scope:
+            driver_commands._get_resource_description('127.0.0.1')
+        # State id, then one write per table, each one over its own pooled session
+        self.assertEqual(scope.round_trips, 4)
+        self.assertEqual(self._get_resource_description(self._driver_commands(3)),
+                         self._get_resource_description(self._driver_commands(1)))
+
+    def test_autoload_busy_sessions_not_waited(self):
+        driver_commands = self._driver_commands(2)
+        with driver_commands._cli_handler.default_mode_service():
+            with command_stats.activate(CommandScope('test')) as scope:
+                driver_commands._get_resource_description('127.0.0.1')
+        self.assertEqual(scope.round_trips, 2)
+
+    def test_autoload_cached_by_state_id(self):
+        driver_commands = self._driver_commands()
+        resource_description = self._get_resource_description(driver_commands)
+        self._device.reset_stats()
+        self.assertEqual(self._get_resource_description(driver_commands), resource_description)
+        self.assertEqual(self._device.commands.get('port-config-show'), None)
+
+        driver_commands.map_bidi('127.0.0.1/1/5', '127.0.0.1/1/6')
+        self._device.reset_stats()
+        resource_description = self._get_resource_description(driver_commands)
+        self.assertIn('<IncomingMapping>127.0.0.1/1/6</IncomingMapping>', resource_description)
+        self.assertEqual(self._device.commands['port-association-show'], 1)
+        self.assertEqual(self._device.commands.get('port-config-show'), None)
+
+        driver_commands.set_state_id('1234')
+        self._device.reset_stats()
+        self._get_resource_description(driver_commands)
+        self.assertEqual(self._device.commands.get('port-association-show'), None)
+
+        self._device.execute('switch-setup-modify motd 4321')
+        self._device.reset_stats()
+        self._get_resource_description(driver_commands)
+        self.assertEqual(self._device.commands['port-config-show'], 1)
+
+    def test_chassis_facts_cached_across_restart(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        chassis_cache_file = os.path.join(directory, 'chassis.json')
+        self._driver_commands(chassis_cache_file=chassis_cache_file)
+        self._device.reset_stats()
+        driver_commands = self._driver_commands(chassis_cache_file=chassis_cache_file)
+        response_info = driver_commands.get_attribute_value('127.0.0.1', 'Serial Number')
+        self.assertEqual(response_info._value, PluribusDevice.CHASSIS_SERIAL)
+        self.assertEqual(self._device.commands['software-show'], 1)
+        self.assertEqual(self._device.commands.get('switch-info-show'), None)
+
+
+class TestDriverCommandsConcurrency(TestCase):
+    def test_concurrent_mappings_use_own_sessions(self):
+        device = PluribusDevice(ports_count=16, latency=0.01)
+        with PluribusTelnetServer(device, 'admin', 'admin') as server:
+            driver_commands = DriverCommands(Mock(), SimulatorRuntimeConfiguration(
+                {'CLI': {'TYPE': ['TELNET'], 'PORTS': {'TELNET': server.port}, 'POOL_SIZE': 2}}))
+            driver_commands.login('127.0.0.1', 'admin', 'admin')
+            errors = []
+
+            def map_ports(master_port, slave_port):
+                ports = ['127.0.0.1/1/{}'.format(device.bezel_intf(port)) for port in (master_port, slave_port)]
+                try:
+                    for _ in range(3):
+                        driver_commands.map_bidi(*ports)
+                        driver_commands.map_clear(ports)
+                except Exception as e:
+                    errors.append(e)
+
+            threads = [threading.Thread(target=map_ports, args=(port, port + 1)) for port in range(1, 9, 2)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(device.associations, {})
+
+    def test_evicted_device_reopened(self):
+        device = PluribusDevice(ports_count=4)
+        with PluribusTelnetServer(device, 'admin', 'admin') as server:
+            driver_commands = DriverCommands(Mock(), SimulatorRuntimeConfiguration(
+                {'CLI': {'TYPE': ['TELNET'], 'PORTS': {'TELNET': server.port}}, 'DEVICES': {'MAX_COUNT': 1}}))
+            driver_commands.login('127.0.0.1', 'admin', 'admin')
+            evicted = driver_commands._device
+            other_login = threading.Thread(target=driver_commands.login, args=('localhost', 'admin', 'admin'))
+            other_login.start()
+            other_login.join()
+            self.assertTrue(evicted.closed)
+            self.assertIsNotNone(driver_commands.get_state_id())
+            self.assertIn('127.0.0.1', driver_commands._devices)
+            driver_commands.close()
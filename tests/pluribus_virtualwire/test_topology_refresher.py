@@ -0,0 +1,40 @@
+from unittest import TestCase
+
+from mock import Mock
+
+from pluribus_virtualwire.cli.vw_cli_handler import VWCliHandler
+from pluribus_virtualwire.helpers.topology_cache import TopologyCache
+from pluribus_virtualwire.topology_refresher import TopologyRefresher
+from tests.simulator.pluribus_device import PluribusDevice
+from tests.simulator.pluribus_server import PluribusTelnetServer
+from tests.simulator.runtime_configuration import SimulatorRuntimeConfiguration
+
+
+class TestTopologyRefresher(TestCase):
+    def setUp(self):
+        self._device = PluribusDevice(ports_count=8, associations_count=1)
+        server = PluribusTelnetServer(self._device, 'admin', 'admin').start()
+        self.addCleanup(server.stop)
+        self._cli_handler = VWCliHandler(Mock(), SimulatorRuntimeConfiguration(
+            {'CLI': {'TYPE': ['TELNET'], 'PORTS': {'TELNET': server.port}, 'POOL_SIZE': 1}}))
+        self._cli_handler.define_session_attributes('127.0.0.1', 'admin', 'admin')
+        self.addCleanup(self._cli_handler.close)
+        self._topology_cache = TopologyCache(Mock())
+        self._logger = Mock()
+        self._instance = TopologyRefresher('127.0.0.1', self._cli_handler, self._topology_cache, self._logger, 60)
+
+    def test_refresh_over_idle_session(self):
+        self.assertFalse(self._instance.refresh())
+        self._cli_handler.prewarm_sessions()
+        self.assertTrue(self._instance.refresh())
+        self.assertEqual(self._topology_cache.state_id, '-1')
+        self.assertEqual(len(self._topology_cache.phys_to_logical), 8)
+        self.assertIn('1-bidi-2', self._topology_cache.associations)
+
+    def test_out_of_band_changes_logged(self):
+        self._cli_handler.prewarm_sessions()
+        self._instance.refresh()
+        self._device.execute('port-association-create name 3-uni-4 master-ports 3 slave-ports 4 virtual-wire')
+        self._instance.refresh()
+        self.assertIn('3-uni-4', self._topology_cache.associations)
+        self.assertIn('added: 3-uni-4', self._logger.info.call_args[0][0])
@@ -0,0 +1,28 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import re
+
+from cloudshell.cli.session.session_exceptions import CommandExecutionException
+
+
+class SimulatorCliService(object):
+    """
+    CliService stand-in which sends commands directly to the simulated device, no transport involved
+    """
+    PROMPT = 'CLI (network-admin@pluribus-sim) > '
+
+    def __init__(self, device):
+        """
+        :type device: tests.simulator.pluribus_device.PluribusDevice
+        """
+        self.device = device
+
+    def send_command(self, command, expected_string=None, action_map=None, error_map=None, logger=None,
+                     *args, **kwargs):
+        output = self.device.execute(command)
+        for error_pattern, error in (error_map or {}).iteritems():
+            if re.search(error_pattern, output, re.DOTALL):
+                if isinstance(error, CommandExecutionException):
+                    raise error
+                raise CommandExecutionException('Session returned \'{}\''.format(error))
+        return output + '\n' + self.PROMPT
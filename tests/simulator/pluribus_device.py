@@ -0,0 +1,312 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import re
+import shlex
+import time
+from collections import OrderedDict, defaultdict
+from threading import RLock
+
+
+class PluribusDevice(object):
+    """
+    In-memory model of a Netvisor switch, answers the CLI commands used by the driver
+    """
+    MODEL = 'NSU-Simulator'
+    CHASSIS_SERIAL = 'SIM0000001'
+    VERSION = '2.6.0-206015580'
+    SWITCH_NAME = 'pluribus-sim'
+    PORT_SPEED = '10g'
+
+    def __init__(self, ports_count=64, associations_count=0, latency=0, command_latency=None, disabled_ports=None,
+                 bezel_map=None, switch_name=SWITCH_NAME):
+        """
+        :param ports_count: count of logical ports
+        :type ports_count: int
+        :param associations_count: count of bidir associations created on start, ports 1-2, 3-4, ...
+        :type associations_count: int
+        :param latency: default per-command latency, sec
+        :type latency: float
+        :param command_latency: per-command latency, {'port-association-show': 0.5}
+        :type command_latency: dict
+        :param disabled_ports: logical ids of disabled ports
+        :type disabled_ports: list
+        :param bezel_map: logical port id to bezel-intf name, identity if not defined
+        :type bezel_map: dict
+        """
+        if associations_count * 2 > ports_count:
+            raise ValueError('Not enough ports for {} associations'.format(associations_count))
+
+        self.switch_name = switch_name
+        self.latency = latency
+        self.command_latency = dict(command_latency or {})
+
+        self._lock = RLock()
+        self._ports = OrderedDict()
+        for port_id in range(1, ports_count + 1):
+            self._ports[str(port_id)] = {'speed': self.PORT_SPEED, 'autoneg': 'off', 'enable': 'on',
+                                         'bezel': str(port_id)}
+        for port_id in disabled_ports or []:
+            self._ports[str(port_id)]['enable'] = 'off'
+        for port_id, bezel_intf in (bezel_map or {}).iteritems():
+            self._ports[str(port_id)]['bezel'] = str(bezel_intf)
+
+        self._associations = OrderedDict()
+        for index in range(associations_count):
+            master_port, slave_port = str(index * 2 + 1), str(index * 2 + 2)
+            self._create_association('{0}-bidi-{1}'.format(master_port, slave_port), master_port, slave_port, True)
+
+        self.motd = '-1'
+        self.commands = defaultdict(int)
+        self.bytes_sent = 0
+
+        self._handlers = {
+            'switch-local': self._empty,
+            'pager': self._empty,
+            'switch-info-show': self._switch_info_show,
+            'software-show': self._software_show,
+            'switch-setup-show': self._switch_setup_show,
+            'switch-setup-modify': self._switch_setup_modify,
+            'port-config-show': self._port_config_show,
+            'port-config-modify': self._port_config_modify,
+            'bezel-portmap-show': self._bezel_portmap_show,
+            'port-association-show': self._port_association_show,
+            'port-association-create': self._port_association_create,
+            'port-association-delete': self._port_association_delete,
+            'port-association-modify': self._port_association_modify,
+        }
+
+    @property
+    def round_trips(self):
+        """
+        Total count of executed commands, empty lines sent as prompt probes included
+        :rtype: int
+        """
+        return sum(self.commands.values())
+
+    @property
+    def ports_count(self):
+        return len(self._ports)
+
+    @property
+    def associations(self):
+        """
+        Copy of the associations table, {name: {'master': '1', 'slave': '2', 'bidir': True, 'monitor': ['3']}}
+        :rtype: dict
+        """
+        with self._lock:
+            return {name: dict(attributes, monitor=list(attributes['monitor']))
+                    for name, attributes in self._associations.iteritems()}
+
+    def bezel_intf(self, logical_id):
+        return self._ports[str(logical_id)]['bezel']
+
+    def reset_stats(self):
+        with self._lock:
+            self.commands.clear()
+            self.bytes_sent = 0
+
+    def execute(self, command_line):
+        """
+        Execute one CLI command
+        :param command_line: 'port-association-delete name 1-bidi-2'
+        :type command_line: str
+        :return: command output without prompt
+        :rtype: str
+        """
+        try:
+            args = shlex.split(command_line)
+        except ValueError:
+            args = command_line.split()
+        if not args:
+            with self._lock:
+                self.commands[''] += 1
+            return ''
+        command = args[0]
+        handler = self._handlers.get(command)
+        time.sleep(self.command_latency.get(command, self.latency))
+        with self._lock:
+            self.commands[command] += 1
+            if handler:
+                output = handler(command, args[1:])
+            else:
+                output = '{}: Error: command not found'.format(command)
+            self.bytes_sent += len(output)
+            return output
+
+    @staticmethod
+    def _parse_args(args):
+        """
+        Parse 'key value' pairs, single keywords get value True
+        """
+        flags = {'parsable-delim', 'format', 'name', 'master-ports', 'slave-ports', 'monitor-ports', 'port',
+                 'motd'}
+        parsed = {}
+        index = 0
+        while index < len(args):
+            key = args[index]
+            if key in flags and index + 1 < len(args):
+                parsed[key] = args[index + 1]
+                index += 2
+            else:
+                parsed[key] = True
+                index += 1
+        return parsed
+
+    @staticmethod
+    def _format_table(rows, args, default_fields):
+        """
+        Render rows the way Netvisor does, 'field: value' lines or parsable records
+        """
+        fields = [field for field in args.get('format', ','.join(default_fields)).split(',') if field]
+        delimiter = args.get('parsable-delim')
+        if delimiter:
+            return '\n'.join(delimiter.join(row.get(field, '') for field in fields) for row in rows)
+        return '\n'.join('\n'.join('{0}: {1}'.format(field, row.get(field, '')) for field in fields) for row in rows)
+
+    @staticmethod
+    def _compress_ports(ports):
+        ranges = []
+        for port in sorted(set(int(port) for port in ports)):
+            if ranges and ranges[-1][1] == port - 1:
+                ranges[-1][1] = port
+            else:
+                ranges.append([port, port])
+        return ','.join(str(start) if start == end else '{0}-{1}'.format(start, end) for start, end in ranges)
+
+    @staticmethod
+    def _expand_ports(ports):
+        result = []
+        for record in ports.split(','):
+            if '-' in record:
+                start, end = record.split('-')
+                result.extend(str(port) for port in range(int(start), int(end) + 1))
+            elif record:
+                result.append(record)
+        return result
+
+    def _empty(self, command, args):
+        return ''
+
+    def _switch_info_show(self, command, args):
+        return self._format_table([{'model': self.MODEL, 'chassis-serial': self.CHASSIS_SERIAL,
+                                    'switch-name': self.switch_name}], self._parse_args(args),
+                                  ['switch-name', 'model', 'chassis-serial'])
+
+    def _software_show(self, command, args):
+        return self._format_table([{'version': self.VERSION}], self._parse_args(args), ['version'])
+
+    def _switch_setup_show(self, command, args):
+        return self._format_table([{'switch-name': self.switch_name, 'motd': self.motd}], self._parse_args(args),
+                                  ['switch-name', 'motd'])
+
+    def _switch_setup_modify(self, command, args):
+        parsed = self._parse_args(args)
+        if 'motd' in parsed:
+            self.motd = parsed['motd']
+        return ''
+
+    def _port_rows(self, port_filter=None):
+        rows = []
+        for port_id, attributes in self._ports.iteritems():
+            if port_filter is None or port_id == port_filter:
+                rows.append({'port': port_id, 'intf': port_id, 'speed': attributes['speed'],
+                             'autoneg': attributes['autoneg'], 'enable': attributes['enable'],
+                             'bezel-intf': attributes['bezel']})
+        return rows
+
+    def _port_config_show(self, command, args):
+        parsed = self._parse_args(args)
+        return self._format_table(self._port_rows(parsed.get('port')), parsed, ['port', 'speed', 'autoneg', 'enable'])
+
+    def _port_config_modify(self, command, args):
+        parsed = self._parse_args(args)
+        port = self._ports.get(parsed.get('port'))
+        if not port:
+            return '{}: Error: invalid port'.format(command)
+        if parsed.get('autoneg'):
+            port['autoneg'] = 'on'
+        elif parsed.get('no-autoneg'):
+            port['autoneg'] = 'off'
+        return ''
+
+    def _bezel_portmap_show(self, command, args):
+        return self._format_table(self._port_rows(), self._parse_args(args), ['port', 'bezel-intf'])
+
+    def _port_association_show(self, command, args):
+        rows = []
+        for name, attributes in self._associations.iteritems():
+            rows.append({'name': name, 'master-ports': attributes['master'], 'slave-ports': attributes['slave'],
+                         'bidir': str(attributes['bidir']).lower(), 'virtual-wire': 'true',
+                         'monitor-ports': self._compress_ports(attributes['monitor'])})
+        return self._format_table(rows, self._parse_args(args), ['name', 'master-ports', 'slave-ports', 'bidir',
+                                                                 'monitor-ports'])
+
+    def _used_ports(self, exclude=None):
+        used = {}
+        for name, attributes in self._associations.iteritems():
+            if name != exclude:
+                used[attributes['slave']] = name
+                if attributes['bidir']:
+                    used[attributes['master']] = name
+        return used
+
+    def _create_association(self, name, master_port, slave_port, bidir, monitor_ports=None):
+        self._associations[name] = {'master': master_port, 'slave': slave_port, 'bidir': bidir,
+                                    'monitor': list(monitor_ports or [])}
+
+    def _port_association_create(self, command, args):
+        parsed = self._parse_args(args)
+        name = parsed.get('name')
+        master_port = parsed.get('master-ports')
+        slave_port = parsed.get('slave-ports')
+        bidir = bool(parsed.get('bidir'))
+        if name in self._associations:
+            return '{0}: Port association {1} already exists'.format(command, name)
+        for port in (master_port, slave_port):
+            if port not in self._ports:
+                return '{0}: Error: invalid port {1}'.format(command, port)
+            if self._ports[port]['enable'] != 'on':
+                return '{0}: Error: port {1} is disabled'.format(command, port)
+        used_ports = self._used_ports()
+        for port in ([master_port, slave_port] if bidir else [slave_port]):
+            if port in used_ports:
+                return '{0}: Conflict with port-association {1} on port {2}'.format(command, used_ports[port], port)
+        self._create_association(name, master_port, slave_port, bidir,
+                                 self._expand_ports(parsed.get('monitor-ports', '')))
+        return ''
+
+    def _port_association_delete(self, command, args):
+        name = self._parse_args(args).get('name')
+        if name not in self._associations:
+            return '{}: Unable to find port-association to delete'.format(command)
+        del self._associations[name]
+        return ''
+
+    def _port_association_modify(self, command, args):
+        parsed = self._parse_args(args)
+        association = self._associations.get(parsed.get('name'))
+        if not association:
+            return '{0}: Error: port-association {1} not found'.format(command, parsed.get('name'))
+        if 'monitor-ports' in parsed:
+            monitor_ports = self._expand_ports(parsed['monitor-ports'])
+            for port in monitor_ports:
+                if port not in self._ports:
+                    return '{0}: Error: invalid port {1}'.format(command, port)
+            association['monitor'] = monitor_ports
+        return ''
+
+
+def parse_latency(value):
+    """
+    Parse latency definition, '0.01' or 'port-association-show=0.5,bezel-portmap-show=0.2'
+    :rtype: tuple
+    """
+    default_latency = 0
+    command_latency = {}
+    for record in re.split(r',', value or ''):
+        if '=' in record:
+            command, latency = record.split('=', 1)
+            command_latency[command.strip()] = float(latency)
+        elif record.strip():
+            default_latency = float(record)
+    return default_latency, command_latency
@@ -0,0 +1,338 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import argparse
+import socket
+import threading
+import time
+
+import paramiko
+
+from tests.simulator.pluribus_device import PluribusDevice, parse_latency
+
+
+class PluribusCliShell(object):
+    """
+    CLI state machine of one connection, emulates Netvisor prompts and cli/shell modes
+    """
+    USERNAME = 'network-admin'
+    NEW_LINE = '\r\n'
+
+    CLI = 'cli'
+    SHELL = 'shell'
+    LOGIN_USERNAME = 'login_username'
+    LOGIN_PASSWORD = 'login_password'
+    CLI_USERNAME = 'cli_username'
+    CLI_PASSWORD = 'cli_password'
+
+    def __init__(self, device, username, password, mode=CLI):
+        """
+        :type device: tests.simulator.pluribus_device.PluribusDevice
+        """
+        self._device = device
+        self._username = username
+        self._password = password
+        self._mode = mode
+        self._entered_username = None
+        self.closed = False
+
+    @property
+    def cli_prompt(self):
+        return 'CLI ({0}@{1}) > '.format(self.USERNAME, self._device.switch_name)
+
+    @property
+    def shell_prompt(self):
+        return '{0}@{1}:~$ '.format(self.USERNAME, self._device.switch_name)
+
+    def greeting(self):
+        if self._mode == self.LOGIN_USERNAME:
+            return 'login: '
+        return 'Netvisor OS Command Line Interface' + self.NEW_LINE + self.cli_prompt
+
+    def handle_line(self, line):
+        """
+        Process one input line
+        :return: echo, output and the next prompt
+        :rtype: str
+        """
+        line = line.strip()
+        if self._mode in (self.LOGIN_PASSWORD, self.CLI_PASSWORD):
+            echo = self.NEW_LINE
+        else:
+            echo = line + self.NEW_LINE
+        return echo + getattr(self, '_handle_' + self._mode)(line)
+
+    def _output(self, output, prompt):
+        if output:
+            return output.replace('\n', self.NEW_LINE) + self.NEW_LINE + prompt
+        return prompt
+
+    def _handle_login_username(self, line):
+        self._entered_username = line
+        self._mode = self.LOGIN_PASSWORD
+        return 'Password: '
+
+    def _handle_login_password(self, line):
+        if self._entered_username == self._username and line == self._password:
+            self._mode = self.CLI
+            return self.greeting()
+        self._mode = self.LOGIN_USERNAME
+        return 'Login incorrect' + self.NEW_LINE + 'login: '
+
+    def _handle_cli_username(self, line):
+        self._entered_username = line or self._username
+        self._mode = self.CLI_PASSWORD
+        return 'Password: '
+
+    def _handle_cli_password(self, line):
+        if self._entered_username == self._username and line == self._password:
+            self._mode = self.CLI
+            return self.cli_prompt
+        self._mode = self.SHELL
+        return self._output('cli: Error: authentication failed', self.shell_prompt)
+
+    def _handle_shell(self, line):
+        if line == 'cli':
+            self._mode = self.CLI_USERNAME
+            return 'Netvisor OS Command Line Interface' + self.NEW_LINE + 'Username ({}): '.format(self._username)
+        if line == 'exit':
+            self.closed = True
+            return ''
+        if line:
+            return self._output('{}: command not found'.format(line.split()[0]), self.shell_prompt)
+        return self.shell_prompt
+
+    def _handle_cli(self, line):
+        if line == 'shell':
+            self._mode = self.SHELL
+            return self.shell_prompt
+        if line in ('exit', 'quit'):
+            self._mode = self.SHELL
+            return self.shell_prompt
+        return self._output(self._device.execute(line), self.cli_prompt)
+
+
+class _LineReader(object):
+    """
+    Split incoming data to lines, '\r', '\n' and '\r\n' are line endings
+    """
+
+    def __init__(self):
+        self._buffer = ''
+        self._skip_lf = False
+
+    def feed(self, data):
+        lines = []
+        for char in data:
+            if char == '\n' and self._skip_lf:
+                self._skip_lf = False
+                continue
+            self._skip_lf = char == '\r'
+            if char in '\r\n':
+                lines.append(self._buffer)
+                self._buffer = ''
+            else:
+                self._buffer += char
+        return lines
+
+
+class _SimulatorServer(object):
+    """
+    Base listener, serves every connection in a separate thread
+    """
+
+    def __init__(self, device, username, password, host='127.0.0.1', port=0):
+        """
+        :type device: tests.simulator.pluribus_device.PluribusDevice
+        """
+        self.device = device
+        self.username = username
+        self.password = password
+        self.connections = 0
+        self._host = host
+        self._port = port
+        self._socket = None
+        self._thread = None
+        self._running = False
+
+    @property
+    def port(self):
+        return self._socket.getsockname()[1]
+
+    @property
+    def host(self):
+        return self._host
+
+    def start(self):
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._socket.bind((self._host, self._port))
+        self._socket.listen(100)
+        self._socket.settimeout(0.2)
+        self._running = True
+        self._thread = threading.Thread(target=self._serve)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._running = False
+        if self._thread:
+            self._thread.join()
+        self._socket.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def _serve(self):
+        while self._running:
+            try:
+                connection, _ = self._socket.accept()
+            except socket.timeout:
+                continue
+            self.connections += 1
+            thread = threading.Thread(target=self._handle_connection, args=(connection,))
+            thread.daemon = True
+            thread.start()
+
+    def _handle_connection(self, connection):
+        raise NotImplementedError
+
+    def _filter_input(self, data):
+        return data
+
+    def _run_shell(self, shell, receive, send):
+        reader = _LineReader()
+        send(shell.greeting())
+        while self._running and not shell.closed:
+            try:
+                data = receive()
+            except socket.timeout:
+                continue
+            if not data:
+                break
+            for line in reader.feed(self._filter_input(data)):
+                send(shell.handle_line(line))
+
+
+class PluribusSSHServer(_SimulatorServer):
+    """
+    SSH listener, lands the user in CLI mode like Netvisor does
+    """
+    HOST_KEY = None
+
+    class _ServerInterface(paramiko.ServerInterface):
+        def __init__(self, username, password):
+            self._username = username
+            self._password = password
+            self.shell_requested = threading.Event()
+
+        def check_auth_password(self, username, password):
+            if username == self._username and password == self._password:
+                return paramiko.AUTH_SUCCESSFUL
+            return paramiko.AUTH_FAILED
+
+        def get_allowed_auths(self, username):
+            return 'password'
+
+        def check_channel_request(self, kind, chanid):
+            if kind == 'session':
+                return paramiko.OPEN_SUCCEEDED
+            return paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED
+
+        def check_channel_pty_request(self, channel, term, width, height, pixelwidth, pixelheight, modes):
+            return True
+
+        def check_channel_shell_request(self, channel):
+            self.shell_requested.set()
+            return True
+
+    @classmethod
+    def _host_key(cls):
+        if not cls.HOST_KEY:
+            cls.HOST_KEY = paramiko.RSAKey.generate(1024)
+        return cls.HOST_KEY
+
+    def _handle_connection(self, connection):
+        transport = paramiko.Transport(connection)
+        transport.add_server_key(self._host_key())
+        server_interface = self._ServerInterface(self.username, self.password)
+        try:
+            transport.start_server(server=server_interface)
+            channel = transport.accept(20)
+            if channel is None or not server_interface.shell_requested.wait(20):
+                return
+            channel.settimeout(0.2)
+            shell = PluribusCliShell(self.device, self.username, self.password)
+            self._run_shell(shell, lambda: channel.recv(4096), channel.sendall)
+        except (socket.error, EOFError, paramiko.SSHException):
+            pass
+        finally:
+            transport.close()
+
+
+class PluribusTelnetServer(_SimulatorServer):
+    """
+    Telnet listener, asks for login and password before the CLI prompt
+    """
+    IAC = chr(255)
+    SB = chr(250)
+    SE = chr(240)
+
+    def _filter_input(self, data):
+        result = ''
+        index = 0
+        while index < len(data):
+            char = data[index]
+            if char != self.IAC:
+                result += char
+                index += 1
+            elif data[index + 1:index + 2] == self.SB:
+                end = data.find(self.IAC + self.SE, index)
+                index = len(data) if end < 0 else end + 2
+            else:
+                index += 3
+        return result
+
+    def _handle_connection(self, connection):
+        connection.settimeout(0.2)
+        shell = PluribusCliShell(self.device, self.username, self.password, mode=PluribusCliShell.LOGIN_USERNAME)
+        try:
+            self._run_shell(shell, lambda: connection.recv(4096), connection.sendall)
+        except socket.error:
+            pass
+        finally:
+            connection.close()
+
+
+SERVERS = {'SSH': PluribusSSHServer, 'TELNET': PluribusTelnetServer}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local Pluribus Netvisor CLI simulator')
+    parser.add_argument('--type', default='SSH', choices=SERVERS.keys())
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=2222)
+    parser.add_argument('--username', default='admin')
+    parser.add_argument('--password', default='admin')
+    parser.add_argument('--ports-count', type=int, default=64)
+    parser.add_argument('--associations-count', type=int, default=0)
+    parser.add_argument('--latency', default='0',
+                        help='Default latency and per-command overrides, 0.01,port-association-show=0.2')
+    args = parser.parse_args()
+
+    latency, command_latency = parse_latency(args.latency)
+    device = PluribusDevice(args.ports_count, args.associations_count, latency, command_latency)
+    server = SERVERS[args.type](device, args.username, args.password, args.host, args.port).start()
+    print('{0} simulator listening on {1}:{2}'.format(args.type, server.host, server.port))
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,31 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import re
+
+
+class SimulatorRuntimeConfiguration(object):
+    """
+    Runtime configuration built from a dict, same key lookup as RuntimeConfiguration without the singleton
+    """
+    KEY_SEPARATOR_LIST = [r'\.', r'\:', r'\/']
+
+    def __init__(self, configuration):
+        """
+        :param configuration: {'CLI': {'TYPE': ['SSH'], 'PORTS': {'SSH': 2222}}}
+        :type configuration: dict
+        """
+        self._key_separator_pattern = r'|'.join(self.KEY_SEPARATOR_LIST)
+        self._configuration = configuration
+
+    @property
+    def configuration(self):
+        return self._configuration
+
+    def read_key(self, complex_key, default_value=None):
+        value = self.configuration
+        for key in re.split(self._key_separator_pattern, complex_key):
+            if isinstance(value, dict):
+                value = value.get(key)
+            else:
+                return default_value
+        return value if value is not None else default_value
@@ -0,0 +1,61 @@
+from unittest import TestCase
+
+from tests.simulator.pluribus_device import PluribusDevice, parse_latency
+from tests.simulator.pluribus_server import PluribusCliShell
+
+
+class TestPluribusDevice(TestCase):
+    def setUp(self):
+        self._device = PluribusDevice(ports_count=8, associations_count=1, disabled_ports=[8], bezel_map={7: '49.1'})
+
+    def test_bezel_portmap_show(self):
+        output = self._device.execute('bezel-portmap-show format bezel-intf,port parsable-delim ":"')
+        self.assertIn('1:1', output.splitlines())
+        self.assertIn('49.1:7', output.splitlines())
+
+    def test_association_lifecycle(self):
+        self._device.execute('port-association-create name 3-uni-4 master-ports 3 slave-ports 4 virtual-wire no-bidir')
+        self._device.execute('port-association-modify name 3-uni-4 monitor-ports "5,6,7" virtual-wire')
+        output = self._device.execute(
+            'port-association-show format master-ports,slave-ports,name,bidir,monitor-ports parsable-delim ":"')
+        self.assertEqual(output.splitlines(), ['1:2:1-bidi-2:true:', '3:4:3-uni-4:false:5-7'])
+        self._device.execute('port-association-delete name 3-uni-4')
+        self.assertEqual(self._device.associations.keys(), ['1-bidi-2'])
+
+    def test_association_errors(self):
+        self.assertRegexpMatches(
+            self._device.execute('port-association-create name 1-bidi-2 master-ports 1 slave-ports 2 bidir'),
+            r'[Pp]ort\s[Aa]ssoc\w*ation\s.+\salready\sexists')
+        self.assertRegexpMatches(
+            self._device.execute('port-association-create name 3-uni-2 master-ports 3 slave-ports 2 no-bidir'),
+            r'[Cc]onflict')
+        self.assertRegexpMatches(
+            self._device.execute('port-association-create name 3-uni-8 master-ports 3 slave-ports 8 no-bidir'),
+            r'[Ee]rror:')
+        self.assertRegexpMatches(self._device.execute('port-association-delete name 5-uni-6'),
+                                 r'[Uu]nable to find port-association to delete')
+
+    def test_state_id(self):
+        self._device.execute('switch-setup-modify motd 1234')
+        self.assertEqual(self._device.execute('switch-setup-show format motd'), 'motd: 1234')
+
+    def test_round_trips(self):
+        self._device.execute('')
+        self._device.execute('switch-local')
+        self._device.execute('pager off')
+        self.assertEqual(self._device.round_trips, 3)
+        self._device.reset_stats()
+        self.assertEqual(self._device.round_trips, 0)
+
+    def test_parse_latency(self):
+        self.assertEqual(parse_latency('0.01,port-association-show=0.5'), (0.01, {'port-association-show': 0.5}))
+
+
+class TestPluribusCliShell(TestCase):
+    def test_shell_to_cli(self):
+        device = PluribusDevice(ports_count=2)
+        shell = PluribusCliShell(device, 'admin', 'password')
+        self.assertTrue(shell.handle_line('shell').endswith(shell.shell_prompt))
+        self.assertRegexpMatches(shell.handle_line('cli'), r'[Uu]sername\s\(.+\):')
+        self.assertRegexpMatches(shell.handle_line(''), r'[Pp]assword:')
+        self.assertRegexpMatches(shell.handle_line('password'), r'CLI\s+\(.+\)\s+>')